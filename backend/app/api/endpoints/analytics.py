@@ -1,10 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import Dict, Any, List
-from ...database import get_db
+from typing import Dict, Any, List, Optional
+from datetime import datetime, timedelta
+from ...database import get_db, get_async_db
 from ...services.jenkins import jenkins_client
 from ...services.notification_service import notification_service
 from ...services.job_monitor import job_monitor
+from ...services.rollups import rollup_service
+from ...services.window_counters import window_counters, HOUR_SLOTS
+from ...services.flakiness import flakiness_detector
+from ...services.regression import duration_regression_detector
+from ...services.delivery_metrics import delivery_metrics
+from ...services.build_store import build_store
+from ...services.aggregations import aggregation_service, AggregationError
+from ...services.health_evaluator import health_evaluator
+from ...services.capacity import capacity_accounting
+from ...services.correlation import failure_correlator
+from ...services.top_n import top_n_service
+from ...services.forecasting import load_forecaster, HORIZONS
+from ...services.retention import retention_manager
+from ...services.summary import SummaryMaterializer
+from ...routers.dashboard import _snapshot_response, _summary_fingerprint
 from ...api.dependencies import check_jenkins_config
 from ...config import settings
 
@@ -24,10 +42,14 @@ async def get_overall_stats(db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"Failed to get statistics: {str(e)}")
 
 @router.get("/trends")
-async def get_build_trends(days: int = 30, db: Session = Depends(get_db)):
+async def get_build_trends(
+    days: int = 30,
+    max_points: int = Query(500, ge=3, le=10000, description="Maximum points in the duration series (LTTB downsampled)"),
+    db: Session = Depends(get_db)
+):
     """Get build trends and distribution data."""
     try:
-        trends = await jenkins_client.get_build_trends(days=days)
+        trends = await jenkins_client.get_build_trends(days=days, max_points=max_points)
         return {
             "success": True,
             "data": trends,
@@ -36,6 +58,356 @@ async def get_build_trends(days: int = 30, db: Session = Depends(get_db)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get trends: {str(e)}")
 
+@router.get("/duration-percentiles")
+async def get_duration_percentiles(
+    pipeline: Optional[str] = Query(None, description="Pipeline name (all pipelines if omitted)"),
+    hours: Optional[int] = Query(None, ge=1, description="Trailing window in hours (all-time if omitted)"),
+    quantiles: str = Query("0.5,0.9,0.95,0.99", description="Comma-separated quantiles between 0 and 1")
+):
+    """Get build duration percentiles merged from rollup sketches."""
+    try:
+        qs = [float(q) for q in quantiles.split(",") if q.strip()]
+        if not qs or any(q < 0 or q > 1 for q in qs):
+            raise HTTPException(status_code=400, detail="Quantiles must be between 0 and 1")
+        
+        start = datetime.utcnow() - timedelta(hours=hours) if hours else None
+        # Windows past the in-memory horizon are read from the database, off the event loop
+        data = await asyncio.to_thread(
+            rollup_service.duration_percentiles, pipeline_name=pipeline, start=start, quantiles=qs
+        )
+        return {
+            "success": True,
+            "data": data,
+            "timestamp": datetime.utcnow().isoformat() + "Z"
+        }
+    except HTTPException:
+        raise
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid quantiles parameter")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get duration percentiles: {str(e)}")
+
+@router.get("/activity")
+async def get_recent_activity(
+    pipeline: Optional[str] = Query(None, description="Pipeline name (all pipelines if omitted)"),
+    hours: int = Query(24, ge=1, le=HOUR_SLOTS, description="Trailing window in hours")
+):
+    """Get build count and success rate over a trailing window."""
+    try:
+        data = window_counters.counts(pipeline, timedelta(hours=hours))
+        return {
+            "success": True,
+            "data": {
+                "pipeline": pipeline,
+                "window_hours": hours,
+                "builds_last_24h": window_counters.builds_in_window(pipeline, timedelta(days=1)),
+                "builds_last_7d": window_counters.builds_in_window(pipeline, timedelta(days=7)),
+                **data
+            },
+            "timestamp": datetime.utcnow().isoformat() + "Z"
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get recent activity: {str(e)}")
+
+@router.get("/flaky-pipelines")
+async def get_flaky_pipelines(
+    limit: int = Query(20, ge=1, le=200, description="Number of pipelines to return"),
+    min_builds: Optional[int] = Query(None, ge=2, description="Minimum builds in the window to be ranked")
+):
+    """Get pipelines ranked by SUCCESS/FAILURE flip rate."""
+    try:
+        ranked = flakiness_detector.ranked(limit=limit, min_builds=min_builds)
+        return {
+            "success": True,
+            "data": {
+                "window_builds": flakiness_detector.window_size,
+                "threshold": flakiness_detector.threshold,
+                "pipelines": ranked
+            },
+            "timestamp": datetime.utcnow().isoformat() + "Z"
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get flaky pipelines: {str(e)}")
+
+@router.get("/duration-regressions")
+async def get_duration_regressions(
+    pipeline: Optional[str] = Query(None, description="Pipeline name (all active regressions if omitted)")
+):
+    """Get active build duration regressions and the detector state."""
+    try:
+        if pipeline:
+            data = {
+                "regression": duration_regression_detector.active_regression(pipeline),
+                "state": duration_regression_detector.pipeline_state(pipeline)
+            }
+        else:
+            data = {"regressions": duration_regression_detector.regressions()}
+        return {
+            "success": True,
+            "data": data,
+            "timestamp": datetime.utcnow().isoformat() + "Z"
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get duration regressions: {str(e)}")
+
+@router.get("/delivery-metrics")
+async def get_delivery_metrics(
+    pipeline: Optional[str] = Query(None, description="Pipeline name (overall and per-pipeline if omitted)"),
+    days: int = Query(90, ge=1, le=365, description="Trailing window in days")
+):
+    """Get DORA-style delivery metrics (deploy frequency, change failure rate, MTTR, failing streaks)."""
+    try:
+        # Windows past the in-memory rollups are read from the database, off the event loop
+        if pipeline:
+            data = await asyncio.to_thread(delivery_metrics.metrics, pipeline, days)
+        else:
+            data = {
+                "overall": await asyncio.to_thread(delivery_metrics.metrics, None, days),
+                "pipelines": await asyncio.to_thread(delivery_metrics.metrics_by_pipeline, days)
+            }
+        return {
+            "success": True,
+            "data": data,
+            "timestamp": datetime.utcnow().isoformat() + "Z"
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get delivery metrics: {str(e)}")
+
+@router.get("/breakdown")
+async def get_build_breakdown(
+    group_by: str = Query("pipeline", pattern="^(pipeline|status|hour|day)$", description="Grouping key"),
+    pipeline: Optional[str] = Query(None, description="Restrict to one pipeline"),
+    hours: int = Query(168, ge=1, description="Trailing window in hours")
+):
+    """Get build counts, success rate and average duration grouped over the columnar build store."""
+    try:
+        start = datetime.utcnow() - timedelta(hours=hours)
+        groups = build_store.group_by(group_by, start=start, pipeline_name=pipeline)
+        return {
+            "success": True,
+            "data": {
+                "group_by": group_by,
+                "window_hours": hours,
+                "totals": build_store.totals(start=start, pipeline_name=pipeline),
+                "groups": [{"key": key, **values} for key, values in sorted(groups.items())]
+            },
+            "timestamp": datetime.utcnow().isoformat() + "Z"
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get build breakdown: {str(e)}")
+
+@router.get("/aggregate")
+async def get_aggregate(
+    source: str = Query("builds", description="builds or rollups"),
+    group_by: Optional[str] = Query(None, description="Comma-separated dimensions: pipeline, branch, triggered_by, status, node, hour, day"),
+    metrics: str = Query("count,success_rate,avg_duration", description="Comma-separated metrics: count, success_rate, failure_rate, avg_duration, p95_duration"),
+    pipeline: Optional[str] = Query(None),
+    branch: Optional[str] = Query(None),
+    triggered_by: Optional[str] = Query(None),
+    status: Optional[str] = Query(None),
+    node: Optional[str] = Query(None),
+    hours: Optional[int] = Query(None, ge=1, description="Trailing window in hours (all-time if omitted)"),
+    limit: int = Query(1000, ge=1, le=10000),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Run a grouped aggregate over builds or rollups as a single SQL GROUP BY."""
+    try:
+        start = datetime.utcnow().replace(minute=0, second=0, microsecond=0) - timedelta(hours=hours) if hours else None
+        data = await aggregation_service.aquery(
+            db,
+            source=source,
+            group_by=[d.strip() for d in group_by.split(",") if d.strip()] if group_by else [],
+            metrics=[m.strip() for m in metrics.split(",") if m.strip()],
+            filters={"pipeline": pipeline, "branch": branch, "triggered_by": triggered_by, "status": status, "node": node},
+            start=start,
+            limit=limit
+        )
+        return {
+            "success": True,
+            "data": data,
+            "timestamp": datetime.utcnow().isoformat() + "Z"
+        }
+    except AggregationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to run aggregate: {str(e)}")
+
+@router.get("/pipeline-health")
+async def get_pipeline_health(refresh: bool = Query(False, description="Re-evaluate before answering")):
+    """Get health status counts and per-pipeline health from the batch evaluator."""
+    try:
+        summary = await asyncio.to_thread(health_evaluator.evaluate) if refresh else health_evaluator.summary()
+        return {
+            "success": True,
+            "data": {**summary, "pipelines": health_evaluator.statuses()},
+            "timestamp": datetime.utcnow().isoformat() + "Z"
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get pipeline health: {str(e)}")
+
+@router.get("/capacity")
+async def get_capacity(
+    group_by: str = Query("pipeline", pattern="^(pipeline|node|day)$", description="Grouping key"),
+    days: int = Query(30, ge=1, le=365, description="Trailing window in days"),
+    pipeline: Optional[str] = Query(None, description="Restrict to one pipeline"),
+    node: Optional[str] = Query(None, description="Restrict to one node"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get executor-seconds and queue wait from the daily capacity rollups."""
+    try:
+        rows = await capacity_accounting.ausage(db, group_by, days, pipeline_name=pipeline, node_name=node)
+        return {
+            "success": True,
+            "data": {
+                "group_by": group_by,
+                "days": days,
+                "usage": rows,
+                "total_executor_hours": round(sum(r["executor_seconds"] for r in rows) / 3600, 2),
+                "queue": capacity_accounting.queue_now()
+            },
+            "timestamp": datetime.utcnow().isoformat() + "Z"
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get capacity usage: {str(e)}")
+
+@router.get("/forecast")
+async def get_load_forecast(
+    horizon: str = Query("24h", pattern="^(24h|7d)$", description="Forecast horizon"),
+    pipeline: Optional[str] = Query(None, description="Restrict to one pipeline")
+):
+    """Get forecast executor demand per hour with the model's recent error."""
+    try:
+        return {
+            "success": True,
+            "data": {"horizon": horizon, **load_forecaster.forecast(HORIZONS[horizon], pipeline)},
+            "timestamp": datetime.utcnow().isoformat() + "Z"
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get load forecast: {str(e)}")
+
+@router.get("/retention")
+async def get_retention_status():
+    """Get retention settings, per-pipeline policies and the last run's report."""
+    try:
+        return {
+            "success": True,
+            "data": retention_manager.status(),
+            "timestamp": datetime.utcnow().isoformat() + "Z"
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get retention status: {str(e)}")
+
+@router.put("/retention/{pipeline_name}")
+async def set_retention_policy(
+    pipeline_name: str,
+    days: Optional[int] = Query(None, ge=0, description="Days to keep raw builds (0 keeps all, omit for the default)")
+):
+    """Set how long a pipeline's raw builds are kept (its rollups are always kept)."""
+    try:
+        retention_manager.set_policy(pipeline_name, days)
+        return {
+            "success": True,
+            "data": {"pipeline_name": pipeline_name, "retention_days": days},
+            "timestamp": datetime.utcnow().isoformat() + "Z"
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to set retention policy: {str(e)}")
+
+@router.post("/retention/run")
+async def run_retention():
+    """Run one bounded retention pass now and return its report."""
+    try:
+        return {
+            "success": True,
+            "data": await asyncio.to_thread(retention_manager.run),
+            "timestamp": datetime.utcnow().isoformat() + "Z"
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to run retention: {str(e)}")
+
+@router.get("/incidents")
+async def get_incidents(hours: int = Query(24, ge=1, le=168, description="Trailing window in hours")):
+    """Get groups of pipelines that failed together (likely shared infrastructure outages)."""
+    try:
+        return {
+            "success": True,
+            "data": {
+                "window_minutes": int(failure_correlator.window.total_seconds() // 60),
+                "min_pipelines": failure_correlator.min_pipelines,
+                "incidents": failure_correlator.incidents(hours)
+            },
+            "timestamp": datetime.utcnow().isoformat() + "Z"
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get incidents: {str(e)}")
+
+@router.get("/incidents/{incident_id}")
+async def get_incident(incident_id: int):
+    """Get one incident with its member builds."""
+    incident = failure_correlator.incident(incident_id)
+    if incident is None:
+        raise HTTPException(status_code=404, detail="Incident not found")
+    return {
+        "success": True,
+        "data": incident,
+        "timestamp": datetime.utcnow().isoformat() + "Z"
+    }
+
+@router.get("/top/slowest-builds")
+async def get_slowest_builds(
+    limit: int = Query(20, ge=1, le=500),
+    days: int = Query(7, ge=1, le=3650, description="Trailing window in days"),
+    pipeline: Optional[str] = Query(None, description="Restrict to one pipeline"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get the slowest builds in the trailing window."""
+    try:
+        builds = await top_n_service.atop_builds(db, "duration", limit, days, pipeline)
+        return {
+            "success": True,
+            "data": {"days": days, "builds": builds},
+            "timestamp": datetime.utcnow().isoformat() + "Z"
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get slowest builds: {str(e)}")
+
+@router.get("/top/queue-waits")
+async def get_longest_queue_waits(
+    limit: int = Query(20, ge=1, le=500),
+    days: int = Query(7, ge=1, le=3650, description="Trailing window in days"),
+    pipeline: Optional[str] = Query(None, description="Restrict to one pipeline"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get the builds that waited longest in the queue in the trailing window."""
+    try:
+        builds = await top_n_service.atop_builds(db, "queue_wait", limit, days, pipeline)
+        return {
+            "success": True,
+            "data": {"days": days, "builds": builds},
+            "timestamp": datetime.utcnow().isoformat() + "Z"
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get queue waits: {str(e)}")
+
+@router.get("/top/failing-pipelines")
+async def get_failing_pipelines(
+    limit: int = Query(20, ge=1, le=500),
+    days: int = Query(7, ge=1, le=3650, description="Trailing window in days"),
+    by: str = Query("failures", pattern="^(failures|failure_rate)$", description="Ranking key"),
+    min_builds: int = Query(1, ge=1, description="Minimum builds in the window to be ranked"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get the pipelines that fail the most in the trailing window."""
+    try:
+        pipelines = await top_n_service.afailing_pipelines(db, limit, days, by, min_builds)
+        return {
+            "success": True,
+            "data": {"days": days, "by": by, "pipelines": pipelines},
+            "timestamp": datetime.utcnow().isoformat() + "Z"
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get failing pipelines: {str(e)}")
+
 @router.get("/node-health")
 async def get_node_health(db: Session = Depends(get_db)):
     """Get Jenkins node health information."""
@@ -71,49 +443,64 @@ async def get_node_health(db: Session = Depends(get_db)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get node health: {str(e)}")
 
+async def _gather_dashboard_summary() -> Dict[str, Any]:
+    # Jenkins calls run concurrently; the rollup query runs on this worker thread's own session
+    stats, node_info, trends = await asyncio.gather(
+        jenkins_client.get_overall_stats(),
+        jenkins_client.get_node_info(),
+        jenkins_client.get_build_trends(days=7)
+    )
+    pipeline_stats = aggregation_service.query(
+        source="rollups", group_by=["pipeline"], metrics=["count", "success_rate", "avg_duration"],
+        start=datetime.utcnow().replace(minute=0, second=0, microsecond=0) - timedelta(days=7)
+    )
+
+    computers = node_info.get("computer", []) if node_info else []
+    total_nodes = len(computers)
+    online_nodes = sum(1 for node in computers if not node.get("offline", True))
+
+    return {
+        "metrics": {
+            "total_pipelines": stats.get("total_pipelines", 0),
+            "total_builds": stats.get("total_builds", 0),
+            "jobs_in_progress": stats.get("jobs_in_progress", 0),
+            "successful_jobs": stats.get("successful_jobs", 0),
+            "failed_jobs": stats.get("failed_jobs", 0),
+            "avg_build_time": round(stats.get("avg_build_time", 0), 2),
+            "success_rate": round(stats.get("success_rate", 0), 2),
+            "failure_rate": round(stats.get("failure_rate", 0), 2)
+        },
+        "node_health": {
+            "total_nodes": total_nodes,
+            "online_nodes": online_nodes,
+            "offline_nodes": total_nodes - online_nodes,
+            "health_percentage": round((online_nodes / total_nodes * 100) if total_nodes > 0 else 0, 2)
+        },
+        "trends": trends,
+        "pipeline_stats": pipeline_stats["rows"],
+        "flakiness_scores": flakiness_detector.scores(),
+        "last_updated": datetime.utcnow().isoformat() + "Z"
+    }
+
+def _compute_dashboard_summary() -> Dict[str, Any]:
+    return {"success": True, "data": asyncio.run(_gather_dashboard_summary())}
+
+# Recomputed only when the shared summary fingerprint (Jenkins jobs and ingested builds) changes
+dashboard_summary_materializer = SummaryMaterializer(_compute_dashboard_summary, _summary_fingerprint)
+
 @router.get("/dashboard-summary")
-async def get_dashboard_summary(db: Session = Depends(get_db)):
-    """Get comprehensive dashboard summary with all key metrics."""
+async def get_dashboard_summary(request: Request):
+    """
+    Get comprehensive dashboard summary with all key metrics, served from a
+    materialized snapshot with an ETag; unchanged data answers
+    If-None-Match with a 304.
+    """
     try:
-        # Get overall stats
-        stats = await jenkins_client.get_overall_stats()
-        
-        # Get node health
-        node_info = await jenkins_client.get_node_info()
-        computers = node_info.get("computer", []) if node_info else []
-        total_nodes = len(computers)
-        online_nodes = sum(1 for node in computers if not node.get("offline", True))
-        
-        # Get recent trends
-        trends = await jenkins_client.get_build_trends(days=7)
-        
-        summary = {
-            "metrics": {
-                "total_pipelines": stats.get("total_pipelines", 0),
-                "total_builds": stats.get("total_builds", 0),
-                "jobs_in_progress": stats.get("jobs_in_progress", 0),
-                "successful_jobs": stats.get("successful_jobs", 0),
-                "failed_jobs": stats.get("failed_jobs", 0),
-                "avg_build_time": round(stats.get("avg_build_time", 0), 2),
-                "success_rate": round(stats.get("success_rate", 0), 2),
-                "failure_rate": round(stats.get("failure_rate", 0), 2)
-            },
-            "node_health": {
-                "total_nodes": total_nodes,
-                "online_nodes": online_nodes,
-                "offline_nodes": total_nodes - online_nodes,
-                "health_percentage": round((online_nodes / total_nodes * 100) if total_nodes > 0 else 0, 2)
-            },
-            "trends": trends,
-            "last_updated": "2025-08-26T03:30:00Z"
-        }
-        
-        return {
-            "success": True,
-            "data": summary
-        }
+        # The fingerprint probe and any recompute are blocking, so they run off the event loop
+        snapshot = await asyncio.to_thread(dashboard_summary_materializer.current)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get dashboard summary: {str(e)}")
+    return _snapshot_response(request, snapshot)
 
 @router.post("/notifications/test-email")
 async def test_email_notification(db: Session = Depends(get_db)):
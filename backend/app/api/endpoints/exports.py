@@ -0,0 +1,50 @@
+from fastapi import APIRouter, File, HTTPException, Query, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from datetime import datetime
+from ...services.exports import (
+    EXPORT_FORMATS, EXPORT_TABLES, MEDIA_TYPES, bulk_exporter, bulk_importer, resolve_columns
+)
+
+router = APIRouter(tags=["bulk"])
+
+@router.get("/export/{table}")
+async def export_table(
+    table: str,
+    format: str = Query("parquet", description="parquet or arrow (IPC stream)"),
+    columns: Optional[str] = Query(None, description="Comma-separated columns (all if omitted)"),
+    start: Optional[datetime] = Query(None, description="Inclusive lower bound on the row timestamp"),
+    end: Optional[datetime] = Query(None, description="Exclusive upper bound on the row timestamp")
+):
+    """Stream the builds or rollups table as Parquet or an Arrow IPC stream."""
+    if table not in EXPORT_TABLES:
+        raise HTTPException(status_code=404, detail=f"Unknown table: {table}")
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Format must be one of: {', '.join(EXPORT_FORMATS)}")
+    try:
+        selected = resolve_columns(table, [c.strip() for c in columns.split(",") if c.strip()] if columns else None)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    extension = "parquet" if format == "parquet" else "arrows"
+    return StreamingResponse(
+        bulk_exporter.stream(table, format, columns=selected, start=start, end=end),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{table}.{extension}"'}
+    )
+
+@router.post("/import/builds")
+async def import_builds(file: UploadFile = File(..., description="Parquet file of builds")):
+    """Bulk load builds from a Parquet file as a backfill; existing builds are updated."""
+    try:
+        stats = await run_in_threadpool(bulk_importer.import_parquet, file.file)
+        return {
+            "success": True,
+            "data": stats,
+            "timestamp": datetime.utcnow().isoformat() + "Z"
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to import builds: {str(e)}")
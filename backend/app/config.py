@@ -17,6 +17,18 @@ class Settings(BaseSettings):
     database_url: Optional[str] = Field(default=None, env="DATABASE_URL")
     database_name: str = Field(default="cicd_dashboard", env="DATABASE_NAME")
     
+    # Optional streaming read replica for analytics and listing reads (PostgreSQL)
+    database_replica_url: Optional[str] = Field(default=None, env="DATABASE_REPLICA_URL")
+    replica_max_lag_seconds: float = Field(default=10.0, env="REPLICA_MAX_LAG_SECONDS")
+    replica_check_interval: float = Field(default=5.0, env="REPLICA_CHECK_INTERVAL")  # Seconds
+    
+    # SQLite storage profile (file databases only)
+    sqlite_tuned: bool = Field(default=True, env="SQLITE_TUNED")  # WAL, reader pool and one writer
+    sqlite_reader_pool_size: int = Field(default=8, env="SQLITE_READER_POOL_SIZE")
+    sqlite_mmap_size: int = Field(default=268435456, env="SQLITE_MMAP_SIZE")  # Bytes
+    sqlite_cache_size_kb: int = Field(default=65536, env="SQLITE_CACHE_SIZE_KB")  # Per connection
+    sqlite_busy_timeout_ms: int = Field(default=5000, env="SQLITE_BUSY_TIMEOUT_MS")
+    
     # CORS
     cors_origins: str = Field(
         default="http://localhost:3000", 
@@ -46,10 +58,69 @@ class Settings(BaseSettings):
     # Health Check Thresholds
     failure_rate_threshold: float = Field(default=0.2, env="FAILURE_RATE_THRESHOLD")
     build_time_threshold_minutes: int = Field(default=30, env="BUILD_TIME_THRESHOLD_MINUTES")
+    health_window_days: int = Field(default=7, env="HEALTH_WINDOW_DAYS")
+    health_evaluation_interval: int = Field(default=300, env="HEALTH_EVALUATION_INTERVAL")  # Seconds
+    
+    # Rollups and duration sketches
+    rollup_memory_days: int = Field(default=90, env="ROLLUP_MEMORY_DAYS")
+    sketch_relative_accuracy: float = Field(default=0.01, env="SKETCH_RELATIVE_ACCURACY")
+    
+    # Flaky pipeline detection
+    flaky_window_builds: int = Field(default=30, env="FLAKY_WINDOW_BUILDS")
+    flaky_score_threshold: float = Field(default=0.3, env="FLAKY_SCORE_THRESHOLD")
+    flaky_min_builds: int = Field(default=5, env="FLAKY_MIN_BUILDS")
+    
+    # Build duration regression detection
+    regression_baseline_alpha: float = Field(default=0.05, env="REGRESSION_BASELINE_ALPHA")
+    regression_fast_alpha: float = Field(default=0.3, env="REGRESSION_FAST_ALPHA")
+    regression_cusum_threshold: float = Field(default=5.0, env="REGRESSION_CUSUM_THRESHOLD")
+    regression_cusum_slack: float = Field(default=0.5, env="REGRESSION_CUSUM_SLACK")
+    regression_warmup_builds: int = Field(default=10, env="REGRESSION_WARMUP_BUILDS")
+    regression_min_increase: float = Field(default=0.2, env="REGRESSION_MIN_INCREASE")
+    regression_active_days: int = Field(default=7, env="REGRESSION_ACTIVE_DAYS")
+    regression_notifications_enabled: bool = Field(default=False, env="REGRESSION_NOTIFICATIONS_ENABLED")
+    
+    # Cross-pipeline failure correlation
+    incident_window_minutes: int = Field(default=10, env="INCIDENT_WINDOW_MINUTES")
+    incident_min_pipelines: int = Field(default=3, env="INCIDENT_MIN_PIPELINES")
+    incident_retention_hours: int = Field(default=48, env="INCIDENT_RETENTION_HOURS")
+    
+    # Build load forecasting
+    forecast_history_weeks: int = Field(default=8, env="FORECAST_HISTORY_WEEKS")
+    forecast_smoothing: float = Field(default=0.3, env="FORECAST_SMOOTHING")
+    forecast_training_interval: int = Field(default=3600, env="FORECAST_TRAINING_INTERVAL")  # Seconds
+    
+    # Batched build ingestion (multi-row upserts)
+    ingest_batch_size: int = Field(default=1000, env="INGEST_BATCH_SIZE")
+    ingest_flush_interval: float = Field(default=2.0, env="INGEST_FLUSH_INTERVAL")  # Seconds
+    bulk_import_batch_size: int = Field(default=5000, env="BULK_IMPORT_BATCH_SIZE")  # Builds per transaction
+    bulk_import_max_line_bytes: int = Field(default=1_048_576, env="BULK_IMPORT_MAX_LINE_BYTES")
+    bulk_import_max_errors: int = Field(default=1000, env="BULK_IMPORT_MAX_ERRORS")  # Reported per request
+    
+    # Retention and archival of build history (rollups are kept forever)
+    retention_days: int = Field(default=365, env="RETENTION_DAYS")  # Raw builds; pipelines may override, 0 keeps all
+    notification_retention_days: int = Field(default=90, env="NOTIFICATION_RETENTION_DAYS")
+    log_archive_after_days: int = Field(default=30, env="LOG_ARCHIVE_AFTER_DAYS")
+    archive_dir: str = Field(default="./archive", env="ARCHIVE_DIR")
+    retention_batch_size: int = Field(default=500, env="RETENTION_BATCH_SIZE")
+    retention_max_batches: int = Field(default=200, env="RETENTION_MAX_BATCHES")  # Per run
+    retention_interval: int = Field(default=3600, env="RETENTION_INTERVAL")  # Seconds
+    retention_vacuum_threshold: float = Field(default=0.25, env="RETENTION_VACUUM_THRESHOLD")  # Free page fraction
+    
+    # Monthly range partitioning of builds on PostgreSQL
+    postgres_partitioning: bool = Field(default=False, env="POSTGRES_PARTITIONING")
+    partition_months_ahead: int = Field(default=3, env="PARTITION_MONTHS_AHEAD")
+    
+    # Columnar in-memory build store
+    build_store_days: int = Field(default=90, env="BUILD_STORE_DAYS")
+    
+    # Server-side aggregation queries
+    aggregate_cache_ttl: int = Field(default=30, env="AGGREGATE_CACHE_TTL")  # Seconds
     
     # Pagination
     default_page_size: int = Field(default=50, env="DEFAULT_PAGE_SIZE")
     max_page_size: int = Field(default=100, env="MAX_PAGE_SIZE")
+    listing_count_cache_ttl: int = Field(default=60, env="LISTING_COUNT_CACHE_TTL")  # Seconds
     
     @property
     def cors_origins_list(self) -> List[str]:
@@ -1,8 +1,16 @@
-from sqlalchemy import create_engine, MetaData
+from fastapi import Request, Response
+from sqlalchemy import create_engine, event, text, MetaData
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool, StaticPool
+from sqlalchemy.sql.dml import UpdateBase
+from typing import Optional, Tuple
+import asyncio
 import logging
+import threading
+import time
 from .config import settings
 
 logger = logging.getLogger(__name__)
@@ -10,10 +18,33 @@ logger = logging.getLogger(__name__)
 # Create SQLAlchemy base class
 Base = declarative_base()
 
-# Database engine and session
+# Database engines and session; read_engine is set only for the tuned SQLite profile
 engine = None
+read_engine = None
 SessionLocal = None
 
+# Asyncio engine and session for read paths served from async endpoints
+async_engine = None
+AsyncSessionLocal = None
+
+# Optional read replica (DATABASE_REPLICA_URL) for read-only sessions
+replica_engine = None
+async_replica_engine = None
+AsyncReplicaSessionLocal = None
+
+# Clients pass back the primary's WAL position after their writes (read-your-writes)
+READ_AFTER_HEADER = "X-Read-After"
+READ_AFTER_COOKIE = "cicd_read_after"
+
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
+
+# In-memory databases are named and shared so the sync and async engines see the same data
+SHARED_MEMORY_URL = "sqlite:///file:cicd_dashboard_memory?mode=memory&cache=shared&uri=true"
+
 
 def get_database_url():
     """Get database URL based on environment."""
@@ -24,20 +55,203 @@ def get_database_url():
     return f"sqlite:///./{settings.database_name}.db"
 
 
+def parse_lsn(lsn: Optional[str]) -> Optional[int]:
+    """A PostgreSQL WAL position (``16/B374D848``) as an integer, None if malformed."""
+    try:
+        high, low = lsn.split("/")
+        return (int(high, 16) << 32) + int(low, 16)
+    except (AttributeError, ValueError):
+        return None
+
+
+class ReplicaMonitor:
+    """
+    Replication lag and replay position of the read replica.
+
+    Checked at most every ``replica_check_interval`` seconds. The replica is
+    used while it answers and lags the primary by at most
+    ``replica_max_lag_seconds``; a read that must see a given write is also
+    held to the primary until the replica has replayed past its position.
+    """
+
+    def __init__(self):
+        self.engine = None
+        self.max_lag = settings.replica_max_lag_seconds
+        self.interval = settings.replica_check_interval
+        self.lag: Optional[float] = None
+        self.replay_lsn: Optional[int] = None
+        self.healthy = False
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def configure(self, engine):
+        self.engine = engine
+        self.healthy = False
+        self._checked_at = 0.0
+
+    def stale(self) -> bool:
+        return self.engine is not None and time.monotonic() - self._checked_at >= self.interval
+
+    def refresh(self):
+        """Measure lag on the replica; one thread refreshes while others use the last result."""
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            with self.engine.connect() as conn:
+                if self.engine.dialect.name == "postgresql":
+                    # A primary (not in recovery) or an idle, fully replayed standby has no lag
+                    row = conn.execute(text(
+                        "SELECT CASE WHEN pg_is_in_recovery() THEN pg_last_wal_replay_lsn() "
+                        "ELSE pg_current_wal_lsn() END::text, "
+                        "CASE WHEN NOT pg_is_in_recovery() "
+                        "OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+                        "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+                    )).one()
+                    self.replay_lsn, self.lag = parse_lsn(row[0]), float(row[1])
+                else:
+                    conn.execute(text("SELECT 1"))
+                    self.replay_lsn, self.lag = None, 0.0
+            self.healthy = self.lag <= self.max_lag
+            if not self.healthy:
+                logger.warning(f"Read replica is {self.lag:.1f}s behind; reading from the primary")
+        except Exception as e:
+            self.healthy = False
+            logger.warning(f"Read replica unavailable, reading from the primary: {e}")
+        finally:
+            self._checked_at = time.monotonic()
+            self._lock.release()
+
+    def usable(self, read_after: Optional[int] = None, refresh: bool = True) -> bool:
+        """Whether a read (that must see writes up to ``read_after``) may go to the replica."""
+        if self.engine is None:
+            return False
+        if refresh and self.stale():
+            self.refresh()
+        if not self.healthy:
+            return False
+        return read_after is None or self.replay_lsn is None or self.replay_lsn >= read_after
+
+    def status(self):
+        return {
+            "configured": self.engine is not None,
+            "healthy": self.healthy,
+            "lag_seconds": self.lag,
+            "max_lag_seconds": self.max_lag,
+        }
+
+
+# Global replica monitor instance
+replica_monitor = ReplicaMonitor()
+
+
+class RoutingSession(Session):
+    """
+    Session that reads from the reader pool and writes through the writer.
+
+    The writer is the session's bind; the reader engine, if any, is passed
+    as ``info["reader"]``. Statements go to a reader connection until the
+    session first writes (a flush or an INSERT/UPDATE/DELETE); from then
+    until the transaction ends everything uses the writer, so the session
+    reads its own writes.
+
+    Sessions opened read-only (``info["readonly"]``) read from the replica
+    engine in ``info["replica"]`` instead, while the replica monitor allows
+    it and has replayed ``info["read_after"]``.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if isinstance(clause, UpdateBase):
+            self.info["writing"] = True
+        if self.info.get("writing"):
+            return self.bind
+        replica = self.info.get("replica")
+        if replica is not None and self.info.get("readonly") and replica_monitor.usable(self.info.get("read_after")):
+            return replica
+        return self.info.get("reader") or self.bind
+
+
+@event.listens_for(RoutingSession, "before_flush")
+def _begin_write_transaction(session, flush_context, instances):
+    # Flushes only run with pending changes; their statements and later reads use the writer
+    session.info["writing"] = True
+
+
+@event.listens_for(RoutingSession, "after_commit")
+@event.listens_for(RoutingSession, "after_rollback")
+def _end_write_transaction(session):
+    session.info.pop("writing", None)
+
+
+def _is_memory_sqlite(database_url: str) -> bool:
+    return ":memory:" in database_url or database_url.rstrip("/") == "sqlite:"
+
+
+def async_database_url(database_url: str) -> str:
+    """The same database addressed through its asyncio driver."""
+    if _is_memory_sqlite(database_url):
+        database_url = SHARED_MEMORY_URL
+    scheme, rest = database_url.split("://", 1)
+    driver = ASYNC_DRIVERS.get(scheme.split("+")[0])
+    if driver is None:
+        raise ValueError(f"No asyncio driver configured for {scheme}")
+    return f"{driver}://{rest}"
+
+
+def _sqlite_pragmas(readonly: bool):
+    """Connect hook applying the tuned SQLite profile."""
+    def apply(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        # WAL lets readers proceed while the writer commits
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}")
+        cursor.execute(f"PRAGMA cache_size=-{int(settings.sqlite_cache_size_kb)}")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+        if readonly:
+            cursor.execute("PRAGMA query_only=1")
+        cursor.close()
+    return apply
+
+
+def create_sqlite_engines(database_url: str, tuned: bool = True) -> Tuple[Engine, Optional[Engine]]:
+    """
+    Writer and reader engines for a SQLite URL.
+
+    In-memory databases, and file databases with the tuned profile off,
+    share one connection (StaticPool) and have no separate reader engine.
+    Tuned file databases get a single-connection writer pool, so writers
+    queue in the pool instead of failing on SQLITE_BUSY, and a pool of
+    query-only reader connections.
+    """
+    connect_args = {"check_same_thread": False}
+    if _is_memory_sqlite(database_url):
+        database_url = SHARED_MEMORY_URL
+    if not tuned or database_url == SHARED_MEMORY_URL:
+        writer = create_engine(database_url, connect_args=connect_args, poolclass=StaticPool, echo=settings.debug)
+        return writer, None
+
+    writer = create_engine(
+        database_url, connect_args=connect_args, poolclass=QueuePool,
+        pool_size=1, max_overflow=0, echo=settings.debug
+    )
+    reader = create_engine(
+        database_url, connect_args=connect_args, poolclass=QueuePool,
+        pool_size=settings.sqlite_reader_pool_size, max_overflow=0, echo=settings.debug
+    )
+    event.listen(writer, "connect", _sqlite_pragmas(readonly=False))
+    event.listen(reader, "connect", _sqlite_pragmas(readonly=True))
+    return writer, reader
+
+
 def create_database_engine():
     """Create database engine with appropriate configuration."""
-    global engine, SessionLocal
+    global engine, read_engine, replica_engine, SessionLocal
     
     database_url = get_database_url()
     
     if database_url.startswith("sqlite"):
-        # SQLite configuration for development
-        engine = create_engine(
-            database_url,
-            connect_args={"check_same_thread": False},
-            poolclass=StaticPool,
-            echo=settings.debug
-        )
+        # SQLite: tuned WAL profile for file databases, one shared connection for :memory:
+        engine, read_engine = create_sqlite_engines(database_url, tuned=settings.sqlite_tuned)
     else:
         # PostgreSQL/MySQL configuration for production
         engine = create_engine(
@@ -47,10 +261,93 @@ def create_database_engine():
             echo=settings.debug
         )
     
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    info = {"reader": read_engine} if read_engine else {}
+    if settings.database_replica_url:
+        replica_engine = create_engine(
+            settings.database_replica_url, pool_pre_ping=True, pool_recycle=300, echo=settings.debug
+        )
+        replica_monitor.configure(replica_engine)
+        info["replica"] = replica_engine
+        logger.info("Read replica configured for read-only sessions")
+    
+    SessionLocal = sessionmaker(
+        class_=RoutingSession, autocommit=False, autoflush=False, bind=engine, info=info
+    )
     logger.info(f"Database engine created: {database_url}")
 
 
+def create_async_database_engine():
+    """Create the asyncio engine (aiosqlite locally, asyncpg for PostgreSQL)."""
+    global async_engine, AsyncSessionLocal, async_replica_engine, AsyncReplicaSessionLocal
+    
+    database_url = get_database_url()
+    url = async_database_url(database_url)
+    
+    if database_url.startswith("sqlite"):
+        if _is_memory_sqlite(database_url) or not settings.sqlite_tuned:
+            # Connect per session; the sync engine keeps a shared in-memory database alive
+            async_engine = create_async_engine(url, poolclass=NullPool, echo=settings.debug)
+        else:
+            # Async sessions only read: size them like the reader pool
+            async_engine = create_async_engine(
+                url, poolclass=AsyncAdaptedQueuePool, pool_size=settings.sqlite_reader_pool_size,
+                max_overflow=0, echo=settings.debug
+            )
+            event.listen(async_engine.sync_engine, "connect", _sqlite_pragmas(readonly=True))
+    else:
+        async_engine = create_async_engine(url, pool_pre_ping=True, pool_recycle=300, echo=settings.debug)
+    
+    AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+    logger.info(f"Async database engine created: {url}")
+    
+    if settings.database_replica_url:
+        async_replica_engine = create_async_engine(
+            async_database_url(settings.database_replica_url), pool_pre_ping=True, pool_recycle=300,
+            echo=settings.debug
+        )
+        AsyncReplicaSessionLocal = async_sessionmaker(async_replica_engine, expire_on_commit=False)
+
+
+def read_after(request: Optional[Request]) -> Optional[int]:
+    """The write position a client's reads must see, from its header or cookie."""
+    if request is None:
+        return None
+    return parse_lsn(request.headers.get(READ_AFTER_HEADER) or request.cookies.get(READ_AFTER_COOKIE))
+
+
+def _current_wal_lsn() -> str:
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT pg_current_wal_lsn()::text")).scalar()
+
+
+async def remember_write(response: Response):
+    """
+    After an ingestion write, hand the client the primary's WAL position so
+    its following reads wait for the replica to replay it (or use the primary).
+    """
+    if replica_monitor.engine is None or engine is None or engine.dialect.name != "postgresql":
+        return
+    lsn = await asyncio.to_thread(_current_wal_lsn)
+    response.headers[READ_AFTER_HEADER] = lsn
+    response.set_cookie(READ_AFTER_COOKIE, lsn, max_age=max(int(settings.replica_max_lag_seconds * 6), 60), httponly=True)
+
+
+async def get_async_db(request: Request = None):
+    """Get an asyncio database session (for read paths in async endpoints; uses the replica when fresh)."""
+    if not AsyncSessionLocal:
+        create_async_database_engine()
+    
+    session_factory = AsyncSessionLocal
+    if AsyncReplicaSessionLocal:
+        if replica_monitor.stale():
+            await asyncio.to_thread(replica_monitor.refresh)
+        if replica_monitor.usable(read_after(request), refresh=False):
+            session_factory = AsyncReplicaSessionLocal
+    
+    async with session_factory() as db:
+        yield db
+
+
 def get_db():
     """Get database session."""
     if not SessionLocal:
@@ -63,17 +360,61 @@ def get_db():
         db.close()
 
 
+def get_read_db(request: Request = None):
+    """Get a read-only database session (served by the replica when configured and fresh)."""
+    db = get_session(readonly=True)
+    db.info["read_after"] = read_after(request)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_session(readonly: bool = False):
+    """Create a standalone session for background services (caller closes it)."""
+    if not SessionLocal:
+        create_database_engine()
+    
+    db = SessionLocal()
+    if readonly:
+        db.info["readonly"] = True
+    return db
+
+
 def init_db():
     """Initialize database tables."""
     if not engine:
         create_database_engine()
     
+    # Make sure every model is registered on Base before creating tables
+    from . import models  # noqa: F401
+    
     Base.metadata.create_all(bind=engine)
-    logger.info("Database tables created successfully")
+    
+    # Bring existing tables up to the current schema version
+    from .migrations import run_migrations
+    version = run_migrations(engine)
+    
+    # Monthly partitions for builds on PostgreSQL (POSTGRES_PARTITIONING)
+    from .partitioning import partition_manager
+    partitioned = partition_manager.setup(engine)
+    logger.info(f"Database tables created successfully (schema v{version}{', partitioned' if partitioned else ''})")
+
+
+async def close_async_db():
+    """Close asyncio database connections."""
+    if async_replica_engine:
+        await async_replica_engine.dispose()
+    if async_engine:
+        await async_engine.dispose()
 
 
 def close_db():
     """Close database connections."""
+    if replica_engine:
+        replica_engine.dispose()
+    if read_engine:
+        read_engine.dispose()
     if engine:
         engine.dispose()
         logger.info("Database connections closed")
@@ -5,9 +5,19 @@ from datetime import datetime
 import os
 
 from .config import settings
-from .database import init_db, close_db
-from .api.endpoints import jenkins, analytics
+from .database import init_db, close_db, close_async_db, replica_monitor, READ_AFTER_HEADER
+from .api.endpoints import jenkins, analytics, exports
 from .services.job_monitor import job_monitor
+from .services.rollups import rollup_service
+from .services.window_counters import window_counters
+from .services.flakiness import flakiness_detector
+from .services.regression import duration_regression_detector
+from .services.delivery_metrics import delivery_metrics
+from .services.build_store import build_store
+from .services.health_evaluator import health_evaluator
+from .services.forecasting import load_forecaster
+from .services.correlation import failure_correlator
+from .services.build_writer import bulk_build_writer
 
 # Try to import the dashboard router from common locations without breaking existing code
 try:
@@ -36,6 +46,16 @@ app.include_router(stream_router.router)
 async def startup_event():
     """Initialize database on startup."""
     init_db()
+    # Rebuild in-memory rollups and duration sketches
+    rollup_service.load()
+    window_counters.rebuild_from_rollups()
+    flakiness_detector.warm_up()
+    duration_regression_detector.warm_up()
+    delivery_metrics.load_open_streaks()
+    build_store.load()
+    health_evaluator.evaluate()
+    failure_correlator.warm_up()
+    load_forecaster.train()
     # Start job monitoring service
     await job_monitor.start_monitoring()
 
@@ -43,6 +63,9 @@ async def startup_event():
 async def shutdown_event():
     """Close database connections on shutdown."""
     await job_monitor.stop_monitoring()
+    bulk_build_writer.flush()
+    rollup_service.flush()
+    await close_async_db()
     close_db()
 
 # CORS middleware for frontend dev server
@@ -52,6 +75,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Read-your-writes token returned by ingestion endpoints
+    expose_headers=[READ_AFTER_HEADER],
 )
 
 @app.get("/api/health")
@@ -60,7 +85,8 @@ async def health_check():
     return {
         "status": "healthy",
         "timestamp": datetime.utcnow().isoformat(),
-        "service": "backend"
+        "service": "backend",
+        "read_replica": replica_monitor.status()
     }
 
 @app.get("/api/version")
@@ -84,6 +110,7 @@ async def root():
 # EXISTING routers (keep)
 app.include_router(jenkins.router, prefix="/api")
 app.include_router(analytics.router, prefix="/api")
+app.include_router(exports.router, prefix="/api")
 
 # --- Added exactly as requested (with /api prefix to match your API shape) ---
 from app.routers import dashboard as dashboard_router  # type: ignore
@@ -100,3 +127,13 @@ from app.routers import compat as compat_router  # type: ignore
 app.include_router(compat_router.router)
 # ===================================================
 
+# Jenkins build webhooks (buffered into the bulk build writer)
+from app.routers import webhooks as webhooks_router  # type: ignore
+app.include_router(webhooks_router.router, prefix="/api")
+
+
+# Keyset-paginated listings of stored builds and pipelines
+from app.routers import builds as builds_router  # type: ignore
+from app.routers import pipelines as pipelines_router  # type: ignore
+app.include_router(builds_router.router)
+app.include_router(pipelines_router.router)
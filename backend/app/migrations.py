@@ -0,0 +1,135 @@
+"""
+Versioned schema migrations, applied at startup after ``create_all``.
+
+``create_all`` creates missing tables with the current schema but never
+alters existing ones. Each migration here brings an older database up to
+a schema version; applied versions are recorded in ``schema_version``.
+Migrations inspect before they alter, so they also run cleanly on a
+database that ``create_all`` just created at the latest schema.
+"""
+import logging
+from datetime import datetime
+from typing import Callable, List, Tuple
+from sqlalchemy import (
+    Column, DateTime, Float, Integer, MetaData, String, Table, inspect, select, text
+)
+from sqlalchemy.engine import Connection, Engine
+
+logger = logging.getLogger(__name__)
+
+schema_metadata = MetaData()
+schema_version = Table(
+    "schema_version", schema_metadata,
+    Column("version", Integer, primary_key=True),
+    Column("description", String(255), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+def _add_column(conn: Connection, table: str, column: Column):
+    """ALTER TABLE ADD COLUMN unless the column exists (columns must be nullable)."""
+    existing = {c["name"] for c in inspect(conn).get_columns(table)}
+    if column.name in existing:
+        return
+    column_type = column.type.compile(dialect=conn.dialect)
+    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column.name} {column_type}"))
+    logger.info(f"Added column {table}.{column.name}")
+
+
+def _create_index(conn: Connection, table: str, name: str, columns: List[str], unique: bool = False):
+    """Create an index unless one with the name, or an equivalent unique constraint, exists."""
+    inspector = inspect(conn)
+    indexes = inspector.get_indexes(table)
+    if any(i["name"] == name for i in indexes):
+        return
+    if unique:
+        # create_all on SQLite implements named unique constraints as unnamed autoindexes
+        constraints = inspector.get_unique_constraints(table)
+        if any(c["column_names"] == columns for c in constraints) or \
+                any(i["unique"] and i["column_names"] == columns for i in indexes):
+            return
+    conn.execute(text(f"CREATE {'UNIQUE ' if unique else ''}INDEX {name} ON {table} ({', '.join(columns)})"))
+    logger.info(f"Created index {name} on {table}")
+
+
+def _dedupe_builds(conn: Connection):
+    """Keep the newest row per (pipeline_name, build_number) so it can be made unique."""
+    duplicates = "SELECT id FROM builds WHERE id NOT IN " \
+                 "(SELECT MAX(id) FROM builds GROUP BY pipeline_name, build_number)"
+    # Point notifications at the surviving row before deleting the others
+    conn.execute(text(
+        "UPDATE notifications SET build_id = ("
+        " SELECT MAX(k.id) FROM builds k JOIN builds b"
+        " ON k.pipeline_name = b.pipeline_name AND k.build_number = b.build_number"
+        " WHERE b.id = notifications.build_id"
+        f") WHERE build_id IN ({duplicates})"
+    ))
+    removed = conn.execute(text(f"DELETE FROM builds WHERE id IN ({duplicates})")).rowcount
+    if removed:
+        logger.warning(f"Removed {removed} duplicate build rows")
+
+
+def _v1_baseline(conn: Connection):
+    """The schema as created by create_all before versioning."""
+
+
+def _v2_indexes(conn: Connection):
+    """Columns added since v1, unique build keys and composite/covering indexes."""
+    for table, column in (
+        ("builds", Column("built_on", String(255))),
+        ("builds", Column("queue_wait", Integer)),
+        ("build_rollups", Column("recovery_count", Integer)),
+        ("build_rollups", Column("recovery_seconds_sum", Float)),
+        ("build_rollups", Column("failure_streak_max", Integer)),
+    ):
+        _add_column(conn, table, column)
+
+    _dedupe_builds(conn)
+    _create_index(conn, "builds", "uq_builds_pipeline_build", ["pipeline_name", "build_number"], unique=True)
+    for name, columns in (
+        ("ix_builds_pipeline_timestamp", ["pipeline_name", "timestamp", "status", "duration"]),
+        ("ix_builds_status_timestamp_pipeline", ["status", "timestamp", "pipeline_name"]),
+        ("ix_builds_duration", ["duration"]),
+        ("ix_builds_queue_wait", ["queue_wait"]),
+    ):
+        _create_index(conn, "builds", name, columns)
+
+
+def _v3_retention(conn: Connection):
+    """Per-pipeline retention policies and archived console log locations."""
+    _add_column(conn, "pipelines", Column("retention_days", Integer))
+    _add_column(conn, "builds", Column("console_archive", String(500)))
+
+
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "baseline", _v1_baseline),
+    (2, "build columns, unique build keys and composite indexes", _v2_indexes),
+    (3, "retention policies and console log archives", _v3_retention),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def current_version(conn: Connection) -> int:
+    if not inspect(conn).has_table("schema_version"):
+        return 0
+    return conn.execute(select(schema_version.c.version).order_by(schema_version.c.version.desc())).scalar() or 0
+
+
+def run_migrations(engine: Engine) -> int:
+    """Apply pending migrations, each in its own transaction; returns the schema version."""
+    schema_metadata.create_all(bind=engine)
+    with engine.connect() as conn:
+        version = current_version(conn)
+
+    for target, description, migrate in MIGRATIONS:
+        if target <= version:
+            continue
+        with engine.begin() as conn:
+            migrate(conn)
+            conn.execute(schema_version.insert().values(
+                version=target, description=description, applied_at=datetime.utcnow()
+            ))
+        version = target
+        logger.info(f"Migrated schema to v{target}: {description}")
+    return version
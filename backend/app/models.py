@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Float, Text, ForeignKey, Enum as SQLEnum
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Float, Text, ForeignKey, Index, UniqueConstraint, Enum as SQLEnum
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.sql import func
 from datetime import datetime
 from enum import Enum
@@ -26,6 +26,18 @@ class PipelineHealth(str, Enum):
 class Build(Base):
     """Build model for storing CI/CD build data."""
     __tablename__ = "builds"
+    __table_args__ = (
+        # Conflict target for bulk upserts; one row per Jenkins build
+        UniqueConstraint("pipeline_name", "build_number", name="uq_builds_pipeline_build"),
+        # Per-pipeline time windows; covers status and duration so counts,
+        # success rates and average durations never read the table
+        Index("ix_builds_pipeline_timestamp", "pipeline_name", "timestamp", "status", "duration"),
+        # Top-N queries: ORDER BY duration / queue_wait DESC LIMIT n
+        Index("ix_builds_duration", "duration"),
+        Index("ix_builds_queue_wait", "queue_wait"),
+        # Failing-pipeline counts over a time range without touching the table
+        Index("ix_builds_status_timestamp_pipeline", "status", "timestamp", "pipeline_name"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     build_number = Column(Integer, nullable=False)
@@ -37,8 +49,12 @@ class Build(Base):
     branch = Column(String(255), nullable=True)
     commit_hash = Column(String(255), nullable=True)
     url = Column(String(500), nullable=True)
-    console_output = Column(Text, nullable=True)
-    parameters = Column(Text, nullable=True)  # JSON string
+    built_on = Column(String(255), nullable=True)  # Jenkins node that ran the build
+    queue_wait = Column(Integer, nullable=True)  # Seconds spent waiting in the queue
+    # Heavy columns load only when accessed or undeferred (group "heavy")
+    console_output = deferred(Column(Text, nullable=True), group="heavy")
+    parameters = deferred(Column(Text, nullable=True), group="heavy")  # JSON string
+    console_archive = Column(String(500), nullable=True)  # Archive file holding the moved console log
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
     
@@ -57,6 +73,7 @@ class Pipeline(Base):
     health_status = Column(SQLEnum(PipelineHealth), default=PipelineHealth.HEALTHY, index=True)
     failure_rate_threshold = Column(Float, default=0.2)
     build_time_threshold = Column(Integer, default=1800)  # 30 minutes in seconds
+    retention_days = Column(Integer, nullable=True)  # Raw build retention; None uses the default
     notification_channels = Column(Text, nullable=True)  # JSON string
     total_builds = Column(Integer, default=0)
     success_count = Column(Integer, default=0)
@@ -86,3 +103,46 @@ class Notification(Base):
     build = relationship("Build", back_populates="notifications")
     pipeline = relationship("Pipeline")
 
+
+
+class BuildRollup(Base):
+    """Hourly per-pipeline build aggregates, including a duration sketch."""
+    __tablename__ = "build_rollups"
+    __table_args__ = (
+        UniqueConstraint("pipeline_name", "bucket_start", name="uq_build_rollups_pipeline_bucket"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    pipeline_name = Column(String(255), nullable=False, index=True)
+    bucket_start = Column(DateTime, nullable=False, index=True)  # Start of the UTC hour
+    total_builds = Column(Integer, default=0)
+    success_count = Column(Integer, default=0)
+    failure_count = Column(Integer, default=0)
+    duration_count = Column(Integer, default=0)
+    duration_sum = Column(Float, default=0.0)  # Seconds
+    duration_sketch = Column(Text, nullable=True)  # Serialized DDSketch (JSON)
+    recovery_count = Column(Integer, default=0)  # Failure streaks that ended in this hour
+    recovery_seconds_sum = Column(Float, default=0.0)  # Time from first failure to next success
+    failure_streak_max = Column(Integer, default=0)  # Longest streak that ended in this hour
+    created_at = Column(DateTime, default=func.now())
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
+
+class CapacityRollup(Base):
+    """Daily executor-seconds and queue wait per pipeline and node."""
+    __tablename__ = "capacity_rollups"
+    __table_args__ = (
+        UniqueConstraint("day", "pipeline_name", "node_name", name="uq_capacity_rollups_day_pipeline_node"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    day = Column(DateTime, nullable=False, index=True)  # Start of the UTC day
+    pipeline_name = Column(String(255), nullable=False, index=True)
+    node_name = Column(String(255), nullable=False, index=True)
+    build_count = Column(Integer, default=0)
+    executor_seconds = Column(Float, default=0.0)
+    queue_wait_count = Column(Integer, default=0)  # Builds with a known queue wait
+    queue_wait_seconds = Column(Float, default=0.0)
+    queue_wait_max = Column(Float, default=0.0)
+    created_at = Column(DateTime, default=func.now())
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
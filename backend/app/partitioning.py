@@ -0,0 +1,197 @@
+"""
+Monthly range partitioning of ``builds`` on PostgreSQL.
+
+With ``POSTGRES_PARTITIONING`` on, ``builds`` is a table partitioned by
+range on ``timestamp`` with one partition per month (``builds_p2024_05``).
+Time-windowed queries only touch the partitions their range overlaps, and
+retention drops whole partitions instead of deleting rows one batch at a
+time.
+
+PostgreSQL requires unique constraints on a partitioned table to include
+the partition key, so the primary key becomes ``(id, timestamp)``, the
+build key ``(pipeline_name, build_number, timestamp)``, and
+``notifications.build_id`` loses its foreign key (retention deletes
+notifications with their builds instead).
+
+An existing plain ``builds`` table is converted once at startup, after the
+versioned migrations; partitions for the data's months and the next
+``partition_months_ahead`` months are created then and kept ahead by the
+retention job, and the bulk writer creates any other month it writes into.
+"""
+import logging
+import re
+import threading
+from datetime import datetime
+from typing import Iterable, List, Optional, Set, Tuple
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.schema import CreateIndex
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+PARTITION_PATTERN = re.compile(r"^builds_p(\d{4})_(\d{2})$")
+
+
+def month_start(ts: datetime) -> datetime:
+    return ts.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(month: datetime) -> str:
+    return f"builds_p{month:%Y_%m}"
+
+
+def partition_month(name: str) -> Optional[datetime]:
+    """The month a partition covers, from its name (None for other tables)."""
+    match = PARTITION_PATTERN.match(name)
+    return datetime(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+
+def partition_ddl(month: datetime) -> str:
+    end = add_months(month, 1)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF builds "
+        f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{end:%Y-%m-%d}')"
+    )
+
+
+class PartitionManager:
+    """Creates, lists and drops the monthly ``builds`` partitions."""
+
+    def __init__(self):
+        self.months_ahead = settings.partition_months_ahead
+        # Set once startup has found (or made) builds partitioned
+        self.partitioned = False
+        self._engine: Optional[Engine] = None
+        self._known: Set[datetime] = set()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def enabled(engine: Engine) -> bool:
+        return settings.postgres_partitioning and engine.dialect.name == "postgresql"
+
+    @staticmethod
+    def is_partitioned(conn: Connection) -> bool:
+        return bool(conn.execute(text(
+            "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+            "WHERE c.relname = 'builds' AND pg_table_is_visible(c.oid)"
+        )).scalar())
+
+    def partitions(self, conn: Connection) -> List[Tuple[str, datetime]]:
+        """Monthly partitions attached to ``builds``, oldest first."""
+        names = conn.execute(text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = 'builds'::regclass"
+        )).scalars().all()
+        months = [(name, partition_month(name)) for name in names]
+        return sorted((m for m in months if m[1] is not None), key=lambda m: m[1])
+
+    # --------------------------------------------------------------- creation
+
+    def _create(self, conn: Connection, months: Iterable[datetime]) -> int:
+        created = 0
+        for month in sorted(set(months)):
+            if month in self._known:
+                continue
+            conn.execute(text(partition_ddl(month)))
+            self._known.add(month)
+            created += 1
+        return created
+
+    def ensure(self, timestamps: Iterable[Optional[datetime]]) -> int:
+        """Create the partitions covering ``timestamps`` that do not exist yet."""
+        if not self.partitioned:
+            return 0
+        months = {month_start(ts) for ts in timestamps if ts is not None} - self._known
+        if not months:
+            return 0
+        with self._lock, self._engine.begin() as conn:
+            return self._create(conn, months)
+
+    def ensure_upcoming(self, now: Optional[datetime] = None) -> int:
+        """Create partitions for this month and the next ``months_ahead``."""
+        current = month_start(now or datetime.utcnow())
+        return self.ensure(add_months(current, i) for i in range(self.months_ahead + 1))
+
+    # --------------------------------------------------------------- dropping
+
+    def drop_before(self, cutoff: datetime) -> List[str]:
+        """Detach and drop partitions whose whole range is older than ``cutoff``."""
+        if not self.partitioned:
+            return []
+        dropped = []
+        with self._lock, self._engine.begin() as conn:
+            for name, month in self.partitions(conn):
+                if add_months(month, 1) > cutoff:
+                    break
+                conn.execute(text(f"ALTER TABLE builds DETACH PARTITION {name}"))
+                conn.execute(text(f"DROP TABLE {name}"))
+                self._known.discard(month)
+                dropped.append(name)
+        if dropped:
+            logger.info(f"Dropped build partitions: {', '.join(dropped)}")
+        return dropped
+
+    # ------------------------------------------------------------- conversion
+
+    def _convert(self, conn: Connection):
+        """Rebuild a plain ``builds`` table as a partitioned one, keeping its rows and ids."""
+        from .models import Build
+
+        conn.execute(text("LOCK TABLE builds IN ACCESS EXCLUSIVE MODE"))
+        conn.execute(text("UPDATE builds SET timestamp = COALESCE(created_at, now()) WHERE timestamp IS NULL"))
+        conn.execute(text("ALTER TABLE builds RENAME TO builds_unpartitioned"))
+        conn.execute(text(
+            "CREATE TABLE builds (LIKE builds_unpartitioned INCLUDING DEFAULTS) PARTITION BY RANGE (timestamp)"
+        ))
+
+        bounds = conn.execute(text("SELECT MIN(timestamp), MAX(timestamp) FROM builds_unpartitioned")).one()
+        now = month_start(datetime.utcnow())
+        first = month_start(bounds[0]) if bounds[0] else now
+        last = max(month_start(bounds[1]) if bounds[1] else now, add_months(now, self.months_ahead))
+        months, month = [], first
+        while month <= last:
+            months.append(month)
+            month = add_months(month, 1)
+        self._create(conn, months)
+
+        conn.execute(text("INSERT INTO builds SELECT * FROM builds_unpartitioned"))
+        # Keep the id sequence when the old table goes
+        sequence = conn.execute(text("SELECT pg_get_serial_sequence('builds_unpartitioned', 'id')")).scalar()
+        if sequence:
+            conn.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY builds.id"))
+        conn.execute(text("ALTER TABLE notifications DROP CONSTRAINT IF EXISTS notifications_build_id_fkey"))
+        conn.execute(text("DROP TABLE builds_unpartitioned"))
+
+        conn.execute(text("ALTER TABLE builds ADD PRIMARY KEY (id, timestamp)"))
+        conn.execute(text(
+            "ALTER TABLE builds ADD CONSTRAINT uq_builds_pipeline_build "
+            "UNIQUE (pipeline_name, build_number, timestamp)"
+        ))
+        for index in sorted(Build.__table__.indexes, key=lambda i: i.name):
+            conn.execute(CreateIndex(index))
+
+    def setup(self, engine: Engine) -> bool:
+        """Partition ``builds`` if enabled (converting a plain table); returns whether it is partitioned."""
+        self.partitioned = False
+        self._known = set()
+        if not self.enabled(engine):
+            return False
+        self._engine = engine
+        with engine.begin() as conn:
+            if not self.is_partitioned(conn):
+                self._convert(conn)
+                logger.info("Converted builds to a monthly partitioned table")
+            self._known = {month for _, month in self.partitions(conn)}
+        self.partitioned = True
+        self.ensure_upcoming()
+        return True
+
+
+# Global partition manager instance
+partition_manager = PartitionManager()
@@ -0,0 +1,167 @@
+from datetime import datetime, timedelta
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..config import settings
+from ..database import get_async_db, remember_write
+from ..models import Build, BuildStatus
+from ..services.build_repository import build_repository, ProjectionError
+from ..services.bulk_import import ndjson_importer, BulkImportError
+from ..services.pagination import CursorError, listing_counts
+from ..services.rollups import FAILURE_STATUSES
+from ..services.window_counters import window_counters
+
+router = APIRouter(prefix="/api/builds", tags=["builds"])
+
+FIELDS_DESCRIPTION = "Comma-separated fields to return (console_output and parameters only for a single build)"
+
+
+@router.get("")
+async def list_builds(
+    size: int = Query(settings.default_page_size, ge=1, le=settings.max_page_size, description="Page size"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    pipeline_name: Optional[str] = Query(None, description="Filter by pipeline name"),
+    status: Optional[BuildStatus] = Query(None, description="Filter by build status"),
+    triggered_by: Optional[str] = Query(None, description="Filter by user who triggered"),
+    start_date: Optional[datetime] = Query(None, description="Filter builds after this date"),
+    end_date: Optional[datetime] = Query(None, description="Filter builds before this date"),
+    sort_order: str = Query("desc", pattern="^(asc|desc)$", description="Order by timestamp"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    include_total: bool = Query(False, description="Also return the (cached) number of matching builds"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """List builds newest first, one keyset page at a time."""
+    try:
+        selected = build_repository.fields(fields)
+        filters = build_repository.filters(pipeline_name, status, triggered_by, start_date, end_date)
+        items, next_cursor = await build_repository.alist(
+            db, selected, filters, size=size, cursor=cursor, order=sort_order
+        )
+
+        data = {
+            "items": items,
+            "size": size,
+            "next_cursor": next_cursor,
+            "has_more": next_cursor is not None,
+        }
+        if include_total:
+            key = f"builds:{pipeline_name}:{status}:{triggered_by}:{start_date}:{end_date}"
+            data["total"], data["total_approximate"] = await listing_counts.acount(
+                db, key, select(Build.id).where(*filters), table=None if filters else "builds"
+            )
+        return {
+            "success": True,
+            "data": data,
+            "timestamp": datetime.utcnow().isoformat() + "Z"
+        }
+    except (CursorError, ProjectionError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to retrieve builds: {str(e)}")
+
+
+@router.get("/pipeline/{pipeline_name}/recent")
+async def get_recent_builds(
+    pipeline_name: str,
+    limit: int = Query(10, ge=1, le=50, description="Number of recent builds to return"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get recent builds for a specific pipeline."""
+    try:
+        items = await build_repository.arecent(db, pipeline_name, build_repository.fields(fields), limit=limit)
+        return {
+            "success": True,
+            "data": items,
+            "timestamp": datetime.utcnow().isoformat() + "Z"
+        }
+    except ProjectionError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to retrieve recent builds: {str(e)}")
+
+
+@router.get("/stats/overview")
+async def get_build_stats(
+    pipeline_name: Optional[str] = Query(None, description="Pipeline name (all pipelines if omitted)"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get build counts by outcome; recent activity comes from the sliding window counters."""
+    try:
+        stmt = select(Build.status, func.count()).group_by(Build.status)
+        if pipeline_name:
+            stmt = stmt.where(Build.pipeline_name == pipeline_name)
+        by_status = {status: count for status, count in (await db.execute(stmt)).all()}
+
+        total_builds = sum(by_status.values())
+        success_count = by_status.get(BuildStatus.SUCCESS, 0)
+        failure_count = sum(count for status, count in by_status.items() if status in FAILURE_STATUSES)
+        success_rate = (success_count / total_builds * 100) if total_builds > 0 else 0
+        return {
+            "success": True,
+            "data": {
+                "pipeline": pipeline_name,
+                "total_builds": total_builds,
+                "success_count": success_count,
+                "failure_count": failure_count,
+                "success_rate": round(success_rate, 2),
+                "builds_last_24h": window_counters.builds_in_window(pipeline_name, timedelta(days=1)),
+                "builds_last_7d": window_counters.builds_in_window(pipeline_name, timedelta(days=7)),
+            },
+            "timestamp": datetime.utcnow().isoformat() + "Z"
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to retrieve build stats: {str(e)}")
+
+
+@router.post("/bulk")
+async def bulk_import_builds(
+    request: Request,
+    response: Response,
+    backfill: bool = Query(True, description="Historical builds: update rollups and capacity only, without alerting detectors")
+):
+    """
+    Import builds from a streamed NDJSON body, one build record per line
+    (gzip-compressed bodies are detected and decompressed). Lines are
+    upserted in batches; invalid lines are reported by line number and do
+    not stop the import.
+    """
+    try:
+        report = await ndjson_importer.aimport(request.stream(), backfill=backfill)
+    except BulkImportError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to import builds: {str(e)}")
+    if report["inserted"] or report["updated"]:
+        # Reads that follow see the imported builds even from a lagging replica
+        await remember_write(response)
+    return {
+        "success": True,
+        "data": report,
+        "timestamp": datetime.utcnow().isoformat() + "Z"
+    }
+
+
+@router.get("/{build_id}")
+async def get_build(
+    build_id: int,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get a single build, including its console output and parameters."""
+    try:
+        build = await build_repository.aget(db, build_id, build_repository.fields(fields, detail=True))
+        if build is None:
+            raise HTTPException(status_code=404, detail="Build not found")
+        return {
+            "success": True,
+            "data": build,
+            "timestamp": datetime.utcnow().isoformat() + "Z"
+        }
+    except HTTPException:
+        raise
+    except ProjectionError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to retrieve build: {str(e)}")
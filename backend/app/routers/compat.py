@@ -1,5 +1,5 @@
 # backend/app/routers/compat.py
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Request
 from typing import List, Dict, Any
 from datetime import datetime, timedelta, timezone
 from collections import defaultdict
@@ -7,8 +7,10 @@ from urllib.parse import unquote
 
 # Reuse helpers and settings from the dashboard router
 from app.routers.dashboard import (
-    _get_json, _rewrite, JENKINS_URL, PUBLIC_BASE_URL
+    _get_json, _rewrite, _snapshot_response, summary_materializer, JENKINS_URL, PUBLIC_BASE_URL
 )
+from app.services.flakiness import flakiness_detector
+from app.services.downsampling import RESOLUTIONS, bucket_floor, fit_resolution, lttb_indices
 
 router = APIRouter()
 
@@ -26,68 +28,12 @@ def legacy_jenkins_node_health():
 
 @router.get("/api/metrics/overall")
 @router.get("/analytics/dashboard-summary")
-def legacy_overall_metrics():
+def legacy_overall_metrics(request: Request):
     """
-    Return a superset of summary metrics so different frontends can bind:
-      - totalPipelines / pipelinesCount
-      - totalBuilds / totalBuildsCount
-      - successRate (0..1) + successRatePercent (0..100)
-      - successCount / failureCount
-      - avgBuildTimeMinutes / avgBuildTimeSeconds
+    Serve the materialized summary (see _compute_overall_summary for fields)
+    with an ETag; unchanged data answers If-None-Match with a 304.
     """
-    jobs_doc = _get_json(f"{JENKINS_URL}/api/json?tree=jobs[name]")
-    if "__error__" in jobs_doc:
-        return {
-            "totalPipelines": 0, "pipelinesCount": 0,
-            "totalBuilds": 0, "totalBuildsCount": 0,
-            "successRate": 0.0, "successRatePercent": 0,
-            "successCount": 0, "failureCount": 0,
-            "avgBuildTimeMinutes": None, "avgBuildTimeSeconds": None,
-            "error": jobs_doc["__error__"],
-        }
-
-    jobs = jobs_doc.get("jobs", []) or []
-    total_pipelines = len(jobs)
-    total_builds = 0
-    successes = 0
-    failures = 0
-    durations: List[int] = []
-
-    for j in jobs:
-        name = j.get("name")
-        if not name:
-            continue
-        bdoc = _get_json(f"{JENKINS_URL}/job/{name}/api/json?tree=builds[number,url,result,duration,timestamp]")
-        builds = bdoc.get("builds", []) if isinstance(bdoc, dict) else []
-        total_builds += len(builds)
-        for b in builds:
-            if not isinstance(b, dict):
-                continue
-            result = b.get("result")
-            if result == "SUCCESS":
-                successes += 1
-            elif result in ("FAILURE", "FAILED", "UNSTABLE"):
-                failures += 1
-            d = b.get("duration")
-            if isinstance(d, (int, float)) and d >= 0:
-                durations.append(int(d))
-
-    success_rate = (successes / total_builds) if total_builds else 0.0
-    avg_minutes = (sum(durations) / len(durations) / 60000.0) if durations else None
-    avg_seconds = (sum(durations) / len(durations) / 1000.0) if durations else None
-
-    return {
-        "totalPipelines": total_pipelines,
-        "pipelinesCount": total_pipelines,                 # alias
-        "totalBuilds": total_builds,
-        "totalBuildsCount": total_builds,                  # alias
-        "successRate": success_rate,                       # 0..1
-        "successRatePercent": round(success_rate * 100),   # 0..100
-        "successCount": successes,
-        "failureCount": failures,
-        "avgBuildTimeMinutes": avg_minutes,
-        "avgBuildTimeSeconds": avg_seconds,
-    }
+    return _snapshot_response(request, summary_materializer.current())
 
 @router.get("/api/failed-builds")
 def legacy_failed_builds():
@@ -131,6 +77,7 @@ def legacy_pipelines():
     """Basic pipelines list (name + url) used by some tables."""
     data = _get_json(f"{JENKINS_URL}/api/json?tree=jobs[name,url]")
     jobs = data.get("jobs", []) if isinstance(data, dict) else []
+    scores = flakiness_detector.scores()
     out = []
     for j in jobs:
         if not isinstance(j, dict):
@@ -138,6 +85,7 @@ def legacy_pipelines():
         out.append({
             "name": j.get("name"),
             "url": _rewrite(j.get("url", "")),
+            "flakinessScore": scores.get(j.get("name"), 0.0),
         })
     return out
 
@@ -161,9 +109,9 @@ def legacy_trigger_collection(manual: int = 0):
 
 @router.get("/api/metrics")
 @router.get("/api/metrics/summary")
-def legacy_metrics_alias():
+def legacy_metrics_alias(request: Request):
     # reuse the rich object from /api/metrics/overall
-    return legacy_overall_metrics()
+    return legacy_overall_metrics(request)
 
 @router.get("/api/jenkins/health")
 @router.get("/api/jenkins/healthz")
@@ -184,24 +132,33 @@ def legacy_jobs_alias_simple():
 
 # --- Trend endpoint for charts ---
 @router.get("/api/metrics/build-trend")
-def legacy_build_trend(windowHours: int = 24):
+def legacy_build_trend(windowHours: int = 24, resolution: str = "hour", maxPoints: int = 1000):
     """
-    Return hourly buckets for the last N hours:
+    Return buckets (minute/hour/day/week) for the last N hours:
       {
         "buckets": ["2025-08-26T09:00Z", ...],
         "success": [2,1,0,...],
         "failed": [0,0,1,...],
-        "avgDurationMs": [6123, 7000, ...]
+        "avgDurationMs": [6123, 7000, ...],
+        "resolution": "hour"
       }
+    If the window needs more than maxPoints buckets at the requested
+    resolution, the next coarser resolution that fits is used instead, so
+    the counts stay exact. A window too long even for weekly buckets is
+    LTTB-sampled on the build count, so the payload never exceeds maxPoints.
     """
+    if resolution not in RESOLUTIONS:
+        raise HTTPException(status_code=400, detail=f"resolution must be one of: {', '.join(RESOLUTIONS)}")
     now = datetime.now(timezone.utc)
     start = now - timedelta(hours=max(1, windowHours))
-    # Build empty buckets per hour
+    max_points = max(2, maxPoints)
+    resolution = fit_resolution(now - start, resolution, max_points)
+    # Build empty buckets per resolution step
     buckets = []
-    cursor = start.replace(minute=0, second=0, microsecond=0)
+    cursor = bucket_floor(start, resolution)
     while cursor <= now:
         buckets.append(cursor)
-        cursor += timedelta(hours=1)
+        cursor += RESOLUTIONS[resolution]
 
     # Aggregate builds
     success_counts = defaultdict(int)
@@ -225,7 +182,7 @@ def legacy_build_trend(windowHours: int = 24):
             when = datetime.fromtimestamp(ts / 1000, tz=timezone.utc)
             if when < start:
                 continue
-            bucket_key = when.replace(minute=0, second=0, microsecond=0)
+            bucket_key = bucket_floor(when, resolution)
             res = b.get("result")
             if res == "SUCCESS":
                 success_counts[bucket_key] += 1
@@ -242,7 +199,11 @@ def legacy_build_trend(windowHours: int = 24):
     failed  = [failed_counts[b] for b in buckets]
     avgDur  = [int(duration_sums[b] / duration_counts[b]) if duration_counts[b] else 0 for b in buckets]
 
-    return {"buckets": labels, "success": success, "failed": failed, "avgDurationMs": avgDur}
+    if len(buckets) > max_points:
+        keep = lttb_indices(range(len(buckets)), [s + f for s, f in zip(success, failed)], max_points)
+        labels, success, failed, avgDur = ([series[i] for i in keep] for series in (labels, success, failed, avgDur))
+
+    return {"buckets": labels, "success": success, "failed": failed, "avgDurationMs": avgDur, "resolution": resolution}
 
 # --- Per-pipeline builds endpoint expected by UI ---
 @router.get("/api/pipelines/{job}/builds")
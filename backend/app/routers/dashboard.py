@@ -1,8 +1,11 @@
-from fastapi import APIRouter
-from typing import List, Dict, Any
-import os, json, base64
+from fastapi import APIRouter, Request as HTTPRequest, Response
+from typing import List, Dict, Any, Mapping
+import os, json, base64, hashlib
 from urllib.request import Request, urlopen
 from urllib.error import HTTPError, URLError
+from app.services.flakiness import flakiness_detector
+from app.services.ingestion import build_ingestion_service
+from app.services.summary import SummaryMaterializer, SummarySnapshot
 
 router = APIRouter(prefix="/api/dashboard", tags=["dashboard"])
 
@@ -45,17 +48,33 @@ def dashboard_health():
     names = [j.get("name") for j in jobs if isinstance(j, dict) and j.get("name")]
     return {"status": "UP", "jobs": len(names), "url": PUBLIC_BASE_URL, "port": 8080, "jobNames": names}
 
-@router.get("/summary")
-def dashboard_summary():
+def _compute_overall_summary() -> Dict[str, Any]:
+    """
+    Walk every job's builds and return a superset of summary metrics so
+    different frontends can bind:
+      - totalPipelines / pipelinesCount
+      - totalBuilds / totalBuildsCount
+      - successRate (0..1) + successRatePercent (0..100)
+      - successCount / failureCount
+      - avgBuildTimeMinutes / avgBuildTimeSeconds
+    """
     jobs_doc = _get_json(f"{JENKINS_URL}/api/json?tree=jobs[name]")
     if "__error__" in jobs_doc:
-        return {"totalPipelines": 0, "totalBuilds": 0, "successRate": 0.0, "avgBuildTimeMinutes": None, "error": jobs_doc["__error__"]}
+        return {
+            "totalPipelines": 0, "pipelinesCount": 0,
+            "totalBuilds": 0, "totalBuildsCount": 0,
+            "successRate": 0.0, "successRatePercent": 0,
+            "successCount": 0, "failureCount": 0,
+            "avgBuildTimeMinutes": None, "avgBuildTimeSeconds": None,
+            "error": jobs_doc["__error__"],
+        }
 
     jobs = jobs_doc.get("jobs", []) or []
     total_pipelines = len(jobs)
     total_builds = 0
     successes = 0
-    durations_ms: List[int] = []
+    failures = 0
+    durations: List[int] = []
 
     for j in jobs:
         name = j.get("name") if isinstance(j, dict) else None
@@ -67,20 +86,69 @@ def dashboard_summary():
         for b in builds:
             if not isinstance(b, dict):
                 continue
-            if b.get("result") == "SUCCESS":
+            result = b.get("result")
+            if result == "SUCCESS":
                 successes += 1
+            elif result in ("FAILURE", "FAILED", "UNSTABLE"):
+                failures += 1
             d = b.get("duration")
             if isinstance(d, (int, float)) and d >= 0:
-                durations_ms.append(int(d))
+                durations.append(int(d))
 
     success_rate = (successes / total_builds) if total_builds else 0.0
-    avg_minutes = (sum(durations_ms) / len(durations_ms) / 60000.0) if durations_ms else None
+    avg_minutes = (sum(durations) / len(durations) / 60000.0) if durations else None
+    avg_seconds = (sum(durations) / len(durations) / 1000.0) if durations else None
+
     return {
         "totalPipelines": total_pipelines,
+        "pipelinesCount": total_pipelines,                 # alias
         "totalBuilds": total_builds,
-        "successRate": success_rate,
+        "totalBuildsCount": total_builds,                  # alias
+        "successRate": success_rate,                       # 0..1
+        "successRatePercent": round(success_rate * 100),   # 0..100
+        "successCount": successes,
+        "failureCount": failures,
         "avgBuildTimeMinutes": avg_minutes,
+        "avgBuildTimeSeconds": avg_seconds,
+        "flakinessScores": flakiness_detector.scores(),   # name -> 0..1 flip rate
+    }
+
+def _summary_fingerprint() -> str:
+    # One cheap call: a new or finished build changes lastBuild/color
+    data = _get_json(f"{JENKINS_URL}/api/json?tree=jobs[name,color,lastBuild[number]]")
+    raw = json.dumps(data, sort_keys=True) + f"|{build_ingestion_service.version}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+def _dashboard_view(summary: Mapping[str, Any]) -> Dict[str, Any]:
+    view = {
+        "totalPipelines": summary["totalPipelines"],
+        "totalBuilds": summary["totalBuilds"],
+        "successRate": summary["successRate"],
+        "avgBuildTimeMinutes": summary["avgBuildTimeMinutes"],
     }
+    if "error" in summary:
+        view["error"] = summary["error"]
+    else:
+        view["flakinessScores"] = summary["flakinessScores"]
+    return view
+
+# Shared by every summary alias so they all serve one materialized result
+summary_materializer = SummaryMaterializer(_compute_overall_summary, _summary_fingerprint)
+summary_materializer.register_view("dashboard", _dashboard_view)
+
+def _snapshot_response(request: HTTPRequest, snapshot: SummarySnapshot) -> Response:
+    headers = {
+        "ETag": snapshot.etag,
+        "Cache-Control": "no-cache",
+        "X-Summary-Version": str(snapshot.version),
+    }
+    if snapshot.matches(request.headers.get("if-none-match")):
+        return Response(status_code=304, headers=headers)
+    return Response(content=snapshot.body, media_type="application/json", headers=headers)
+
+@router.get("/summary")
+def dashboard_summary(request: HTTPRequest):
+    return _snapshot_response(request, summary_materializer.view("dashboard"))
 
 @router.get("/recent-builds")
 def dashboard_recent_builds(limit: int = 25):
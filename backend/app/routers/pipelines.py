@@ -0,0 +1,100 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..config import settings
+from ..database import get_async_db
+from ..models import Pipeline, PipelineHealth
+from ..services.advice import pipeline_advice
+from ..services.health_evaluator import health_evaluator
+from ..services.pagination import CursorError, Keyset, listing_counts
+
+# The legacy Jenkins job list owns GET /api/pipelines (see compat)
+router = APIRouter(prefix="/api/pipelines", tags=["pipelines"])
+
+KEYSETS = {
+    order: Keyset("pipelines", Pipeline.name, Pipeline.id, descending=order == "desc")
+    for order in ("asc", "desc")
+}
+
+
+def _pipeline_dict(pipeline: Pipeline) -> Dict[str, Any]:
+    return {
+        "id": pipeline.id,
+        "name": pipeline.name,
+        "description": pipeline.description,
+        "jenkins_job_name": pipeline.jenkins_job_name,
+        "health_status": pipeline.health_status.value if pipeline.health_status else None,
+        "total_builds": pipeline.total_builds,
+        "success_count": pipeline.success_count,
+        "failure_count": pipeline.failure_count,
+        "average_duration": pipeline.average_duration,
+        "last_build_status": pipeline.last_build_status.value if pipeline.last_build_status else None,
+        "last_build_timestamp": pipeline.last_build_timestamp,
+    }
+
+
+@router.get("/page")
+async def list_pipelines(
+    size: int = Query(settings.default_page_size, ge=1, le=settings.max_page_size, description="Page size"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    health_status: Optional[PipelineHealth] = Query(None, description="Filter by health status"),
+    sort_order: str = Query("asc", pattern="^(asc|desc)$", description="Order by name"),
+    include_total: bool = Query(False, description="Also return the (cached) number of matching pipelines"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """List stored pipelines by name, one keyset page at a time."""
+    try:
+        filters = [Pipeline.health_status == health_status] if health_status else []
+        keyset = KEYSETS[sort_order]
+        stmt = select(Pipeline).where(*filters)
+        pipelines = (await db.execute(keyset.apply(stmt, cursor, size))).scalars().all()
+        pipelines, next_cursor = keyset.page(pipelines, size)
+
+        data = {
+            "items": [_pipeline_dict(p) for p in pipelines],
+            "size": size,
+            "next_cursor": next_cursor,
+            "has_more": next_cursor is not None,
+        }
+        if include_total:
+            data["total"], data["total_approximate"] = await listing_counts.acount(
+                db, f"pipelines:{health_status}", select(Pipeline.id).where(*filters),
+                table=None if filters else "pipelines"
+            )
+        return {
+            "success": True,
+            "data": data,
+            "timestamp": datetime.utcnow().isoformat() + "Z"
+        }
+    except CursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to retrieve pipelines: {str(e)}")
+
+
+@router.get("/health/summary")
+async def get_pipeline_health_summary():
+    """Get summary of pipeline health statuses from the last batch health evaluation."""
+    try:
+        return {
+            "success": True,
+            "data": health_evaluator.summary(),
+            "timestamp": datetime.utcnow().isoformat() + "Z"
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to retrieve health summary: {str(e)}")
+
+
+@router.get("/{pipeline_name}/advice")
+async def get_pipeline_advice(pipeline_name: str):
+    """Get improvement advice for a pipeline, including any active duration regression."""
+    try:
+        return {
+            "success": True,
+            "data": {"pipeline": pipeline_name, "advice": pipeline_advice(pipeline_name)},
+            "timestamp": datetime.utcnow().isoformat() + "Z"
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to generate advice: {str(e)}")
@@ -1,8 +1,12 @@
-from fastapi import APIRouter, Request
+import asyncio
+from fastapi import APIRouter, Request, Response
+from ..database import remember_write
+from ..services.build_writer import bulk_build_writer
+from ..services.ingestion import build_record_from_jenkins
 router = APIRouter()
 
 @router.post("/webhooks/jenkins")
-async def jenkins_webhook(req: Request):
+async def jenkins_webhook(req: Request, response: Response):
     p = await req.json()
     # extract minimal fields safely
     build = (p.get("build") or {})
@@ -14,6 +18,19 @@ async def jenkins_webhook(req: Request):
         "durationMs": build.get("duration") or p.get("duration") or p.get("durationMs"),
         "timestamp": build.get("timestamp") or p.get("timestamp"),
     }
-    # TODO: upsert into your storage or cache; optionally broadcast SSE
-    return {"status":"ok", **out}
-
+    # Completed builds are buffered and upserted in batches by the bulk writer
+    record = build_record_from_jenkins(job, {
+        "number": out["number"],
+        "result": out["result"],
+        "duration": out["durationMs"],
+        "timestamp": out["timestamp"],
+        "url": build.get("full_url") or build.get("url"),
+    }) if job else None
+    if record:
+        # Adding may flush a full batch; both write to the database off the event loop
+        await asyncio.to_thread(bulk_build_writer.add, [record])
+        written = await asyncio.to_thread(bulk_build_writer.flush_if_due)
+        if written["inserted"] or written["updated"]:
+            # Reads that follow see this build even from a lagging replica
+            await remember_write(response)
+    return {"status":"ok", "queued": record is not None, **out}
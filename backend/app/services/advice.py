@@ -0,0 +1,115 @@
+from datetime import timedelta
+from typing import Any, Dict, List
+from ..config import settings
+from ..models import PipelineHealth
+from .health_evaluator import health_evaluator
+from .regression import duration_regression_detector
+from .rollups import rollup_service
+from .window_counters import window_counters
+
+
+def _advice(category: str, title: str, description: str, priority: str,
+            action_items: List[str], documentation_links: List[str]) -> Dict[str, Any]:
+    return {
+        "category": category,
+        "title": title,
+        "description": description,
+        "priority": priority,
+        "action_items": action_items,
+        "documentation_links": documentation_links,
+    }
+
+
+def pipeline_advice(pipeline_name: str) -> List[Dict[str, Any]]:
+    """
+    Improvement advice for a pipeline from the live analytics state: rollup
+    totals over the health window, the 24h window counter, the duration
+    regression detector and the last batch health evaluation.
+    """
+    totals = rollup_service.window_totals(pipeline_name, days=settings.health_window_days)
+    failure_rate = totals["failure_count"] / totals["total_builds"] * 100 if totals["total_builds"] else 0
+    average_duration = totals["duration_sum"] / totals["duration_count"] if totals["duration_count"] else 0
+    advice_list = []
+
+    if failure_rate > 20:
+        advice_list.append(_advice(
+            "Reliability", "High Failure Rate Detected",
+            f"Pipeline has a {failure_rate:.1f}% failure rate, which is above the recommended threshold.",
+            "High",
+            [
+                "Review recent build failures and identify common patterns",
+                "Check for flaky tests and implement retry mechanisms",
+                "Review dependency management and version conflicts",
+                "Consider implementing better error handling in build scripts"
+            ],
+            [
+                "https://jenkins.io/doc/book/pipeline/best-practices/",
+                "https://www.jenkins.io/doc/book/pipeline/troubleshooting/"
+            ]
+        ))
+
+    if average_duration > 1800:  # 30 minutes
+        advice_list.append(_advice(
+            "Performance", "Long Build Duration",
+            f"Average build duration is {average_duration/60:.1f} minutes, which may impact development velocity.",
+            "Medium",
+            [
+                "Analyze build steps and identify bottlenecks",
+                "Consider parallelizing independent build steps",
+                "Review test execution time and optimize slow tests",
+                "Implement build caching for dependencies"
+            ],
+            [
+                "https://jenkins.io/doc/book/pipeline/best-practices/#parallel",
+                "https://www.jenkins.io/doc/book/pipeline/syntax/#parallel"
+            ]
+        ))
+
+    # A recent, statistically significant slowdown
+    regression = duration_regression_detector.active_regression(pipeline_name)
+    if regression:
+        advice_list.append(_advice(
+            "Performance", "Build Duration Regression",
+            f"Builds slowed from {regression['baseline_seconds']/60:.1f} to "
+            f"{regression['current_seconds']/60:.1f} minutes (+{regression['increase_pct']:.0f}%) "
+            f"starting around build #{regression['build_number']}.",
+            "High",
+            [
+                "Compare the changes merged just before the flagged build",
+                "Check for dependency or cache invalidation in the slow builds",
+                "Review agent load and resource contention at the time of the shift"
+            ],
+            ["https://jenkins.io/doc/book/pipeline/best-practices/"]
+        ))
+
+    if window_counters.builds_in_window(pipeline_name, timedelta(days=1)) == 0:
+        advice_list.append(_advice(
+            "Activity", "No Recent Build Activity",
+            "No builds have been triggered in the last 24 hours.",
+            "Low",
+            [
+                "Verify the pipeline is still needed and active",
+                "Check if there are any issues preventing builds",
+                "Review pipeline configuration and triggers"
+            ],
+            ["https://jenkins.io/doc/book/pipeline/syntax/#triggers"]
+        ))
+
+    if health_evaluator.status(pipeline_name) == PipelineHealth.UNHEALTHY:
+        advice_list.append(_advice(
+            "Health", "Pipeline Health Issues",
+            "Pipeline is marked as unhealthy due to poor performance or reliability metrics.",
+            "High",
+            [
+                "Immediately review and address the root causes",
+                "Implement additional monitoring and alerting",
+                "Consider temporarily disabling the pipeline if critical",
+                "Plan for pipeline refactoring or replacement"
+            ],
+            [
+                "https://jenkins.io/doc/book/pipeline/best-practices/",
+                "https://www.jenkins.io/doc/book/pipeline/troubleshooting/"
+            ]
+        ))
+
+    return advice_list
@@ -0,0 +1,304 @@
+import json
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+from sqlalchemy import and_, case, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..database import get_session
+from ..models import Build, BuildRollup, BuildStatus
+from .rollups import FAILURE_STATUSES
+from .sketches import DDSketch
+
+logger = logging.getLogger(__name__)
+
+SOURCES = ("builds", "rollups")
+METRICS = ("count", "success_rate", "failure_rate", "avg_duration", "p95_duration")
+# Dimensions available on each source
+DIMENSIONS = {
+    "builds": ("pipeline", "branch", "triggered_by", "status", "node", "hour", "day"),
+    "rollups": ("pipeline", "hour", "day"),
+}
+FILTERS = ("pipeline", "branch", "triggered_by", "status", "node")
+
+
+class AggregationError(ValueError):
+    """Raised for an invalid aggregation query."""
+
+
+def _time_bucket(column, unit: str, dialect: str):
+    """Truncate a timestamp column to the hour or day in SQL."""
+    if dialect == "postgresql":
+        return func.date_trunc(unit, column)
+    fmt = "%Y-%m-%dT%H:00:00" if unit == "hour" else "%Y-%m-%d"
+    return func.strftime(fmt, column)
+
+
+def _format_key(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, BuildStatus):
+        return value.value
+    return value
+
+
+class AggregationService:
+    """
+    Compiles group-by queries over builds or rollups into one SQL statement.
+
+    A query names dimensions, metrics and filters; it is validated,
+    normalized (so equivalent queries share a cache entry) and turned into
+    a single ``GROUP BY``. The p95 duration on builds is computed in SQL with
+    a ranked window per group; on rollups it comes from merged sketches.
+    """
+
+    def __init__(self):
+        self._cache: Dict[str, Any] = {}
+        self._cache_ttl = settings.aggregate_cache_ttl
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------ cache
+
+    def invalidate(self):
+        """Drop cached results (called when new builds are ingested)."""
+        with self._lock:
+            self._cache.clear()
+
+    def _get_cached(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry and time.time() - entry[0] < self._cache_ttl:
+                return entry[1]
+            self._cache.pop(key, None)
+        return None
+
+    def _set_cached(self, key: str, rows: List[Dict[str, Any]]):
+        with self._lock:
+            if len(self._cache) >= 256:
+                # Drop the oldest entry to keep the cache bounded
+                self._cache.pop(min(self._cache, key=lambda k: self._cache[k][0]))
+            self._cache[key] = (time.time(), rows)
+
+    # ------------------------------------------------------------- validation
+
+    def normalize(self, source: str, group_by: Sequence[str], metrics: Sequence[str],
+                  filters: Optional[Dict[str, Any]] = None, start: Optional[datetime] = None,
+                  end: Optional[datetime] = None, limit: int = 1000) -> Dict[str, Any]:
+        """Validate a query and put it in canonical form."""
+        if source not in SOURCES:
+            raise AggregationError(f"Source must be one of: {', '.join(SOURCES)}")
+        dims = list(dict.fromkeys(group_by))
+        unknown = [d for d in dims if d not in DIMENSIONS[source]]
+        if unknown:
+            raise AggregationError(f"Unsupported dimensions for {source}: {', '.join(unknown)}")
+        if not metrics:
+            metrics = ["count"]
+        bad_metrics = [m for m in metrics if m not in METRICS]
+        if bad_metrics:
+            raise AggregationError(f"Unsupported metrics: {', '.join(bad_metrics)}")
+
+        filters = {k: v for k, v in (filters or {}).items() if v is not None}
+        allowed_filters = [f for f in FILTERS if f == "pipeline" or source == "builds"]
+        bad_filters = [f for f in filters if f not in allowed_filters]
+        if bad_filters:
+            raise AggregationError(f"Unsupported filters for {source}: {', '.join(bad_filters)}")
+        if "status" in filters and filters["status"] not in BuildStatus.__members__:
+            raise AggregationError(f"Unknown status: {filters['status']}")
+
+        return {
+            "source": source,
+            "group_by": dims,
+            "metrics": sorted(set(metrics), key=METRICS.index),
+            "filters": dict(sorted(filters.items())),
+            "start": start.isoformat() if start else None,
+            "end": end.isoformat() if end else None,
+            "limit": limit,
+        }
+
+    # -------------------------------------------------------------- execution
+
+    def query(self, source: str, group_by: Sequence[str], metrics: Sequence[str],
+              filters: Optional[Dict[str, Any]] = None, start: Optional[datetime] = None,
+              end: Optional[datetime] = None, limit: int = 1000) -> Dict[str, Any]:
+        spec = self.normalize(source, group_by, metrics, filters, start, end, limit)
+        key = json.dumps(spec, sort_keys=True)
+
+        rows = self._get_cached(key)
+        cached = rows is not None
+        if not cached:
+            db = get_session(readonly=True)
+            try:
+                rows = self._execute(db, spec, start, end)
+            finally:
+                db.close()
+            self._set_cached(key, rows)
+
+        return {"query": spec, "cached": cached, "rows": rows}
+
+    async def aquery(self, db: AsyncSession, source: str, group_by: Sequence[str], metrics: Sequence[str],
+                     filters: Optional[Dict[str, Any]] = None, start: Optional[datetime] = None,
+                     end: Optional[datetime] = None, limit: int = 1000) -> Dict[str, Any]:
+        """``query`` on an asyncio session; the same statements run without blocking the loop."""
+        spec = self.normalize(source, group_by, metrics, filters, start, end, limit)
+        key = json.dumps(spec, sort_keys=True)
+
+        rows = self._get_cached(key)
+        cached = rows is not None
+        if not cached:
+            rows = await db.run_sync(lambda session: self._execute(session, spec, start, end))
+            self._set_cached(key, rows)
+
+        return {"query": spec, "cached": cached, "rows": rows}
+
+    def _execute(self, db: Session, spec: Dict[str, Any], start, end) -> List[Dict[str, Any]]:
+        if spec["source"] == "builds":
+            return self._query_builds(db, spec, start, end)
+        return self._query_rollups(db, spec, start, end)
+
+    def _builds_filters(self, spec: Dict[str, Any], start, end) -> List[Any]:
+        columns = {
+            "pipeline": Build.pipeline_name,
+            "branch": Build.branch,
+            "triggered_by": Build.triggered_by,
+            "status": Build.status,
+            "node": Build.built_on,
+        }
+        conditions = [columns[name] == value for name, value in spec["filters"].items()]
+        if start:
+            conditions.append(Build.timestamp >= start)
+        if end:
+            conditions.append(Build.timestamp < end)
+        return conditions
+
+    def _query_builds(self, db, spec: Dict[str, Any], start, end) -> List[Dict[str, Any]]:
+        dialect = db.get_bind().dialect.name
+        dimension_columns = {
+            "pipeline": Build.pipeline_name,
+            "branch": Build.branch,
+            "triggered_by": Build.triggered_by,
+            "status": Build.status,
+            "node": Build.built_on,
+            "hour": _time_bucket(Build.timestamp, "hour", dialect),
+            "day": _time_bucket(Build.timestamp, "day", dialect),
+        }
+        dims = [dimension_columns[d].label(d) for d in spec["group_by"]]
+        conditions = self._builds_filters(spec, start, end)
+        metrics = spec["metrics"]
+
+        total = func.count(Build.id)
+        selected = [total.label("count")]
+        if "success_rate" in metrics:
+            successes = func.sum(case((Build.status == BuildStatus.SUCCESS, 1), else_=0))
+            selected.append((successes * 100.0 / total).label("success_rate"))
+        if "failure_rate" in metrics:
+            failures = func.sum(case((Build.status.in_(FAILURE_STATUSES), 1), else_=0))
+            selected.append((failures * 100.0 / total).label("failure_rate"))
+        if "avg_duration" in metrics:
+            selected.append(func.avg(Build.duration).label("avg_duration"))
+
+        query = db.query(*dims, *selected)
+        if conditions:
+            query = query.filter(and_(*conditions))
+        if dims:
+            query = query.group_by(*dims).order_by(total.desc())
+        results = [self._row(r, spec["group_by"], metrics) for r in query.limit(spec["limit"]).all()]
+
+        if "p95_duration" in metrics:
+            p95 = self._builds_p95(db, dims, conditions)
+            for row in results:
+                row["p95_duration"] = p95.get(tuple(row[d] for d in spec["group_by"]))
+        return results
+
+    def _builds_p95(self, db, dims, conditions) -> Dict[tuple, float]:
+        """Nearest-rank p95 per group using window functions (works on SQLite and Postgres)."""
+        partition = [d.element for d in dims] or None
+        ranked_query = db.query(
+            *dims,
+            Build.duration.label("duration"),
+            func.row_number().over(partition_by=partition, order_by=Build.duration).label("rn"),
+            func.count(Build.id).over(partition_by=partition).label("cnt")
+        ).filter(Build.duration.isnot(None))
+        if conditions:
+            ranked_query = ranked_query.filter(and_(*conditions))
+        ranked = ranked_query.subquery()
+
+        group_columns = [ranked.c[d.name] for d in dims]
+        rows = db.query(*group_columns, func.min(ranked.c.duration)).filter(
+            ranked.c.rn >= ranked.c.cnt * 0.95
+        ).group_by(*group_columns).all() if group_columns else db.query(
+            func.min(ranked.c.duration)
+        ).filter(ranked.c.rn >= ranked.c.cnt * 0.95).all()
+
+        return {tuple(_format_key(v) for v in row[:-1]): row[-1] for row in rows}
+
+    def _query_rollups(self, db, spec: Dict[str, Any], start, end) -> List[Dict[str, Any]]:
+        dialect = db.get_bind().dialect.name
+        dimension_columns = {
+            "pipeline": BuildRollup.pipeline_name,
+            "hour": _time_bucket(BuildRollup.bucket_start, "hour", dialect),
+            "day": _time_bucket(BuildRollup.bucket_start, "day", dialect),
+        }
+        dims = [dimension_columns[d].label(d) for d in spec["group_by"]]
+        metrics = spec["metrics"]
+
+        conditions = []
+        pipeline = spec["filters"].get("pipeline")
+        if pipeline:
+            conditions.append(BuildRollup.pipeline_name == pipeline)
+        if start:
+            conditions.append(BuildRollup.bucket_start >= start)
+        if end:
+            conditions.append(BuildRollup.bucket_start < end)
+
+        total = func.sum(BuildRollup.total_builds)
+        selected = [total.label("count")]
+        if "success_rate" in metrics:
+            selected.append((func.sum(BuildRollup.success_count) * 100.0 / total).label("success_rate"))
+        if "failure_rate" in metrics:
+            selected.append((func.sum(BuildRollup.failure_count) * 100.0 / total).label("failure_rate"))
+        if "avg_duration" in metrics:
+            selected.append(
+                (func.sum(BuildRollup.duration_sum) / func.nullif(func.sum(BuildRollup.duration_count), 0))
+                .label("avg_duration")
+            )
+
+        query = db.query(*dims, *selected)
+        if conditions:
+            query = query.filter(and_(*conditions))
+        if dims:
+            query = query.group_by(*dims).order_by(total.desc())
+        results = [self._row(r, spec["group_by"], metrics) for r in query.limit(spec["limit"]).all()]
+
+        if "p95_duration" in metrics:
+            sketches: Dict[tuple, DDSketch] = {}
+            sketch_rows = db.query(*dims, BuildRollup.duration_sketch).filter(
+                BuildRollup.duration_sketch.isnot(None), *conditions
+            ).all()
+            for row in sketch_rows:
+                key = tuple(_format_key(v) for v in row[:-1])
+                sketch = DDSketch.from_json(row[-1])
+                if key in sketches:
+                    sketches[key].merge(sketch)
+                else:
+                    sketches[key] = sketch
+            for row in results:
+                sketch = sketches.get(tuple(row[d] for d in spec["group_by"]))
+                row["p95_duration"] = round(sketch.quantile(0.95), 2) if sketch and sketch.count else None
+        return results
+
+    @staticmethod
+    def _row(result, dims: List[str], metrics: List[str]) -> Dict[str, Any]:
+        row = {d: _format_key(getattr(result, d)) for d in dims}
+        row["count"] = int(result.count or 0)
+        for name in ("success_rate", "failure_rate", "avg_duration"):
+            if name in metrics:
+                value = getattr(result, name)
+                row[name] = round(float(value), 2) if value is not None else None
+        return row
+
+
+# Global aggregation service instance
+aggregation_service = AggregationService()
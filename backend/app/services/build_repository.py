@@ -0,0 +1,116 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import undefer_group
+from ..models import Build, BuildStatus
+from .pagination import Keyset
+from .retention import retention_manager
+
+# Every build field a response may carry
+FIELDS = tuple(column.key for column in Build.__table__.columns)
+
+# Deferred on the model; only the single-build detail endpoint returns them
+HEAVY_FIELDS = ("console_output", "parameters")
+
+# Fields listings return when no projection is requested
+LIST_FIELDS = tuple(f for f in FIELDS if f not in HEAVY_FIELDS + ("created_at", "updated_at"))
+
+
+class ProjectionError(ValueError):
+    """Raised for an invalid ``fields=`` projection."""
+
+
+class BuildRepository:
+    """
+    Read access to stored builds with column projection.
+
+    Listings select only the requested columns (``LIST_FIELDS`` by
+    default) instead of loading whole ``Build`` entities, and never the
+    heavy console output and parameters, which are deferred on the model.
+    The detail lookup undefers them in the same query and reads console
+    logs the retention job has moved to the archive.
+    """
+
+    keysets = {
+        order: Keyset("builds", Build.timestamp, Build.id, descending=order == "desc")
+        for order in ("asc", "desc")
+    }
+
+    def fields(self, fields: Optional[str], detail: bool = False) -> List[str]:
+        """Validate a comma-separated projection; listings may not ask for heavy fields."""
+        if not fields:
+            return list(FIELDS if detail else LIST_FIELDS)
+        selected = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+        unknown = [f for f in selected if f not in FIELDS]
+        if unknown:
+            raise ProjectionError(f"Unknown fields: {', '.join(unknown)}")
+        heavy = [f for f in selected if f in HEAVY_FIELDS]
+        if heavy and not detail:
+            raise ProjectionError(f"{', '.join(heavy)} are only returned for a single build")
+        return selected
+
+    @staticmethod
+    def filters(pipeline_name: Optional[str] = None, status: Optional[BuildStatus] = None,
+                triggered_by: Optional[str] = None, start_date: Optional[datetime] = None,
+                end_date: Optional[datetime] = None) -> list:
+        clauses = []
+        if pipeline_name:
+            clauses.append(Build.pipeline_name == pipeline_name)
+        if status:
+            clauses.append(Build.status == status)
+        if triggered_by:
+            clauses.append(Build.triggered_by == triggered_by)
+        if start_date:
+            clauses.append(Build.timestamp >= start_date)
+        if end_date:
+            clauses.append(Build.timestamp <= end_date)
+        return clauses
+
+    @staticmethod
+    def _statement(fields: Sequence[str], filters: Sequence = ()):
+        # The keyset columns are always selected so the next cursor can be encoded
+        columns = list(dict.fromkeys(["id", "timestamp", *fields]))
+        return select(*(getattr(Build, f) for f in columns)).where(*filters)
+
+    @staticmethod
+    def _dict(row, fields: Sequence[str]) -> Dict[str, Any]:
+        data = {f: getattr(row, f) for f in fields}
+        if isinstance(data.get("status"), BuildStatus):
+            data["status"] = data["status"].value
+        return data
+
+    async def alist(self, db: AsyncSession, fields: Sequence[str], filters: Sequence = (), size: int = 50,
+                    cursor: Optional[str] = None, order: str = "desc") -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """One keyset page of builds; returns the items and the cursor for the next page."""
+        keyset = self.keysets[order]
+        rows = (await db.execute(keyset.apply(self._statement(fields, filters), cursor, size))).all()
+        rows, next_cursor = keyset.page(rows, size)
+        return [self._dict(row, fields) for row in rows], next_cursor
+
+    async def arecent(self, db: AsyncSession, pipeline_name: str, fields: Sequence[str],
+                      limit: int = 10) -> List[Dict[str, Any]]:
+        """The newest builds of a pipeline."""
+        stmt = self._statement(fields, [Build.pipeline_name == pipeline_name])
+        rows = (await db.execute(stmt.order_by(Build.timestamp.desc(), Build.id.desc()).limit(limit))).all()
+        return [self._dict(row, fields) for row in rows]
+
+    async def aget(self, db: AsyncSession, build_id: int, fields: Sequence[str]) -> Optional[Dict[str, Any]]:
+        """A single build with its heavy columns loaded (when projected) in one query."""
+        stmt = select(Build).where(Build.id == build_id)
+        if any(f in HEAVY_FIELDS for f in fields):
+            stmt = stmt.options(undefer_group("heavy"))
+        build = (await db.execute(stmt)).scalar_one_or_none()
+        if build is None:
+            return None
+        data = self._dict(build, fields)
+        if "console_output" in data and data["console_output"] is None and build.console_archive:
+            # Moved to a compressed archive file by the retention job
+            data["console_output"] = retention_manager.read_console(
+                build.pipeline_name, build.build_number, build.console_archive
+            )
+        return data
+
+
+# Global build repository instance
+build_repository = BuildRepository()
@@ -0,0 +1,323 @@
+import heapq
+import logging
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from ..config import settings
+from ..database import get_session
+from ..models import Build, BuildStatus
+
+logger = logging.getLogger(__name__)
+
+# Compact status encoding: one byte per build
+STATUS_CODES: Dict[str, int] = {status.value: code for code, status in enumerate(BuildStatus)}
+STATUS_NAMES: List[str] = [status.value for status in BuildStatus]
+SUCCESS_CODE = STATUS_CODES["SUCCESS"]
+FAILURE_CODES = frozenset(STATUS_CODES[s] for s in ("FAILURE", "ABORTED", "UNSTABLE"))
+
+NO_DURATION = -1
+COLUMNS = ("pipeline_ids", "numbers", "statuses", "durations_ms", "timestamps_ms", "queue_waits_s")
+TIMESTAMP_INDEX = COLUMNS.index("timestamps_ms")
+_EPOCH = datetime(1970, 1, 1)
+
+
+def to_epoch_ms(ts: datetime) -> int:
+    """Convert a naive UTC datetime to epoch milliseconds."""
+    return int((ts - _EPOCH).total_seconds() * 1000)
+
+
+def from_epoch_ms(ms: int) -> datetime:
+    return _EPOCH + timedelta(milliseconds=ms)
+
+
+def _row_timestamp(row: Tuple) -> int:
+    return row[TIMESTAMP_INDEX]
+
+
+class ColumnarBuildStore:
+    """
+    Compact in-memory build history with one typed array per field.
+
+    Rows are kept sorted by timestamp so a time range is two binary
+    searches; pipeline names are interned to small integer ids. Aggregates
+    walk the arrays by index instead of building and reading a dict per
+    build, which keeps memory at roughly 25 bytes per build.
+    """
+
+    def __init__(self):
+        self.retention_days = settings.build_store_days
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        self._names: List[str] = []
+        self._name_ids: Dict[str, int] = {}
+        self.pipeline_ids = array("I")
+        self.numbers = array("I")
+        self.statuses = array("B")
+        self.durations_ms = array("q")
+        self.timestamps_ms = array("q")
+        self.queue_waits_s = array("i")
+
+    def __len__(self) -> int:
+        return len(self.timestamps_ms)
+
+    def _intern(self, name: str) -> int:
+        pid = self._name_ids.get(name)
+        if pid is None:
+            pid = self._name_ids[name] = len(self._names)
+            self._names.append(name)
+        return pid
+
+    def pipeline_name(self, pid: int) -> str:
+        return self._names[pid]
+
+    def pipeline_id(self, name: str) -> Optional[int]:
+        return self._name_ids.get(name)
+
+    # ------------------------------------------------------------------ writes
+
+    def append(self, build: Dict[str, Any]):
+        """Append one build record (as produced by ingestion)."""
+        self.extend([build])
+
+    def extend(self, builds: Iterable[Dict[str, Any]]):
+        with self._lock:
+            rows = []
+            for build in builds:
+                timestamp = build.get("timestamp")
+                status = STATUS_CODES.get(build.get("status"))
+                if not isinstance(timestamp, datetime) or status is None:
+                    continue
+                duration = build.get("duration")
+                queue_wait = build.get("queue_wait")
+                # One tuple per build, in COLUMNS order
+                rows.append((
+                    self._intern(build["pipeline_name"]),
+                    build.get("build_number") or 0,
+                    status,
+                    int(duration * 1000) if duration is not None else NO_DURATION,
+                    to_epoch_ms(timestamp),
+                    int(queue_wait) if queue_wait is not None else NO_DURATION,
+                ))
+            if not rows:
+                return
+
+            rows.sort(key=_row_timestamp)
+            # Builds polled from several jobs interleave: only the stored rows newer
+            # than the batch's oldest build are merged with it, the rest stay put
+            pos = bisect_right(self.timestamps_ms, rows[0][TIMESTAMP_INDEX])
+            if pos < len(self.timestamps_ms):
+                tail = zip(*(getattr(self, name)[pos:] for name in COLUMNS))
+                rows = list(heapq.merge(tail, rows, key=_row_timestamp))
+                for name in COLUMNS:
+                    del getattr(self, name)[pos:]
+            for index, name in enumerate(COLUMNS):
+                getattr(self, name).extend(row[index] for row in rows)
+
+    def compact(self):
+        """Drop builds older than the retention window."""
+        cutoff = to_epoch_ms(datetime.utcnow() - timedelta(days=self.retention_days))
+        with self._lock:
+            cut = bisect_left(self.timestamps_ms, cutoff)
+            if cut:
+                for name in COLUMNS:
+                    del getattr(self, name)[:cut]
+        return cut
+
+    def load(self):
+        """Load the retention window of builds from the database."""
+        since = datetime.utcnow() - timedelta(days=self.retention_days)
+        db = get_session()
+        try:
+            rows = db.query(
+                Build.pipeline_name, Build.build_number, Build.status, Build.duration,
+                Build.timestamp, Build.queue_wait
+            ).filter(Build.timestamp >= since).order_by(Build.timestamp).yield_per(5000)
+
+            with self._lock:
+                self._reset()
+                self.extend(
+                    {
+                        "pipeline_name": row.pipeline_name,
+                        "build_number": row.build_number,
+                        "status": row.status.value if hasattr(row.status, "value") else row.status,
+                        "duration": row.duration,
+                        "timestamp": row.timestamp,
+                        "queue_wait": row.queue_wait
+                    }
+                    for row in rows
+                )
+        finally:
+            db.close()
+        logger.info(f"Loaded {len(self)} builds into the columnar store")
+
+    # ------------------------------------------------------------------- reads
+
+    def time_range(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> Tuple[int, int]:
+        """Index range [lo, hi) of builds with start <= timestamp < end."""
+        lo = bisect_left(self.timestamps_ms, to_epoch_ms(start)) if start else 0
+        hi = bisect_left(self.timestamps_ms, to_epoch_ms(end)) if end else len(self.timestamps_ms)
+        return lo, hi
+
+    def _key_func(self, group_by: str) -> Callable[[int], Any]:
+        if group_by == "pipeline":
+            return lambda i: self._names[self.pipeline_ids[i]]
+        if group_by == "status":
+            return lambda i: STATUS_NAMES[self.statuses[i]]
+        if group_by == "hour":
+            return lambda i: from_epoch_ms(self.timestamps_ms[i] // 3_600_000 * 3_600_000).isoformat()
+        if group_by == "day":
+            return lambda i: from_epoch_ms(self.timestamps_ms[i] // 86_400_000 * 86_400_000).date().isoformat()
+        raise ValueError(f"Unsupported group_by: {group_by}")
+
+    def group_by(self, group_by: str = "pipeline", start: Optional[datetime] = None,
+                 end: Optional[datetime] = None, pipeline_name: Optional[str] = None) -> Dict[Any, Dict[str, Any]]:
+        """
+        Aggregate builds in a time range by pipeline, status, hour or day.
+
+        Returns {group: {builds, successes, failures, success_rate, avg_duration}}
+        with durations in seconds.
+        """
+        key_of = self._key_func(group_by)
+        groups: Dict[Any, List[float]] = {}
+
+        with self._lock:
+            lo, hi = self.time_range(start, end)
+            only_pid = None
+            if pipeline_name is not None:
+                only_pid = self._name_ids.get(pipeline_name)
+                if only_pid is None:
+                    return {}
+
+            pids, statuses, durations = self.pipeline_ids, self.statuses, self.durations_ms
+            for i in range(lo, hi):
+                if only_pid is not None and pids[i] != only_pid:
+                    continue
+                key = key_of(i)
+                acc = groups.get(key)
+                if acc is None:
+                    # builds, successes, failures, duration_sum_ms, duration_count
+                    acc = groups[key] = [0, 0, 0, 0, 0]
+                acc[0] += 1
+                status = statuses[i]
+                if status == SUCCESS_CODE:
+                    acc[1] += 1
+                elif status in FAILURE_CODES:
+                    acc[2] += 1
+                if durations[i] != NO_DURATION:
+                    acc[3] += durations[i]
+                    acc[4] += 1
+
+        return {
+            key: {
+                "builds": acc[0],
+                "successes": acc[1],
+                "failures": acc[2],
+                "success_rate": round(acc[1] / acc[0] * 100, 2) if acc[0] else 0.0,
+                "avg_duration": round(acc[3] / acc[4] / 1000, 2) if acc[4] else None
+            }
+            for key, acc in groups.items()
+        }
+
+    def totals(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+               pipeline_name: Optional[str] = None) -> Dict[str, Any]:
+        """Single aggregate over a time range."""
+        with self._lock:
+            lo, hi = self.time_range(start, end)
+            if pipeline_name is None:
+                statuses = self.statuses[lo:hi]
+                durations = [d for d in self.durations_ms[lo:hi] if d != NO_DURATION]
+                builds = hi - lo
+                successes = statuses.count(SUCCESS_CODE)
+                failures = sum(statuses.count(code) for code in FAILURE_CODES)
+                return {
+                    "builds": builds,
+                    "successes": successes,
+                    "failures": failures,
+                    "success_rate": round(successes / builds * 100, 2) if builds else 0.0,
+                    "avg_duration": round(sum(durations) / len(durations) / 1000, 2) if durations else None
+                }
+
+        grouped = self.group_by("pipeline", start, end, pipeline_name)
+        return grouped.get(pipeline_name) or {
+            "builds": 0, "successes": 0, "failures": 0, "success_rate": 0.0, "avg_duration": None
+        }
+
+    def _row(self, i: int) -> Dict[str, Any]:
+        return {
+            "pipeline_name": self._names[self.pipeline_ids[i]],
+            "build_number": self.numbers[i],
+            "status": STATUS_NAMES[self.statuses[i]],
+            "duration": self.durations_ms[i] / 1000 if self.durations_ms[i] != NO_DURATION else None,
+            "timestamp": from_epoch_ms(self.timestamps_ms[i]),
+            "queue_wait": self.queue_waits_s[i] if self.queue_waits_s[i] != NO_DURATION else None
+        }
+
+    def rows(self, lo: int, hi: int) -> List[Dict[str, Any]]:
+        """Materialize rows [lo, hi) as dicts (for small result sets only)."""
+        with self._lock:
+            return [self._row(i) for i in range(lo, hi)]
+
+    def top_builds(self, metric: str = "duration", n: int = 20, start: Optional[datetime] = None,
+                   end: Optional[datetime] = None, pipeline_name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        The ``n`` builds with the largest duration or queue wait in a time range.
+
+        A bounded heap streams over the index range, so only ``n`` candidates
+        are held and only the winners are materialized as dicts.
+        """
+        column = {"duration": "durations_ms", "queue_wait": "queue_waits_s"}[metric]
+        with self._lock:
+            values = getattr(self, column)
+            lo, hi = self.time_range(start, end)
+            candidates = range(lo, hi)
+            if pipeline_name is not None:
+                pid = self._name_ids.get(pipeline_name)
+                if pid is None:
+                    return []
+                pids = self.pipeline_ids
+                candidates = (i for i in candidates if pids[i] == pid)
+            winners = heapq.nlargest(
+                n, (i for i in candidates if values[i] != NO_DURATION), key=values.__getitem__
+            )
+            return [self._row(i) for i in winners]
+
+    def top_pipelines(self, n: int = 20, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                      by: str = "failures", min_builds: int = 1) -> List[Dict[str, Any]]:
+        """The ``n`` pipelines with the most failures (or highest failure rate) in a time range."""
+        with self._lock:
+            lo, hi = self.time_range(start, end)
+            builds = [0] * len(self._names)
+            failures = [0] * len(self._names)
+            pids, statuses = self.pipeline_ids, self.statuses
+            for i in range(lo, hi):
+                builds[pids[i]] += 1
+                if statuses[i] in FAILURE_CODES:
+                    failures[pids[i]] += 1
+            names = list(self._names)
+
+        if by == "failure_rate":
+            key = lambda pid: (failures[pid] / builds[pid], failures[pid])
+        else:
+            key = lambda pid: (failures[pid], failures[pid] / builds[pid])
+        eligible = (pid for pid in range(len(names)) if builds[pid] >= min_builds and failures[pid])
+        return [
+            {
+                "pipeline_name": names[pid],
+                "builds": builds[pid],
+                "failures": failures[pid],
+                "failure_rate": round(failures[pid] / builds[pid] * 100, 2)
+            }
+            for pid in heapq.nlargest(n, eligible, key=key)
+        ]
+
+    def memory_bytes(self) -> int:
+        """Approximate bytes held by the column arrays."""
+        return sum(getattr(self, name).itemsize * len(getattr(self, name)) for name in COLUMNS)
+
+
+# Global columnar build store instance
+build_store = ColumnarBuildStore()
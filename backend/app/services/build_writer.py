@@ -0,0 +1,233 @@
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import Boolean, func, literal_column, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..database import get_session
+from ..models import Build
+from ..partitioning import partition_manager
+
+logger = logging.getLogger(__name__)
+
+CONFLICT_KEY = ("pipeline_name", "build_number")
+# Unique keys on a partitioned builds table must include the partition key
+PARTITIONED_CONFLICT_KEY = CONFLICT_KEY + ("timestamp",)
+
+# Columns a build record may carry; everything but the key is refreshed on conflict
+WRITE_COLUMNS = (
+    "pipeline_name", "build_number", "status", "duration", "timestamp", "triggered_by",
+    "branch", "commit_hash", "url", "built_on", "queue_wait", "console_output", "parameters",
+)
+UPDATE_COLUMNS = tuple(c for c in WRITE_COLUMNS if c not in CONFLICT_KEY)
+
+# Bound parameters allowed per statement (SQLite before 3.32 allows only 999)
+MAX_VARIABLES = 32766 if sqlite3.sqlite_version_info >= (3, 32, 0) else 999
+
+UPSERT_DIALECTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+Listener = Callable[[List[Dict[str, Any]], Session], None]
+
+
+class BulkBuildWriter:
+    """
+    Batched writer for the builds table.
+
+    Records from polling, webhooks or backfills are written as batched
+    ``INSERT ... ON CONFLICT (pipeline_name, build_number) DO UPDATE``
+    statements, so a batch costs one key lookup and one upsert per chunk
+    instead of a find, insert and re-read per build (an unpartitioned
+    PostgreSQL table needs no lookup: the upsert returns which builds it
+    inserted, from ``xmax = 0``). Fields a record leaves
+    out (None) keep their stored value on conflict. When ``builds`` is
+    partitioned the conflict key also includes ``timestamp``, and missing
+    monthly partitions are created before a chunk is written.
+
+    ``add`` buffers records and writes once ``ingest_batch_size`` are
+    pending; ``flush_if_due`` writes a partial buffer after
+    ``ingest_flush_interval`` seconds. ``write`` bypasses the buffer.
+    Listeners are called with the builds that were inserted (not updated)
+    in each committed batch, so derived aggregates count every build once.
+    A ``backfill`` write marks its session (``db.info["backfill"]``) so
+    listeners can tell imported history from builds arriving live.
+    """
+
+    def __init__(self, batch_size: Optional[int] = None, flush_interval: Optional[float] = None):
+        self.batch_size = batch_size or settings.ingest_batch_size
+        self.flush_interval = settings.ingest_flush_interval if flush_interval is None else flush_interval
+        self._buffer: Dict[Tuple[str, int], Dict[str, Any]] = {}
+        self._listeners: List[Listener] = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+    def add_listener(self, listener: Listener):
+        """Register a callback for newly inserted builds."""
+        self._listeners.append(listener)
+
+    # ----------------------------------------------------------------- buffer
+
+    def add(self, records: Sequence[Dict[str, Any]]) -> int:
+        """Buffer records (last one wins per build); flushes when the batch is full."""
+        with self._lock:
+            for record in records:
+                self._buffer[(record["pipeline_name"], record["build_number"])] = record
+            pending = len(self._buffer)
+        if pending >= self.batch_size:
+            self.flush()
+        return pending
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._buffer)
+
+    def due(self) -> bool:
+        return bool(self._buffer) and time.monotonic() - self._last_flush >= self.flush_interval
+
+    def flush_if_due(self) -> Dict[str, int]:
+        return self.flush() if self.due() else {"inserted": 0, "updated": 0}
+
+    def flush(self) -> Dict[str, int]:
+        """Write everything buffered; failed records stay buffered for the next flush."""
+        with self._flush_lock:
+            with self._lock:
+                records = list(self._buffer.values())
+                self._buffer = {}
+                self._last_flush = time.monotonic()
+            if not records:
+                return {"inserted": 0, "updated": 0}
+            try:
+                return self.write(records)
+            except Exception as e:
+                with self._lock:
+                    # Newer copies buffered meanwhile take precedence
+                    for record in records:
+                        self._buffer.setdefault((record["pipeline_name"], record["build_number"]), record)
+                logger.error(f"Failed to flush {len(records)} buffered builds: {e}")
+                return {"inserted": 0, "updated": 0}
+
+    # ------------------------------------------------------------------ write
+
+    def write(self, records: Sequence[Dict[str, Any]], db: Optional[Session] = None,
+              chunk_size: Optional[int] = None, backfill: bool = False) -> Dict[str, int]:
+        """Upsert records now, committing per chunk (``batch_size`` by default); raises on database errors."""
+        rows = self._rows(records)
+        if not rows:
+            return {"inserted": 0, "updated": 0}
+
+        own_session = db is None
+        db = db or get_session()
+        stats = {"inserted": 0, "updated": 0}
+        if backfill:
+            db.info["backfill"] = True
+        try:
+            dialect = db.get_bind().dialect.name
+            partitioned = partition_manager.partitioned
+            conflict_key = PARTITIONED_CONFLICT_KEY if partitioned else CONFLICT_KEY
+            # Partitioned tables cannot return system columns, so they look keys up like SQLite
+            returns_inserted = dialect == "postgresql" and not partitioned
+            upsert = self._upsert_statement(dialect, conflict_key, returns_inserted)
+            # Bound by the key lookup: one parameter per key column and build
+            chunk_size = min(chunk_size or self.batch_size, MAX_VARIABLES // len(CONFLICT_KEY))
+            for i in range(0, len(rows), chunk_size):
+                chunk = rows[i:i + chunk_size]
+                keys = [(r["pipeline_name"], r["build_number"]) for r in chunk]
+                # Before the lookup: partitions are created on another connection, which would
+                # wait on this transaction's lock on builds
+                partition_manager.ensure(r["timestamp"] for r in chunk)
+                if returns_inserted:
+                    new = {tuple(row[:-1]) for row in db.execute(upsert, chunk) if row[-1]}
+                else:
+                    stored = self._stored_timestamps(db, keys)
+                    if partitioned:
+                        # The partition key is part of the conflict key: a stored build keeps its
+                        # timestamp (whose partition exists), so a copy carrying another (e.g. the
+                        # time it was received) updates it instead of inserting a second row
+                        for r, key in zip(chunk, keys):
+                            if key in stored:
+                                r["timestamp"] = stored[key]
+                    new = set(keys) - set(stored)
+                    db.execute(upsert, chunk)
+                db.commit()
+
+                inserted = [r for r, key in zip(chunk, keys) if key in new]
+                stats["inserted"] += len(inserted)
+                stats["updated"] += len(chunk) - len(inserted)
+                if inserted:
+                    self._notify(inserted, db)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.info.pop("backfill", None)
+            if own_session:
+                db.close()
+
+        logger.debug(f"Upserted {len(rows)} builds ({stats['inserted']} new)")
+        return stats
+
+    @staticmethod
+    def _stored_timestamps(db: Session, keys: List[Tuple[str, int]]) -> Dict[Tuple[str, int], datetime]:
+        """Timestamps of the given ``(pipeline_name, build_number)`` builds that are already stored."""
+        rows = db.query(Build.pipeline_name, Build.build_number, Build.timestamp).filter(
+            tuple_(Build.pipeline_name, Build.build_number).in_(keys)
+        ).all()
+        return {(name, number): timestamp for name, number, timestamp in rows}
+
+    def _notify(self, inserted: List[Dict[str, Any]], db: Session):
+        """Call each listener; the chunk is already committed, so a failing listener does not fail the write."""
+        for listener in self._listeners:
+            try:
+                listener(inserted, db)
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Build listener {getattr(listener, '__qualname__', listener)} failed "
+                             f"for {len(inserted)} new builds: {e}")
+
+    @staticmethod
+    def _rows(records: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """One row per build (last wins) with every write column present."""
+        rows: Dict[Tuple[str, int], Dict[str, Any]] = {}
+        for record in records:
+            row = {column: record.get(column) for column in WRITE_COLUMNS}
+            row["timestamp"] = row["timestamp"] or datetime.utcnow()
+            row["triggered_by"] = row["triggered_by"] or "jenkins"
+            rows[(row["pipeline_name"], row["build_number"])] = row
+        return list(rows.values())
+
+    @staticmethod
+    def _upsert_statement(dialect: str, conflict_key: Tuple[str, ...] = CONFLICT_KEY,
+                          returns_inserted: bool = False):
+        """
+        Single-row upsert executed with a chunk of parameter sets. Its compiled
+        form is cached; on PostgreSQL SQLAlchemy sends it as multi-row
+        ``INSERT ... VALUES (...), (...) ON CONFLICT`` pages (insertmanyvalues)
+        and SQLite steps one prepared statement per row (executemany), rather
+        than compiling a new multi-row VALUES statement per chunk.
+        """
+        if dialect not in UPSERT_DIALECTS:
+            raise NotImplementedError(f"Bulk upsert is not supported on {dialect}")
+        table = Build.__table__
+        stmt = UPSERT_DIALECTS[dialect](table)
+        updates = {
+            column: func.coalesce(getattr(stmt.excluded, column), table.c[column])
+            for column in UPDATE_COLUMNS if column not in conflict_key
+        }
+        updates["updated_at"] = func.now()
+        stmt = stmt.on_conflict_do_update(index_elements=list(conflict_key), set_=updates)
+        if returns_inserted:
+            # Reports which builds were new instead of looking the keys up first: a row this
+            # statement inserted has no deleting transaction (xmax = 0), an updated one does
+            stmt = stmt.returning(
+                *(table.c[column] for column in conflict_key),
+                literal_column(f"{table.name}.xmax = 0", Boolean)
+            )
+        return stmt
+
+
+# Global bulk build writer instance
+bulk_build_writer = BulkBuildWriter()
@@ -0,0 +1,281 @@
+import asyncio
+import json
+import logging
+import zlib
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from ..config import settings
+from ..models import BuildStatus
+from .build_writer import BulkBuildWriter, bulk_build_writer
+
+logger = logging.getLogger(__name__)
+
+GZIP_MAGIC = b"\x1f\x8b"
+# Decompressed bytes produced per step, so a small gzip body cannot expand all at once
+INFLATE_STEP = 1 << 20
+
+# Statuses used by other CI systems' exports (GitLab, GitHub Actions)
+STATUS_ALIASES = {
+    "FAILED": BuildStatus.FAILURE,
+    "TIMED_OUT": BuildStatus.FAILURE,
+    "CANCELED": BuildStatus.ABORTED,
+    "CANCELLED": BuildStatus.ABORTED,
+    "SKIPPED": BuildStatus.ABORTED,
+    "NOT_BUILT": BuildStatus.ABORTED,
+    "RUNNING": BuildStatus.IN_PROGRESS,
+    "PENDING": BuildStatus.QUEUED,
+    "CREATED": BuildStatus.QUEUED,
+}
+
+# Optional string fields and their column lengths
+STRING_FIELDS = {"triggered_by": 255, "branch": 255, "commit_hash": 255, "url": 500, "built_on": 255}
+
+
+class BulkImportError(ValueError):
+    """Raised when the request body itself cannot be read (e.g. a corrupt gzip stream)."""
+
+
+class RecordError(ValueError):
+    """Raised for an import line that is not a valid build record."""
+
+
+def _timestamp(value: Any) -> datetime:
+    """ISO-8601 string or epoch milliseconds (as Jenkins reports them), as naive UTC."""
+    if isinstance(value, bool):
+        raise RecordError("timestamp must be an ISO-8601 string or epoch milliseconds")
+    if isinstance(value, (int, float)):
+        try:
+            return datetime.utcfromtimestamp(value / 1000)
+        except (OverflowError, OSError, ValueError):
+            raise RecordError("timestamp is out of range")
+    if isinstance(value, str):
+        try:
+            ts = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            raise RecordError(f"Invalid timestamp: {value[:40]}")
+        return ts.astimezone(timezone.utc).replace(tzinfo=None) if ts.tzinfo else ts
+    if value is None:
+        raise RecordError("timestamp is required")
+    raise RecordError("timestamp must be an ISO-8601 string or epoch milliseconds")
+
+
+def _seconds(record: Dict[str, Any], field: str) -> Optional[int]:
+    value = record.get(field)
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+        raise RecordError(f"{field} must be a non-negative number of seconds")
+    return int(round(value))
+
+
+def parse_record(record: Any) -> Dict[str, Any]:
+    """Validate one decoded import line and normalize it into a ``builds`` record."""
+    if not isinstance(record, dict):
+        raise RecordError("Line is not a JSON object")
+
+    pipeline_name = record.get("pipeline_name")
+    if not isinstance(pipeline_name, str) or not pipeline_name.strip():
+        raise RecordError("pipeline_name is required")
+    if len(pipeline_name) > 255:
+        raise RecordError("pipeline_name is longer than 255 characters")
+
+    build_number = record.get("build_number")
+    if isinstance(build_number, bool) or not isinstance(build_number, int) or build_number < 0:
+        raise RecordError("build_number must be a non-negative integer")
+
+    status = record.get("status")
+    if not isinstance(status, str):
+        raise RecordError("status is required")
+    key = status.strip().upper()
+    if key in BuildStatus.__members__:
+        status = BuildStatus[key]
+    elif key in STATUS_ALIASES:
+        status = STATUS_ALIASES[key]
+    else:
+        raise RecordError(f"Unknown status: {status[:40]}")
+
+    parsed = {
+        "pipeline_name": pipeline_name,
+        "build_number": build_number,
+        "status": status.value,
+        "timestamp": _timestamp(record.get("timestamp")),
+        "duration": _seconds(record, "duration"),
+        "queue_wait": _seconds(record, "queue_wait"),
+    }
+    for field, length in STRING_FIELDS.items():
+        value = record.get(field)
+        if value is not None and not isinstance(value, str):
+            raise RecordError(f"{field} must be a string")
+        if value is not None and len(value) > length:
+            raise RecordError(f"{field} is longer than {length} characters")
+        parsed[field] = value
+
+    console_output = record.get("console_output")
+    if console_output is not None and not isinstance(console_output, str):
+        raise RecordError("console_output must be a string")
+    parsed["console_output"] = console_output
+    parameters = record.get("parameters")
+    if parameters is not None and not isinstance(parameters, dict):
+        raise RecordError("parameters must be an object")
+    parsed["parameters"] = json.dumps(parameters) if parameters is not None else None
+    return parsed
+
+
+async def _inflate(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Pass the body through, gunzipping it (all members) when it starts with the gzip magic."""
+    decompressor = None
+    head = b""
+    async for chunk in chunks:
+        if decompressor is None:
+            head += chunk
+            if len(head) < len(GZIP_MAGIC):
+                continue
+            if not head.startswith(GZIP_MAGIC):
+                decompressor = False
+                chunk, head = head, b""
+            else:
+                decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+                chunk, head = head, b""
+        if decompressor is False:
+            yield chunk
+            continue
+        try:
+            while chunk:
+                if decompressor.eof:
+                    # Concatenated gzip members
+                    decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+                data = decompressor.decompress(chunk, INFLATE_STEP)
+                if data:
+                    yield data
+                chunk = decompressor.unconsumed_tail or (decompressor.unused_data if decompressor.eof else b"")
+        except zlib.error as e:
+            raise BulkImportError(f"Invalid gzip body: {e}")
+    if head:
+        yield head
+    if decompressor and not decompressor.eof:
+        raise BulkImportError("Truncated gzip body")
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], max_line_bytes: int) -> AsyncIterator[Tuple[int, Optional[bytes]]]:
+    """``(line_number, line)`` for each non-blank NDJSON line; ``line`` is None when it was too long."""
+    buffer = b""
+    number = 0
+    oversized = False
+    async for data in _inflate(chunks):
+        buffer += data
+        start = 0
+        while True:
+            end = buffer.find(b"\n", start)
+            if end < 0:
+                break
+            number += 1
+            if oversized:
+                oversized = False
+                yield number, None
+            elif end - start > max_line_bytes:
+                yield number, None
+            elif buffer[start:end].strip():
+                yield number, buffer[start:end]
+            start = end + 1
+        buffer = buffer[start:]
+        if len(buffer) > max_line_bytes:
+            # Drop the rest of an oversized line as it streams in
+            oversized, buffer = True, b""
+    if oversized or buffer.strip():
+        number += 1
+        yield number, None if oversized or len(buffer) > max_line_bytes else buffer
+
+
+class NdjsonImporter:
+    """
+    Streaming NDJSON import of build records.
+
+    The body is read chunk by chunk (gunzipped on the fly when it is gzip),
+    split into lines and validated one line at a time, so memory stays
+    bounded by one batch however large the import. Valid records are
+    upserted through the bulk build writer one ``bulk_import_batch_size``
+    transaction at a time, and the next batch is parsed while the previous
+    one is written. Invalid lines are reported by line number (the first
+    ``bulk_import_max_errors`` of them) without affecting the rest.
+    Imports are backfills by default: the builds update the rollups and
+    capacity but not the live detectors, so history raises no alerts.
+    """
+
+    def __init__(self, writer: Optional[BulkBuildWriter] = None):
+        self.writer = writer or bulk_build_writer
+        self.batch_size = settings.bulk_import_batch_size
+        self.max_line_bytes = settings.bulk_import_max_line_bytes
+        self.max_errors = settings.bulk_import_max_errors
+
+    def _error(self, report: Dict[str, Any], line: int, message: str):
+        report["failed"] += 1
+        if len(report["errors"]) < self.max_errors:
+            report["errors"].append({"line": line, "error": message})
+        else:
+            report["errors_truncated"] = True
+
+    async def _finish(self, pending: Tuple[asyncio.Future, List[int]], report: Dict[str, Any]):
+        task, lines = pending
+        try:
+            written = await task
+        except Exception as e:
+            logger.error(f"Bulk import batch of {len(lines)} builds failed: {e}")
+            report["accepted"] -= len(lines)
+            for line in lines:
+                self._error(report, line, f"Batch write failed: {e}")
+            return
+        report["inserted"] += written["inserted"]
+        report["updated"] += written["updated"]
+
+    async def aimport(self, chunks: AsyncIterator[bytes], backfill: bool = True) -> Dict[str, Any]:
+        """Import an NDJSON (optionally gzip) byte stream; returns the per-request report."""
+        report = {
+            "lines": 0, "accepted": 0, "inserted": 0, "updated": 0, "failed": 0,
+            "errors": [], "errors_truncated": False,
+        }
+        batch: List[Dict[str, Any]] = []
+        lines: List[int] = []
+        pending = None
+        last_line = 0
+
+        async def submit():
+            nonlocal pending, batch, lines
+            if pending:
+                await self._finish(pending, report)
+            write = asyncio.to_thread(self.writer.write, batch, chunk_size=self.batch_size, backfill=backfill)
+            pending = (asyncio.ensure_future(write), lines)
+            batch, lines = [], []
+
+        try:
+            async for number, line in iter_lines(chunks, self.max_line_bytes):
+                report["lines"] += 1
+                last_line = number
+                if line is None:
+                    self._error(report, number, f"Line is longer than {self.max_line_bytes} bytes")
+                    continue
+                try:
+                    batch.append(parse_record(json.loads(line)))
+                except ValueError as e:
+                    # JSON, UTF-8 and record errors
+                    message = str(e) if isinstance(e, RecordError) else f"Invalid JSON: {e}"
+                    self._error(report, number, message)
+                    continue
+                lines.append(number)
+                report["accepted"] += 1
+                if len(batch) >= self.batch_size:
+                    await submit()
+            if batch:
+                await submit()
+        except BulkImportError as e:
+            # Everything before the unreadable part is still written, so a client can resume after it
+            if batch:
+                await submit()
+            raise BulkImportError(f"{e} (after line {last_line})")
+        finally:
+            if pending:
+                await self._finish(pending, report)
+        return report
+
+
+# Global NDJSON importer instance
+ndjson_importer = NdjsonImporter()
@@ -0,0 +1,230 @@
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from ..database import get_session
+from ..models import CapacityRollup
+from .rollups import day_bucket
+
+logger = logging.getLogger(__name__)
+
+GROUP_COLUMNS = {
+    "pipeline": CapacityRollup.pipeline_name,
+    "node": CapacityRollup.node_name,
+    "day": CapacityRollup.day,
+}
+SUM_FIELDS = ("build_count", "executor_seconds", "queue_wait_count", "queue_wait_seconds")
+
+# Queue sightings older than this can no longer be matched to a build
+QUEUE_MEMORY = timedelta(days=1)
+
+
+class CapacityAccounting:
+    """
+    Executor-seconds and queue wait per pipeline, node and UTC day.
+
+    Each ingested build adds its duration (executor time on ``built_on``)
+    and queue wait to a pending delta for its (day, pipeline, node) key;
+    deltas are added onto the ``capacity_rollups`` rows on flush, so usage
+    queries sum a few rows per day instead of scanning builds.
+
+    Queue wait comes from the build's TimeInQueueAction when Jenkins has the
+    metrics plugin. Otherwise it is inferred from the queue API: the job
+    monitor records when each queued item entered the queue, and a build is
+    matched to the oldest unconsumed sighting for its job that precedes the
+    build's start.
+    """
+
+    def __init__(self):
+        self._pending: Dict[Tuple[datetime, str, str], Dict[str, float]] = {}
+        # job name -> {queue item id: inQueueSince (naive UTC)}
+        self._queue_seen: Dict[str, Dict[int, datetime]] = {}
+        self._queue_items: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    # ---------------------------------------------------------------- queue
+
+    def observe_queue(self, items: List[Dict[str, Any]]):
+        """Record a snapshot of the Jenkins build queue."""
+        now = datetime.utcnow()
+        snapshot = []
+        with self._lock:
+            for item in items or []:
+                if not isinstance(item, dict):
+                    continue
+                job_name = (item.get("task") or {}).get("name")
+                since_ms = item.get("inQueueSince")
+                if not job_name or not isinstance(since_ms, (int, float)):
+                    continue
+                since = datetime.utcfromtimestamp(since_ms / 1000)
+                self._queue_seen.setdefault(job_name, {})[item.get("id")] = since
+                snapshot.append({
+                    "pipeline": job_name,
+                    "queued_since": since.isoformat(),
+                    "waiting_seconds": round(max(0.0, (now - since).total_seconds()), 1),
+                    "why": item.get("why")
+                })
+
+            cutoff = now - QUEUE_MEMORY
+            for job_name in list(self._queue_seen):
+                seen = {k: v for k, v in self._queue_seen[job_name].items() if v >= cutoff}
+                if seen:
+                    self._queue_seen[job_name] = seen
+                else:
+                    del self._queue_seen[job_name]
+            self._queue_items = sorted(snapshot, key=lambda i: i["waiting_seconds"], reverse=True)
+
+    def fill_queue_wait(self, build: Dict[str, Any]):
+        """Infer ``queue_wait`` from queue sightings when the build did not report it."""
+        if build.get("queue_wait") is not None:
+            return
+        started = build.get("timestamp")
+        if not isinstance(started, datetime):
+            return
+        with self._lock:
+            seen = self._queue_seen.get(build.get("pipeline_name"))
+            if not seen:
+                return
+            candidates = [(since, item_id) for item_id, since in seen.items() if since <= started]
+            if not candidates:
+                return
+            since, item_id = min(candidates)
+            del seen[item_id]
+        build["queue_wait"] = int(round((started - since).total_seconds()))
+
+    def queue_now(self) -> Dict[str, Any]:
+        with self._lock:
+            items = list(self._queue_items)
+        return {
+            "waiting": len(items),
+            "longest_wait_seconds": items[0]["waiting_seconds"] if items else 0.0,
+            "items": items
+        }
+
+    # ---------------------------------------------------------------- builds
+
+    def observe_build(self, build: Dict[str, Any]):
+        """Add a completed build's executor time and queue wait to the pending deltas."""
+        pipeline_name = build.get("pipeline_name")
+        timestamp = build.get("timestamp")
+        if not pipeline_name or not isinstance(timestamp, datetime):
+            return
+
+        key = (day_bucket(timestamp), pipeline_name, build.get("built_on") or "built-in")
+        duration = build.get("duration")
+        queue_wait = build.get("queue_wait")
+        with self._lock:
+            counts = self._pending.get(key)
+            if counts is None:
+                counts = self._pending[key] = {field: 0 for field in SUM_FIELDS}
+                counts["queue_wait_max"] = 0.0
+            counts["build_count"] += 1
+            if duration is not None and duration >= 0:
+                counts["executor_seconds"] += duration
+            if queue_wait is not None and queue_wait >= 0:
+                counts["queue_wait_count"] += 1
+                counts["queue_wait_seconds"] += queue_wait
+                counts["queue_wait_max"] = max(counts["queue_wait_max"], queue_wait)
+
+    def flush(self, db: Optional[Session] = None):
+        """Add pending deltas onto the capacity_rollups rows."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+
+        own_session = db is None
+        db = db or get_session()
+        try:
+            for (day, pipeline_name, node_name), delta in pending.items():
+                row = db.query(CapacityRollup).filter(
+                    CapacityRollup.day == day,
+                    CapacityRollup.pipeline_name == pipeline_name,
+                    CapacityRollup.node_name == node_name
+                ).one_or_none()
+                if row is None:
+                    row = CapacityRollup(day=day, pipeline_name=pipeline_name, node_name=node_name,
+                                         **{field: 0 for field in SUM_FIELDS}, queue_wait_max=0.0)
+                    db.add(row)
+                for field in SUM_FIELDS:
+                    setattr(row, field, (getattr(row, field) or 0) + delta[field])
+                row.queue_wait_max = max(row.queue_wait_max or 0.0, delta["queue_wait_max"])
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            with self._lock:
+                # Put the deltas back so the next flush retries them
+                for key, delta in pending.items():
+                    current = self._pending.setdefault(key, {field: 0 for field in SUM_FIELDS})
+                    for field in SUM_FIELDS:
+                        current[field] += delta[field]
+                    current["queue_wait_max"] = max(current.get("queue_wait_max", 0.0), delta["queue_wait_max"])
+            logger.error(f"Failed to flush capacity rollups: {e}")
+        finally:
+            if own_session:
+                db.close()
+
+    # ---------------------------------------------------------------- query
+
+    @staticmethod
+    def _usage_statement(group_by: str, days: int, pipeline_name: Optional[str], node_name: Optional[str]):
+        if group_by not in GROUP_COLUMNS:
+            raise ValueError(f"Unsupported group_by: {group_by}")
+        column = GROUP_COLUMNS[group_by]
+        start = day_bucket(datetime.utcnow()) - timedelta(days=days - 1)
+
+        stmt = select(
+            column.label("key"),
+            func.sum(CapacityRollup.build_count).label("builds"),
+            func.sum(CapacityRollup.executor_seconds).label("executor_seconds"),
+            func.sum(CapacityRollup.queue_wait_count).label("queue_wait_count"),
+            func.sum(CapacityRollup.queue_wait_seconds).label("queue_wait_seconds"),
+            func.max(CapacityRollup.queue_wait_max).label("queue_wait_max")
+        ).where(CapacityRollup.day >= start)
+        if pipeline_name:
+            stmt = stmt.where(CapacityRollup.pipeline_name == pipeline_name)
+        if node_name:
+            stmt = stmt.where(CapacityRollup.node_name == node_name)
+        order = column if group_by == "day" else func.sum(CapacityRollup.executor_seconds).desc()
+        return stmt.group_by(column).order_by(order)
+
+    @staticmethod
+    def _usage_rows(group_by: str, rows) -> List[Dict[str, Any]]:
+        return [
+            {
+                group_by: row.key.date().isoformat() if isinstance(row.key, datetime) else row.key,
+                "builds": int(row.builds or 0),
+                "executor_seconds": round(row.executor_seconds or 0.0, 1),
+                "executor_hours": round((row.executor_seconds or 0.0) / 3600, 2),
+                "queue_wait_seconds": round(row.queue_wait_seconds or 0.0, 1),
+                "avg_queue_wait_seconds": round(row.queue_wait_seconds / row.queue_wait_count, 1)
+                if row.queue_wait_count else None,
+                "max_queue_wait_seconds": round(row.queue_wait_max or 0.0, 1)
+            }
+            for row in rows
+        ]
+
+    def usage(self, group_by: str = "pipeline", days: int = 30, pipeline_name: Optional[str] = None,
+              node_name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Executor time and queue wait over the trailing window, grouped by pipeline, node or day."""
+        stmt = self._usage_statement(group_by, days, pipeline_name, node_name)
+        db = get_session(readonly=True)
+        try:
+            rows = db.execute(stmt).all()
+        finally:
+            db.close()
+        return self._usage_rows(group_by, rows)
+
+    async def ausage(self, db: AsyncSession, group_by: str = "pipeline", days: int = 30,
+                     pipeline_name: Optional[str] = None, node_name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """``usage`` awaited on an asyncio session."""
+        stmt = self._usage_statement(group_by, days, pipeline_name, node_name)
+        rows = (await db.execute(stmt)).all()
+        return self._usage_rows(group_by, rows)
+
+
+# Global capacity accounting instance
+capacity_accounting = CapacityAccounting()
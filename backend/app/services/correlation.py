@@ -0,0 +1,224 @@
+import logging
+import threading
+from bisect import bisect_left, insort
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from ..config import settings
+from ..database import get_session
+from ..models import Build, BuildStatus
+
+logger = logging.getLogger(__name__)
+
+CORRELATED_STATUSES = ("FAILURE", "UNSTABLE")
+
+
+class _Incident:
+    """A cluster of failures across pipelines that happened close together."""
+
+    __slots__ = ("id", "started_at", "last_failure_at", "members", "notified")
+
+    def __init__(self, incident_id: int, members: List[Dict[str, Any]]):
+        self.id = incident_id
+        self.members = members
+        self.started_at = min((m["failed_at"] for m in members), default=None)
+        self.last_failure_at = max((m["failed_at"] for m in members), default=None)
+        self.notified = False
+
+    @property
+    def pipelines(self) -> List[str]:
+        return sorted({m["pipeline"] for m in self.members})
+
+    def to_dict(self, window: timedelta) -> Dict[str, Any]:
+        nodes = Counter(m["node"] for m in self.members if m.get("node"))
+        common_node, common_count = nodes.most_common(1)[0] if nodes else (None, 0)
+        return {
+            "id": self.id,
+            "started_at": self.started_at.isoformat(),
+            "last_failure_at": self.last_failure_at.isoformat(),
+            "open": datetime.utcnow() - self.last_failure_at < window,
+            "pipeline_count": len(self.pipelines),
+            "pipelines": self.pipelines,
+            # A node shared by most failures is the likely culprit
+            "suspected_node": common_node if common_count * 2 > len(self.members) else None,
+            "builds": [
+                {**m, "failed_at": m["failed_at"].isoformat()}
+                for m in sorted(self.members, key=lambda m: m["failed_at"])
+            ],
+        }
+
+
+class FailureCorrelator:
+    """
+    Clusters failures across pipelines into infrastructure "incidents".
+
+    Failures are indexed by the time they finished in a sorted list, so the
+    failures inside any sliding window are found with two binary searches
+    regardless of how many jobs there are. A new failure joins the open
+    incident if it lands within the window of that incident's last failure;
+    otherwise, if the window ending at it holds unclustered failures from
+    at least ``min_pipelines`` distinct pipelines, they become a new
+    incident. Members of an incident are reported once as a group instead
+    of one alert per job.
+    """
+
+    def __init__(self):
+        self.window = timedelta(minutes=settings.incident_window_minutes)
+        self.min_pipelines = settings.incident_min_pipelines
+        self.retention = timedelta(hours=settings.incident_retention_hours)
+        # Sorted (failed_at, seq) keys and the failure records they point to
+        self._index: List[Tuple[datetime, int]] = []
+        self._failures: Dict[int, Dict[str, Any]] = {}
+        self._keys: Dict[Tuple[str, int], int] = {}
+        self._member_of: Dict[Tuple[str, int], int] = {}
+        self._incidents: Dict[int, _Incident] = {}
+        self._seq = 0
+        self._next_incident = 1
+        self._lock = threading.Lock()
+
+    def observe_build(self, build: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Index a failed build; returns the incident it belongs to, if any."""
+        if build.get("status") not in CORRELATED_STATUSES:
+            return None
+        started = build.get("timestamp")
+        if not build.get("pipeline_name") or not isinstance(started, datetime):
+            return None
+
+        failed_at = started + timedelta(seconds=build.get("duration") or 0)
+        failure = {
+            "pipeline": build["pipeline_name"],
+            "build_number": build.get("build_number"),
+            "status": build.get("status"),
+            "node": build.get("built_on"),
+            "url": build.get("url"),
+            "failed_at": failed_at,
+        }
+
+        with self._lock:
+            key = (failure["pipeline"], failure["build_number"])
+            if key in self._keys:
+                return None
+            self._seq += 1
+            seq = self._seq
+            self._keys[key] = seq
+            self._failures[seq] = failure
+            insort(self._index, (failed_at, seq))
+            incident = self._correlate(seq, failure)
+            self._prune(failed_at)
+            return incident.to_dict(self.window) if incident else None
+
+    def _window_failures(self, start: datetime, end: datetime) -> List[int]:
+        lo = bisect_left(self._index, (start, 0))
+        hi = bisect_left(self._index, (end, self._seq + 1))
+        return [seq for _, seq in self._index[lo:hi]]
+
+    def _correlate(self, seq: int, failure: Dict[str, Any]) -> Optional[_Incident]:
+        failed_at = failure["failed_at"]
+
+        # Join an incident whose failures are still within the window
+        for incident in self._incidents.values():
+            if abs(failed_at - incident.last_failure_at) <= self.window or \
+                    incident.started_at <= failed_at <= incident.last_failure_at:
+                self._add_member(incident, seq, failure)
+                return incident
+
+        # Otherwise look for a new cluster among unclustered neighbours
+        nearby = [
+            s for s in self._window_failures(failed_at - self.window, failed_at + self.window)
+            if (self._failures[s]["pipeline"], self._failures[s]["build_number"]) not in self._member_of
+        ]
+        pipelines = {self._failures[s]["pipeline"] for s in nearby}
+        if len(pipelines) < self.min_pipelines:
+            return None
+
+        incident = _Incident(self._next_incident, [])
+        self._next_incident += 1
+        self._incidents[incident.id] = incident
+        for s in nearby:
+            self._add_member(incident, s, self._failures[s])
+        logger.info(f"Incident {incident.id}: {len(pipelines)} pipelines failing together")
+        return incident
+
+    def _add_member(self, incident: _Incident, seq: int, failure: Dict[str, Any]):
+        incident.members.append(failure)
+        if incident.started_at is None or failure["failed_at"] < incident.started_at:
+            incident.started_at = failure["failed_at"]
+        if incident.last_failure_at is None or failure["failed_at"] > incident.last_failure_at:
+            incident.last_failure_at = failure["failed_at"]
+        self._member_of[(failure["pipeline"], failure["build_number"])] = incident.id
+
+    def _prune(self, now: datetime):
+        """Forget failures and incidents older than the retention window."""
+        cutoff = now - self.retention
+        cut = bisect_left(self._index, (cutoff, 0))
+        if not cut:
+            return
+        for _, seq in self._index[:cut]:
+            failure = self._failures.pop(seq)
+            self._keys.pop((failure["pipeline"], failure["build_number"]), None)
+            incident_id = self._member_of.get((failure["pipeline"], failure["build_number"]))
+            if incident_id is not None and incident_id in self._incidents \
+                    and self._incidents[incident_id].last_failure_at < cutoff:
+                incident = self._incidents.pop(incident_id)
+                for member in incident.members:
+                    self._member_of.pop((member["pipeline"], member["build_number"]), None)
+        del self._index[:cut]
+
+    def warm_up(self):
+        """Replay recent failures so incidents survive a restart (already notified)."""
+        since = datetime.utcnow() - self.retention
+        db = get_session()
+        try:
+            rows = db.query(
+                Build.pipeline_name, Build.build_number, Build.status, Build.duration,
+                Build.timestamp, Build.built_on, Build.url
+            ).filter(
+                Build.timestamp >= since,
+                Build.status.in_([BuildStatus.FAILURE, BuildStatus.UNSTABLE])
+            ).order_by(Build.timestamp).all()
+        finally:
+            db.close()
+
+        for row in rows:
+            self.observe_build({
+                "pipeline_name": row.pipeline_name,
+                "build_number": row.build_number,
+                "status": row.status.value if hasattr(row.status, "value") else row.status,
+                "duration": row.duration,
+                "timestamp": row.timestamp,
+                "built_on": row.built_on,
+                "url": row.url
+            })
+        with self._lock:
+            for incident in self._incidents.values():
+                incident.notified = True
+        logger.info(f"Failure correlator warmed up with {len(rows)} failures")
+
+    def incident_for(self, pipeline_name: str, build_number: int) -> Optional[int]:
+        """Incident id a failed build belongs to, if it was correlated."""
+        with self._lock:
+            return self._member_of.get((pipeline_name, build_number))
+
+    def drain_new_incidents(self) -> List[Dict[str, Any]]:
+        """Incidents not yet alerted on; marks them as notified."""
+        with self._lock:
+            fresh = [i for i in self._incidents.values() if not i.notified]
+            for incident in fresh:
+                incident.notified = True
+            return [i.to_dict(self.window) for i in fresh]
+
+    def incidents(self, hours: int = 24) -> List[Dict[str, Any]]:
+        """Incidents with a failure in the trailing window, most recent first."""
+        cutoff = datetime.utcnow() - timedelta(hours=hours)
+        with self._lock:
+            found = [i.to_dict(self.window) for i in self._incidents.values() if i.last_failure_at >= cutoff]
+        return sorted(found, key=lambda i: i["last_failure_at"], reverse=True)
+
+    def incident(self, incident_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            incident = self._incidents.get(incident_id)
+            return incident.to_dict(self.window) if incident else None
+
+
+# Global failure correlator instance
+failure_correlator = FailureCorrelator()
@@ -0,0 +1,130 @@
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from sqlalchemy import and_, func
+from sqlalchemy.orm import aliased
+from ..database import get_session
+from ..models import Build, BuildStatus
+from .rollups import FAILURE_STATUSES, rollup_service
+
+logger = logging.getLogger(__name__)
+
+
+class DeliveryMetricsTracker:
+    """
+    Derives DORA-style delivery metrics from the build stream.
+
+    Only the open failure streak per pipeline is kept in memory. When a
+    success closes a streak, the recovery time (first failure to next
+    success) and streak length are written into the hourly rollups, so any
+    window is answered by summing daily rollup totals:
+
+    - deployment frequency: successful builds per day
+    - change failure rate: failed builds over all builds
+    - MTTR: mean recovery time over recoveries in the window
+
+    A failure is any of ``FAILURE_STATUSES`` (ABORTED included), the same
+    definition the rollup failure counts use, so streaks, MTTR and the
+    change failure rate agree.
+    """
+
+    def __init__(self):
+        # pipeline -> {"started_at": datetime, "length": int}
+        self._open_streaks: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe_build(self, build: Dict[str, Any]):
+        """Track failure streaks; call after the build was folded into the rollups."""
+        pipeline_name = build.get("pipeline_name")
+        status = build.get("status")
+        timestamp = build.get("timestamp")
+        if not pipeline_name or not isinstance(timestamp, datetime):
+            return
+
+        recovered = None
+        with self._lock:
+            streak = self._open_streaks.get(pipeline_name)
+            if status in FAILURE_STATUSES:
+                if streak is None:
+                    self._open_streaks[pipeline_name] = {"started_at": timestamp, "length": 1}
+                else:
+                    streak["length"] += 1
+            elif status == "SUCCESS" and streak is not None and timestamp >= streak["started_at"]:
+                # A late success from before the streak began does not end it
+                recovered = self._open_streaks.pop(pipeline_name)
+
+        if recovered:
+            seconds = (timestamp - recovered["started_at"]).total_seconds()
+            rollup_service.record_recovery(pipeline_name, timestamp, seconds, recovered["length"])
+
+    def load_open_streaks(self):
+        """Rebuild open failure streaks (failures after each pipeline's last success)."""
+        db = get_session()
+        try:
+            last_success = db.query(
+                Build.pipeline_name.label("pipeline_name"),
+                func.max(Build.timestamp).label("last_success")
+            ).filter(Build.status == BuildStatus.SUCCESS).group_by(Build.pipeline_name).subquery()
+
+            failed = aliased(Build)
+            rows = db.query(
+                failed.pipeline_name,
+                func.min(failed.timestamp),
+                func.count(failed.id)
+            ).outerjoin(
+                last_success, last_success.c.pipeline_name == failed.pipeline_name
+            ).filter(
+                failed.status.in_([BuildStatus(status) for status in FAILURE_STATUSES]),
+                (last_success.c.last_success.is_(None)) | (failed.timestamp > last_success.c.last_success)
+            ).group_by(failed.pipeline_name).all()
+        finally:
+            db.close()
+
+        with self._lock:
+            self._open_streaks = {
+                name: {"started_at": started_at, "length": length}
+                for name, started_at, length in rows
+            }
+        logger.info(f"Loaded {len(rows)} open failure streaks")
+
+    def open_streak(self, pipeline_name: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            streak = self._open_streaks.get(pipeline_name)
+            return dict(streak) if streak else None
+
+    def _summarize(self, pipeline_name: Optional[str], totals: Dict[str, Any], days: int) -> Dict[str, Any]:
+        total = totals["total_builds"]
+        recoveries = totals["recovery_count"]
+        summary = {
+            "pipeline": pipeline_name,
+            "days": days,
+            "deployments": totals["success_count"],
+            "deployment_frequency_per_day": round(totals["success_count"] / days, 3),
+            "change_failure_rate": round(totals["failure_count"] / total * 100, 2) if total else 0.0,
+            "mttr_seconds": round(totals["recovery_seconds_sum"] / recoveries, 1) if recoveries else None,
+            "recoveries": recoveries,
+            "longest_failure_streak": totals["failure_streak_max"],
+        }
+        if pipeline_name:
+            streak = self.open_streak(pipeline_name)
+            summary["current_failure_streak"] = streak["length"] if streak else 0
+            summary["failing_since"] = streak["started_at"].isoformat() if streak else None
+            summary["longest_failure_streak"] = max(
+                summary["longest_failure_streak"], summary["current_failure_streak"]
+            )
+        return summary
+
+    def metrics(self, pipeline_name: Optional[str] = None, days: int = 90) -> Dict[str, Any]:
+        """Delivery metrics for one pipeline or all pipelines over the trailing window."""
+        return self._summarize(pipeline_name, rollup_service.window_totals(pipeline_name, days), days)
+
+    def metrics_by_pipeline(self, days: int = 90) -> List[Dict[str, Any]]:
+        return [
+            self._summarize(name, totals, days)
+            for name, totals in rollup_service.window_totals_by_pipeline(days).items()
+        ]
+
+
+# Global delivery metrics tracker instance
+delivery_metrics = DeliveryMetricsTracker()
@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional, Sequence, TypeVar
+
+T = TypeVar("T")
+
+# Chart resolutions, finest first
+RESOLUTIONS = {
+    "minute": timedelta(minutes=1),
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+    "week": timedelta(weeks=1),
+}
+
+
+def bucket_floor(ts: datetime, resolution: str) -> datetime:
+    """Truncate a timestamp to the start of its bucket (weeks start on Monday)."""
+    if resolution == "minute":
+        return ts.replace(second=0, microsecond=0)
+    if resolution == "hour":
+        return ts.replace(minute=0, second=0, microsecond=0)
+    day = ts.replace(hour=0, minute=0, second=0, microsecond=0)
+    if resolution == "day":
+        return day
+    if resolution == "week":
+        return day - timedelta(days=day.weekday())
+    raise ValueError(f"Unsupported resolution: {resolution}")
+
+
+def fit_resolution(span: timedelta, resolution: str, max_points: Optional[int]) -> str:
+    """Coarsen ``resolution`` until ``span`` fits in ``max_points`` buckets."""
+    if not max_points:
+        return resolution
+    names = list(RESOLUTIONS)
+    for name in names[names.index(resolution):]:
+        if span / RESOLUTIONS[name] + 1 <= max_points:
+            return name
+    return names[-1]
+
+
+def lttb_indices(xs: Sequence[float], ys: Sequence[float], threshold: int) -> List[int]:
+    """
+    Largest-Triangle-Three-Buckets: pick ``threshold`` indices that keep
+    the visual shape of a series.
+
+    The first and last points are always kept. The points in between are
+    split into equal buckets; from each bucket the point forming the largest
+    triangle with the previously selected point and the average of the next
+    bucket is kept, which preserves peaks and dips that plain striding or
+    averaging would flatten. ``xs`` must be sorted.
+    """
+    n = len(xs)
+    if threshold >= n:
+        return list(range(n))
+    if threshold < 3:
+        return [0, n - 1][:max(threshold, 0)]
+
+    selected = [0]
+    every = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        # Average of the next bucket (the last point for the final bucket)
+        next_start = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        span = next_end - next_start
+        avg_x = sum(xs[next_start:next_end]) / span
+        avg_y = sum(ys[next_start:next_end]) / span
+
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        ax, ay = xs[a], ys[a]
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        selected.append(best)
+        a = best
+
+    selected.append(n - 1)
+    return selected
+
+
+def lttb(points: Sequence[T], threshold: Optional[int],
+         x: Callable[[T], float], y: Callable[[T], float]) -> List[T]:
+    """Downsample ``points`` (sorted by ``x``) to at most ``threshold`` items."""
+    if not threshold or len(points) <= threshold:
+        return list(points)
+    xs = [float(x(p)) for p in points]
+    ys = [float(y(p)) for p in points]
+    return [points[i] for i in lttb_indices(xs, ys, threshold)]
@@ -0,0 +1,230 @@
+import logging
+import tempfile
+from datetime import datetime
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Sequence
+import pyarrow as pa
+import pyarrow.parquet as pq
+from ..database import get_session
+from ..models import Build, BuildRollup, BuildStatus, CapacityRollup
+from .build_writer import BulkBuildWriter, bulk_build_writer
+from .ingestion import build_ingestion_service
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ("parquet", "arrow")
+MEDIA_TYPES = {
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+# Exportable tables: model and the timestamp column used for range filters
+EXPORT_TABLES = {
+    "builds": (Build, Build.timestamp),
+    "rollups": (BuildRollup, BuildRollup.bucket_start),
+    "capacity": (CapacityRollup, CapacityRollup.day),
+}
+
+# Columns a Parquet import may carry; anything else (e.g. ids) is ignored
+IMPORT_COLUMNS = (
+    "build_number", "pipeline_name", "status", "duration", "timestamp", "triggered_by",
+    "branch", "commit_hash", "url", "built_on", "queue_wait", "console_output", "parameters",
+)
+
+
+def resolve_columns(table: str, columns: Optional[Sequence[str]] = None) -> List[str]:
+    """Validate a column selection (all columns when empty)."""
+    if table not in EXPORT_TABLES:
+        raise ValueError(f"Unknown table: {table}")
+    available = [c.name for c in EXPORT_TABLES[table][0].__table__.columns]
+    if not columns:
+        return available
+    unknown = [c for c in columns if c not in available]
+    if unknown:
+        raise ValueError(f"Unknown columns for {table}: {', '.join(unknown)}")
+    return list(columns)
+
+
+def _arrow_type(column) -> "pa.DataType":
+    if getattr(column.type, "enum_class", None) is not None:
+        return pa.string()
+    return {
+        int: pa.int64(),
+        float: pa.float64(),
+        bool: pa.bool_(),
+        datetime: pa.timestamp("ms"),
+    }.get(column.type.python_type, pa.string())
+
+
+class _ChunkSink:
+    """Minimal writable file that hands written bytes back to a generator."""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.closed = False
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data, self.chunks = b"".join(self.chunks), []
+        return data
+
+
+class BulkExporter:
+    """
+    Streams tables out as Arrow record batches.
+
+    Rows are read with ``yield_per`` and converted one batch at a time, so
+    memory is bounded by the batch size no matter how many rows match, and
+    only the requested columns are selected from the database.
+    """
+
+    def __init__(self, batch_size: int = 50_000):
+        self.batch_size = batch_size
+
+    def schema(self, table: str, columns: List[str]) -> "pa.Schema":
+        table_columns = EXPORT_TABLES[table][0].__table__.columns
+        return pa.schema([(name, _arrow_type(table_columns[name])) for name in columns])
+
+    def iter_batches(self, table: str, columns: Optional[Sequence[str]] = None,
+                     start: Optional[datetime] = None,
+                     end: Optional[datetime] = None) -> Iterator["pa.RecordBatch"]:
+        columns = resolve_columns(table, columns)
+        model, time_column = EXPORT_TABLES[table]
+        schema = self.schema(table, columns)
+
+        db = get_session(readonly=True)
+        try:
+            query = db.query(*[model.__table__.columns[name] for name in columns])
+            if start:
+                query = query.filter(time_column >= start)
+            if end:
+                query = query.filter(time_column < end)
+            query = query.order_by(time_column).execution_options(yield_per=self.batch_size)
+
+            rows: List[Any] = []
+            for row in query:
+                rows.append(row)
+                if len(rows) >= self.batch_size:
+                    yield self._to_batch(rows, schema)
+                    rows = []
+            if rows:
+                yield self._to_batch(rows, schema)
+        finally:
+            db.close()
+
+    @staticmethod
+    def _to_batch(rows: List[Any], schema: "pa.Schema") -> "pa.RecordBatch":
+        arrays = []
+        for idx, field in enumerate(schema):
+            values = [row[idx] for row in rows]
+            if pa.types.is_string(field.type):
+                values = [v.value if isinstance(v, BuildStatus) else v for v in values]
+            arrays.append(pa.array(values, type=field.type))
+        return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+    def stream_arrow(self, table: str, columns: Optional[Sequence[str]] = None,
+                     start: Optional[datetime] = None, end: Optional[datetime] = None) -> Iterator[bytes]:
+        """Yield an Arrow IPC stream, one record batch at a time."""
+        columns = resolve_columns(table, columns)
+        sink = _ChunkSink()
+        with pa.ipc.new_stream(sink, self.schema(table, columns)) as writer:
+            for batch in self.iter_batches(table, columns, start, end):
+                writer.write_batch(batch)
+                yield sink.drain()
+        yield sink.drain()
+
+    def stream_parquet(self, table: str, columns: Optional[Sequence[str]] = None,
+                       start: Optional[datetime] = None, end: Optional[datetime] = None,
+                       chunk_size: int = 1 << 20) -> Iterator[bytes]:
+        """
+        Yield a Parquet file in chunks.
+
+        Parquet writes its footer last, so row groups (one per batch) are
+        spooled to a temporary file and streamed back from there.
+        """
+        columns = resolve_columns(table, columns)
+        with tempfile.TemporaryFile() as spool:
+            with pq.ParquetWriter(spool, self.schema(table, columns), compression="zstd") as writer:
+                for batch in self.iter_batches(table, columns, start, end):
+                    writer.write_batch(batch)
+            spool.seek(0)
+            while True:
+                chunk = spool.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+
+    def stream(self, table: str, fmt: str, **kwargs) -> Iterator[bytes]:
+        if fmt == "parquet":
+            return self.stream_parquet(table, **kwargs)
+        if fmt == "arrow":
+            return self.stream_arrow(table, **kwargs)
+        raise ValueError(f"Unsupported format: {fmt}")
+
+
+class BulkImporter:
+    """
+    Loads a Parquet file of builds into the database in batches.
+
+    Each batch is upserted through the bulk build writer as a backfill, so
+    builds that already exist (same pipeline and build number) are updated
+    rather than duplicated, and re-importing a file is safe. The writer's
+    listener folds newly inserted builds into the rollups, capacity and the
+    columnar store, without alerting on history.
+    """
+
+    def __init__(self, batch_size: int = 10_000, writer: Optional[BulkBuildWriter] = None):
+        self.batch_size = batch_size
+        self.writer = writer or bulk_build_writer
+
+    @staticmethod
+    def _normalize(row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if not row.get("pipeline_name") or row.get("build_number") is None:
+            return None
+        status = row.get("status")
+        if status not in BuildStatus.__members__:
+            return None
+        timestamp = row.get("timestamp")
+        if isinstance(timestamp, datetime) and timestamp.tzinfo is not None:
+            timestamp = timestamp.replace(tzinfo=None)
+        record = {name: row.get(name) for name in IMPORT_COLUMNS}
+        record["timestamp"] = timestamp or datetime.utcnow()
+        record["triggered_by"] = record["triggered_by"] or "import"
+        return record
+
+    def import_parquet(self, source: BinaryIO) -> Dict[str, int]:
+        parquet_file = pq.ParquetFile(source)
+        columns = [c for c in parquet_file.schema_arrow.names if c in IMPORT_COLUMNS]
+        missing = {"pipeline_name", "build_number", "status"} - set(columns)
+        if missing:
+            raise ValueError(f"Parquet file is missing required columns: {', '.join(sorted(missing))}")
+
+        stats = {"rows": 0, "inserted": 0, "updated": 0, "skipped": 0}
+        for batch in parquet_file.iter_batches(batch_size=self.batch_size, columns=columns):
+            rows = batch.to_pylist()
+            stats["rows"] += len(rows)
+            records = [r for r in (self._normalize(row) for row in rows) if r]
+            stats["skipped"] += len(rows) - len(records)
+            if not records:
+                continue
+            written = self.writer.write(records, chunk_size=self.batch_size, backfill=True)
+            stats["inserted"] += written["inserted"]
+            stats["updated"] += written["updated"]
+
+        # Imported history may move the ingestion watermarks forward
+        build_ingestion_service.load_watermarks()
+        logger.info(f"Imported {stats['inserted']} of {stats['rows']} builds from Parquet")
+        return stats
+
+
+# Global exporter/importer instances
+bulk_exporter = BulkExporter()
+bulk_importer = BulkImporter()
@@ -0,0 +1,156 @@
+import logging
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from sqlalchemy import func
+from ..config import settings
+from ..database import get_session
+from ..models import Build
+
+logger = logging.getLogger(__name__)
+
+# Branch label used when Jenkins did not report one
+DEFAULT_BRANCH = "(default)"
+
+# Outcomes that take part in flip counting; ABORTED and in-flight builds are ignored
+_OUTCOMES = {"SUCCESS": True, "FAILURE": False, "UNSTABLE": False}
+
+
+class _FlipWindow:
+    """Sliding window of pass/fail outcomes with an incrementally kept flip count."""
+
+    __slots__ = ("outcomes", "flips")
+
+    def __init__(self, size: int):
+        self.outcomes: Deque[bool] = deque(maxlen=size)
+        self.flips = 0
+
+    def push(self, passed: bool):
+        if len(self.outcomes) == self.outcomes.maxlen:
+            # The oldest outcome falls out; drop the transition it started
+            oldest, following = self.outcomes[0], self.outcomes[1] if len(self.outcomes) > 1 else None
+            if following is not None and oldest != following:
+                self.flips -= 1
+        if self.outcomes and self.outcomes[-1] != passed:
+            self.flips += 1
+        self.outcomes.append(passed)
+
+    @property
+    def transitions(self) -> int:
+        return max(0, len(self.outcomes) - 1)
+
+    @property
+    def score(self) -> float:
+        return self.flips / self.transitions if self.transitions else 0.0
+
+
+class FlakinessDetector:
+    """
+    Tracks SUCCESS/FAILURE flip rates per pipeline and branch.
+
+    Each (pipeline, branch) keeps the last N outcomes; flips are updated in
+    O(1) as builds arrive. A pipeline's score aggregates its branches as
+    total flips over total transitions, so a red feature branch next to a
+    green main branch does not look flaky.
+    """
+
+    def __init__(self):
+        self.window_size = settings.flaky_window_builds
+        self.threshold = settings.flaky_score_threshold
+        self.min_builds = settings.flaky_min_builds
+        self._windows: Dict[Tuple[str, str], _FlipWindow] = {}
+        self._lock = threading.Lock()
+
+    def observe_build(self, build: Dict[str, Any]):
+        """Fold a completed build into its branch window."""
+        pipeline_name = build.get("pipeline_name")
+        passed = _OUTCOMES.get(build.get("status"))
+        if not pipeline_name or passed is None:
+            return
+
+        key = (pipeline_name, build.get("branch") or DEFAULT_BRANCH)
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None:
+                window = self._windows[key] = _FlipWindow(self.window_size)
+            window.push(passed)
+
+    def warm_up(self):
+        """Seed the windows with each pipeline's most recent builds."""
+        db = get_session()
+        try:
+            row_number = func.row_number().over(
+                partition_by=(Build.pipeline_name, Build.branch),
+                order_by=Build.timestamp.desc()
+            ).label("rn")
+            recent = db.query(
+                Build.pipeline_name, Build.branch, Build.status, Build.timestamp, row_number
+            ).subquery()
+            rows = db.query(recent).filter(recent.c.rn <= self.window_size).order_by(recent.c.timestamp).all()
+        finally:
+            db.close()
+
+        with self._lock:
+            self._windows.clear()
+        for row in rows:
+            status = row.status.value if hasattr(row.status, "value") else row.status
+            self.observe_build({"pipeline_name": row.pipeline_name, "branch": row.branch, "status": status})
+        logger.info(f"Flakiness detector warmed up with {len(rows)} builds")
+
+    def _summarize(self, pipeline_name: str, branches: List[Tuple[str, _FlipWindow]]) -> Dict[str, Any]:
+        flips = sum(w.flips for _, w in branches)
+        transitions = sum(w.transitions for _, w in branches)
+        builds = sum(len(w.outcomes) for _, w in branches)
+        score = flips / transitions if transitions else 0.0
+        return {
+            "pipeline": pipeline_name,
+            "flakiness_score": round(score, 3),
+            "flips": flips,
+            "builds_considered": builds,
+            "is_flaky": builds >= self.min_builds and score >= self.threshold,
+            "branches": sorted(
+                (
+                    {
+                        "branch": branch,
+                        "flakiness_score": round(w.score, 3),
+                        "flips": w.flips,
+                        "builds_considered": len(w.outcomes)
+                    }
+                    for branch, w in branches
+                ),
+                key=lambda b: b["flakiness_score"],
+                reverse=True
+            )
+        }
+
+    def _grouped(self) -> Dict[str, List[Tuple[str, _FlipWindow]]]:
+        grouped: Dict[str, List[Tuple[str, _FlipWindow]]] = {}
+        for (pipeline_name, branch), window in self._windows.items():
+            grouped.setdefault(pipeline_name, []).append((branch, window))
+        return grouped
+
+    def pipeline_score(self, pipeline_name: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            branches = [(b, w) for (p, b), w in self._windows.items() if p == pipeline_name]
+            return self._summarize(pipeline_name, branches) if branches else None
+
+    def scores(self) -> Dict[str, float]:
+        """Flakiness score per pipeline, for embedding in summary responses."""
+        with self._lock:
+            return {
+                name: self._summarize(name, branches)["flakiness_score"]
+                for name, branches in self._grouped().items()
+            }
+
+    def ranked(self, limit: int = 20, min_builds: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Pipelines ordered from most to least flaky."""
+        min_builds = self.min_builds if min_builds is None else min_builds
+        with self._lock:
+            summaries = [self._summarize(name, branches) for name, branches in self._grouped().items()]
+        summaries = [s for s in summaries if s["builds_considered"] >= min_builds]
+        summaries.sort(key=lambda s: (s["flakiness_score"], s["flips"]), reverse=True)
+        return summaries[:limit]
+
+
+# Global flakiness detector instance
+flakiness_detector = FlakinessDetector()
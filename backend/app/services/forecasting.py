@@ -0,0 +1,234 @@
+import logging
+import math
+import threading
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..database import get_session
+from ..models import BuildRollup
+from .rollups import hour_bucket
+
+logger = logging.getLogger(__name__)
+
+HOURS_PER_WEEK = 168
+
+# Rollup hours younger than this may still receive builds (ingested on completion)
+SETTLE_TIME = timedelta(hours=2)
+
+# Fleet-level forecast errors kept for reporting (four weeks of hours)
+ERROR_WINDOW_HOURS = 4 * HOURS_PER_WEEK
+# Per-pipeline errors are smoothed over about the same window
+ERROR_ALPHA = 1 / ERROR_WINDOW_HOURS
+
+HORIZONS = {"24h": 24, "7d": HOURS_PER_WEEK}
+
+
+def hour_of_week(ts: datetime) -> int:
+    """Slot 0..167, starting Monday 00:00 UTC."""
+    return ts.weekday() * 24 + ts.hour
+
+
+class _Profile:
+    """Hour-of-week seasonal profile of one pipeline."""
+
+    __slots__ = ("builds", "executor_seconds", "variance", "seen", "abs_error", "bias")
+
+    def __init__(self):
+        self.builds = [0.0] * HOURS_PER_WEEK
+        self.executor_seconds = [0.0] * HOURS_PER_WEEK
+        self.variance = [0.0] * HOURS_PER_WEEK  # Of executor_seconds
+        self.seen = [False] * HOURS_PER_WEEK
+        self.abs_error = 0.0  # Smoothed hourly error, executor-seconds
+        self.bias = 0.0
+
+    def update(self, slot: int, builds: float, executor_seconds: float, alpha: float) -> Optional[float]:
+        """Fold one observed hour into its slot; returns the error of the prior prediction."""
+        if not self.seen[slot]:
+            self.builds[slot] = builds
+            self.executor_seconds[slot] = executor_seconds
+            self.seen[slot] = True
+            return None
+
+        error = self.executor_seconds[slot] - executor_seconds
+        self.abs_error += ERROR_ALPHA * (abs(error) - self.abs_error)
+        self.bias += ERROR_ALPHA * (error - self.bias)
+
+        self.builds[slot] += alpha * (builds - self.builds[slot])
+        diff = executor_seconds - self.executor_seconds[slot]
+        self.executor_seconds[slot] += alpha * diff
+        self.variance[slot] = (1 - alpha) * (self.variance[slot] + alpha * diff * diff)
+        return error
+
+    def idle(self) -> bool:
+        return max(self.builds) < 1e-3 and max(self.executor_seconds) < 1.0
+
+
+class LoadForecaster:
+    """
+    Forecasts executor demand from hour-of-week seasonality.
+
+    Each pipeline keeps 168 hour-of-week slots holding an exponentially
+    weighted mean of builds started and executor-seconds used in that hour
+    (from the hourly rollups), plus a weighted variance for an upper band.
+    Training is incremental: each run only folds in the rollup hours that
+    settled since the previous run, hours without a rollup row counting as
+    idle, so rerunning it on a schedule costs one small range query. The
+    first run replays ``forecast_history_weeks`` of history.
+
+    Executor time is attributed to the hour a build started, so demand is
+    expressed as average busy executors per hour. Before each slot update,
+    the slot's value is the forecast made a week earlier; its error against
+    the observed hour is what the error statistics report.
+    """
+
+    def __init__(self):
+        self.history_weeks = settings.forecast_history_weeks
+        self.alpha = settings.forecast_smoothing
+        self.interval = settings.forecast_training_interval
+        self._profiles: Dict[str, _Profile] = {}
+        # Fleet-wide (predicted, actual) executor-seconds per scored hour
+        self._errors: Deque[Tuple[float, float]] = deque(maxlen=ERROR_WINDOW_HOURS)
+        self._trained_through: Optional[datetime] = None
+        self._trained_at: Optional[datetime] = None
+        self._lock = threading.Lock()
+
+    def due(self) -> bool:
+        trained_at = self._trained_at
+        return trained_at is None or datetime.utcnow() - trained_at >= timedelta(seconds=self.interval)
+
+    def train(self, db: Optional[Session] = None) -> int:
+        """Fold newly settled rollup hours into the profiles; returns hours trained."""
+        end = hour_bucket(datetime.utcnow() - SETTLE_TIME)
+        start = self._trained_through or end - timedelta(weeks=self.history_weeks)
+        if start >= end:
+            self._trained_at = datetime.utcnow()
+            return 0
+
+        own_session = db is None
+        db = db or get_session()
+        try:
+            rows = db.query(
+                BuildRollup.pipeline_name, BuildRollup.bucket_start,
+                BuildRollup.total_builds, BuildRollup.duration_sum
+            ).filter(BuildRollup.bucket_start >= start, BuildRollup.bucket_start < end).all()
+        finally:
+            if own_session:
+                db.close()
+
+        observed: Dict[datetime, Dict[str, Tuple[float, float]]] = {}
+        for row in rows:
+            observed.setdefault(row.bucket_start, {})[row.pipeline_name] = (
+                float(row.total_builds or 0), float(row.duration_sum or 0.0)
+            )
+
+        hours = 0
+        with self._lock:
+            # New pipelines are profiled from their first build, not as idle before it
+            first_seen: Dict[str, datetime] = {}
+            for bucket_start in sorted(observed):
+                for pipeline_name in observed[bucket_start]:
+                    if pipeline_name not in self._profiles:
+                        self._profiles[pipeline_name] = _Profile()
+                        first_seen[pipeline_name] = bucket_start
+
+            hour = start
+            while hour < end:
+                slot = hour_of_week(hour)
+                hourly = observed.get(hour, {})
+                predicted = actual = 0.0
+                scored = False
+                for pipeline_name, profile in self._profiles.items():
+                    if pipeline_name in first_seen and hour < first_seen[pipeline_name]:
+                        continue
+                    builds, executor_seconds = hourly.get(pipeline_name, (0.0, 0.0))
+                    if profile.seen[slot]:
+                        predicted += profile.executor_seconds[slot]
+                        scored = True
+                    actual += executor_seconds
+                    profile.update(slot, builds, executor_seconds, self.alpha)
+                if scored:
+                    self._errors.append((predicted, actual))
+                hour += timedelta(hours=1)
+                hours += 1
+
+            # Pipelines that stopped building decay to nothing; forget them
+            for pipeline_name in [n for n, p in self._profiles.items() if p.idle()]:
+                del self._profiles[pipeline_name]
+
+            self._trained_through = end
+            self._trained_at = datetime.utcnow()
+
+        logger.info(f"Trained load forecast on {hours} hours ({len(rows)} rollup rows)")
+        return hours
+
+    def forecast(self, hours: int = 24, pipeline_name: Optional[str] = None) -> Dict[str, Any]:
+        """Expected builds and busy executors for each of the next ``hours`` hours."""
+        start = hour_bucket(datetime.utcnow())
+        with self._lock:
+            if pipeline_name:
+                profiles = [self._profiles[pipeline_name]] if pipeline_name in self._profiles else []
+            else:
+                profiles = list(self._profiles.values())
+
+            points = []
+            for i in range(hours):
+                hour = start + timedelta(hours=i)
+                slot = hour_of_week(hour)
+                builds = sum(p.builds[slot] for p in profiles)
+                executor_seconds = sum(p.executor_seconds[slot] for p in profiles)
+                # Pipelines are treated as independent, so variances add
+                deviation = math.sqrt(sum(p.variance[slot] for p in profiles))
+                points.append({
+                    "hour": hour.isoformat(),
+                    "expected_builds": round(builds, 2),
+                    "expected_executors": round(executor_seconds / 3600, 2),
+                    "upper_executors": round((executor_seconds + 2 * deviation) / 3600, 2)
+                })
+
+            error = self._pipeline_error(profiles[0]) if pipeline_name and profiles else self._fleet_error()
+            trained_through = self._trained_through
+
+        peak = max(points, key=lambda p: p["expected_executors"]) if points else None
+        return {
+            "horizon_hours": hours,
+            "pipeline": pipeline_name,
+            "trained_through": trained_through.isoformat() if trained_through else None,
+            "points": points,
+            "peak": peak,
+            "recommended_executors": math.ceil(max((p["upper_executors"] for p in points), default=0)),
+            "error": error
+        }
+
+    def _fleet_error(self) -> Dict[str, Any]:
+        errors = list(self._errors)
+        if not errors:
+            return {"hours_scored": 0, "mae_executors": None, "rmse_executors": None,
+                    "bias_executors": None, "relative_error": None}
+        n = len(errors)
+        diffs = [(predicted - actual) / 3600 for predicted, actual in errors]
+        mae = sum(abs(d) for d in diffs) / n
+        mean_actual = sum(actual for _, actual in errors) / n / 3600
+        return {
+            "hours_scored": n,
+            "mae_executors": round(mae, 3),
+            "rmse_executors": round(math.sqrt(sum(d * d for d in diffs) / n), 3),
+            "bias_executors": round(sum(diffs) / n, 3),
+            "relative_error": round(mae / mean_actual, 3) if mean_actual else None
+        }
+
+    @staticmethod
+    def _pipeline_error(profile: _Profile) -> Dict[str, Any]:
+        return {
+            "mae_executors": round(profile.abs_error / 3600, 3),
+            "bias_executors": round(profile.bias / 3600, 3)
+        }
+
+    def pipelines(self) -> List[str]:
+        with self._lock:
+            return sorted(self._profiles)
+
+
+# Global load forecaster instance
+load_forecaster = LoadForecaster()
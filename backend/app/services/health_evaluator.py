@@ -0,0 +1,149 @@
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+from sqlalchemy import func, insert, update
+from ..config import settings
+from ..database import get_session
+from ..models import BuildRollup, Pipeline, PipelineHealth
+
+logger = logging.getLogger(__name__)
+
+
+def classify_health(failure_rate: float, avg_duration: Optional[float],
+                    failure_threshold: float, build_time_threshold: float) -> PipelineHealth:
+    """
+    Health from a failure rate (0..1) and average duration (seconds).
+
+    Same rules as the per-pipeline refresh: above the failure threshold is
+    UNHEALTHY; above 70% of it, or slower than the build time threshold, is
+    WARNING.
+    """
+    if failure_rate > failure_threshold:
+        return PipelineHealth.UNHEALTHY
+    if failure_rate > failure_threshold * 0.7 or (avg_duration or 0) > build_time_threshold:
+        return PipelineHealth.WARNING
+    return PipelineHealth.HEALTHY
+
+
+class HealthEvaluator:
+    """
+    Evaluates health for every pipeline in one pass.
+
+    One GROUP BY over the hourly rollups gives each pipeline's failure rate
+    and average duration for the trailing window; these are classified
+    against each pipeline's own thresholds, pipelines seen in the rollups
+    but missing from the pipelines table are created, and only changed
+    statuses are written back in a single bulk UPDATE. The resulting status
+    counts are kept in memory for the health summary endpoints.
+    """
+
+    def __init__(self):
+        self.window_days = settings.health_window_days
+        self.interval = settings.health_evaluation_interval
+        self._statuses: Dict[str, PipelineHealth] = {}
+        self._evaluated_at: Optional[datetime] = None
+        self._lock = threading.Lock()
+
+    def due(self) -> bool:
+        evaluated_at = self._evaluated_at
+        return evaluated_at is None or datetime.utcnow() - evaluated_at >= timedelta(seconds=self.interval)
+
+    def evaluate(self) -> Dict[str, Any]:
+        """Recompute and persist health for all pipelines; returns the summary."""
+        start = datetime.utcnow() - timedelta(days=self.window_days)
+        db = get_session()
+        try:
+            window = {
+                row.pipeline_name: row
+                for row in db.query(
+                    BuildRollup.pipeline_name,
+                    func.sum(BuildRollup.total_builds).label("total"),
+                    func.sum(BuildRollup.failure_count).label("failures"),
+                    func.sum(BuildRollup.duration_sum).label("duration_sum"),
+                    func.sum(BuildRollup.duration_count).label("duration_count")
+                ).filter(BuildRollup.bucket_start >= start).group_by(BuildRollup.pipeline_name)
+            }
+            pipelines = db.query(
+                Pipeline.id, Pipeline.name, Pipeline.health_status,
+                Pipeline.failure_rate_threshold, Pipeline.build_time_threshold
+            ).all()
+
+            known = {p.name for p in pipelines}
+            missing = sorted(set(window) - known)
+            if missing:
+                db.execute(insert(Pipeline), [
+                    {"name": name, "jenkins_job_name": name, "health_status": PipelineHealth.HEALTHY}
+                    for name in missing
+                ])
+                pipelines += db.query(
+                    Pipeline.id, Pipeline.name, Pipeline.health_status,
+                    Pipeline.failure_rate_threshold, Pipeline.build_time_threshold
+                ).filter(Pipeline.name.in_(missing)).all()
+
+            statuses: Dict[str, PipelineHealth] = {}
+            changes = []
+            for pipeline in pipelines:
+                stats = window.get(pipeline.name)
+                if stats is None or not stats.total:
+                    status = PipelineHealth.HEALTHY  # No builds in the window
+                else:
+                    avg_duration = stats.duration_sum / stats.duration_count if stats.duration_count else None
+                    status = classify_health(
+                        stats.failures / stats.total,
+                        avg_duration,
+                        pipeline.failure_rate_threshold if pipeline.failure_rate_threshold is not None
+                        else settings.failure_rate_threshold,
+                        pipeline.build_time_threshold if pipeline.build_time_threshold is not None
+                        else settings.build_time_threshold_minutes * 60
+                    )
+                statuses[pipeline.name] = status
+                if status != pipeline.health_status:
+                    changes.append({"id": pipeline.id, "health_status": status})
+
+            if changes:
+                # Executed as one executemany UPDATE keyed by primary key
+                db.execute(update(Pipeline), changes)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        with self._lock:
+            self._statuses = statuses
+            self._evaluated_at = datetime.utcnow()
+        logger.info(f"Evaluated health for {len(statuses)} pipelines ({len(changes)} changed)")
+        return self.summary()
+
+    def summary(self) -> Dict[str, Any]:
+        """Health counts from the last evaluation."""
+        with self._lock:
+            counts = {status: 0 for status in PipelineHealth}
+            for status in self._statuses.values():
+                counts[status] += 1
+            total = len(self._statuses)
+            evaluated_at = self._evaluated_at
+        healthy = counts[PipelineHealth.HEALTHY]
+        return {
+            "total_pipelines": total,
+            "healthy_pipelines": healthy,
+            "unhealthy_pipelines": counts[PipelineHealth.UNHEALTHY],
+            "warning_pipelines": counts[PipelineHealth.WARNING],
+            "health_percentage": round(healthy / total * 100, 2) if total else 0,
+            "window_days": self.window_days,
+            "evaluated_at": evaluated_at.isoformat() if evaluated_at else None
+        }
+
+    def status(self, pipeline_name: str) -> Optional[PipelineHealth]:
+        with self._lock:
+            return self._statuses.get(pipeline_name)
+
+    def statuses(self) -> Dict[str, str]:
+        with self._lock:
+            return {name: status.value for name, status in self._statuses.items()}
+
+
+# Global health evaluator instance
+health_evaluator = HealthEvaluator()
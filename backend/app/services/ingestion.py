@@ -0,0 +1,198 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from ..database import get_session
+from ..models import Build, BuildStatus
+from .jenkins import jenkins_client
+from .rollups import rollup_service
+from .window_counters import window_counters
+from .flakiness import flakiness_detector
+from .regression import duration_regression_detector
+from .delivery_metrics import delivery_metrics
+from .build_store import build_store
+from .aggregations import aggregation_service
+from .capacity import capacity_accounting
+from .correlation import failure_correlator
+from .build_writer import bulk_build_writer
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_actions(actions: Any) -> Dict[str, Any]:
+    """Extract the trigger, built branch and queue time (ms) from a build's actions."""
+    triggered_by = None
+    branch = None
+    queue_ms = None
+    for action in actions or []:
+        if not isinstance(action, dict):
+            continue
+        # TimeInQueueAction (metrics plugin)
+        if queue_ms is None and isinstance(action.get("queuingDurationMillis"), (int, float)):
+            queue_ms = action["queuingDurationMillis"]
+        for cause in action.get("causes") or []:
+            if triggered_by is None and isinstance(cause, dict):
+                triggered_by = cause.get("userId") or cause.get("userName") or cause.get("shortDescription")
+        revision = action.get("lastBuiltRevision")
+        if branch is None and isinstance(revision, dict):
+            branches = revision.get("branch") or []
+            if branches and isinstance(branches[0], dict) and branches[0].get("name"):
+                branch = branches[0]["name"]
+                for prefix in ("refs/remotes/origin/", "refs/heads/", "origin/"):
+                    if branch.startswith(prefix):
+                        branch = branch[len(prefix):]
+                        break
+    return {"triggered_by": triggered_by, "branch": branch, "queue_ms": queue_ms}
+
+
+def build_record_from_jenkins(job_name: str, build: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Normalize a Jenkins build JSON object into a `builds` table record.
+
+    Returns None for builds that are still running (no result yet).
+    """
+    if not isinstance(build, dict):
+        return None
+    result = build.get("result")
+    number = build.get("number")
+    if result is None or build.get("building") or number is None:
+        return None
+
+    # NOT_BUILT and any unknown results are stored as ABORTED
+    status = result if result in BuildStatus.__members__ else BuildStatus.ABORTED.value
+
+    ts = build.get("timestamp")
+    timestamp = datetime.utcfromtimestamp(ts / 1000) if isinstance(ts, (int, float)) else datetime.utcnow()
+
+    duration_ms = build.get("duration")
+    duration = int(round(duration_ms / 1000)) if isinstance(duration_ms, (int, float)) and duration_ms >= 0 else None
+
+    actions = _parse_actions(build.get("actions"))
+
+    return {
+        "pipeline_name": job_name,
+        "build_number": int(number),
+        "status": status,
+        "duration": duration,
+        "timestamp": timestamp,
+        "triggered_by": (actions["triggered_by"] or "jenkins")[:255],
+        "branch": actions["branch"],
+        "url": build.get("url"),
+        # An empty builtOn means the built-in (controller) node
+        "built_on": (build.get("builtOn") or "built-in")[:255],
+        "queue_wait": int(round(actions["queue_ms"] / 1000)) if actions["queue_ms"] is not None else None,
+    }
+
+
+class BuildIngestionService:
+    """
+    Ingests completed builds into the `builds` table and feeds the rollups.
+
+    A per-pipeline watermark (highest ingested build number) keeps polling
+    idempotent; callers pass builds in ascending order and stop at the first
+    build that is still running so none is skipped. Rows are written by the
+    bulk build writer, whose listener feeds the rollups and detectors, so
+    builds arriving through webhooks or backfills are counted the same way.
+    """
+
+    def __init__(self):
+        self._watermarks: Dict[str, int] = {}
+        self._loaded = False
+        # Bumped on every successful ingest so caches can detect new data
+        self.version = 0
+
+    def load_watermarks(self):
+        """Load the highest stored build number per pipeline."""
+        db = get_session()
+        try:
+            rows = db.query(Build.pipeline_name, func.max(Build.build_number)).group_by(Build.pipeline_name).all()
+            self._watermarks = {name: number for name, number in rows}
+            self._loaded = True
+        finally:
+            db.close()
+
+    def ingest(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Store new build records and fold them into the rollups."""
+        if not self._loaded:
+            self.load_watermarks()
+
+        fresh: List[Dict[str, Any]] = []
+        for record in records:
+            name = record["pipeline_name"]
+            if record["build_number"] <= self._watermarks.get(name, 0):
+                continue
+            fresh.append(record)
+            self._watermarks[name] = record["build_number"]
+
+        if not fresh:
+            return 0
+
+        for record in fresh:
+            capacity_accounting.fill_queue_wait(record)
+
+        try:
+            stats = bulk_build_writer.write(fresh)
+        except Exception as e:
+            # Let the next poll retry these builds
+            self.load_watermarks()
+            logger.error(f"Failed to ingest {len(fresh)} builds: {e}")
+            return 0
+
+        logger.info(f"Ingested {len(fresh)} builds ({stats['inserted']} new)")
+        return stats["inserted"]
+
+    def observe_new_builds(self, records: List[Dict[str, Any]], db: Session):
+        """
+        Fold newly stored builds into the rollups and detectors (writer listener).
+
+        Backfilled history (``db.info["backfill"]``) only reaches the rollups,
+        capacity and the build store, as Parquet imports do: the failure
+        streaks, flakiness, regression, correlation and window detectors
+        expect builds live and in order, and would alert on old builds.
+        """
+        backfill = db.info.get("backfill", False)
+        for record in records:
+            rollup_service.observe_build(record)
+            capacity_accounting.observe_build(record)
+            if backfill:
+                continue
+            delivery_metrics.observe_build(record)
+            window_counters.observe_build(record)
+            flakiness_detector.observe_build(record)
+            duration_regression_detector.observe_build(record)
+            failure_correlator.observe_build(record)
+        build_store.extend(records)
+        build_store.compact()
+        rollup_service.flush(db)
+        capacity_accounting.flush(db)
+        aggregation_service.invalidate()
+        self.version += 1
+
+    async def ingest_job(self, job_name: str, limit: int = 100) -> int:
+        """Fetch recent builds of a Jenkins job and ingest the completed ones (writes run off the event loop)."""
+        if not self._loaded:
+            await asyncio.to_thread(self.load_watermarks)
+
+        builds = await jenkins_client.list_build_details(job_name, limit=limit)
+        watermark = self._watermarks.get(job_name, 0)
+        pending = sorted(
+            (b for b in builds if isinstance(b, dict) and (b.get("number") or 0) > watermark),
+            key=lambda b: b["number"]
+        )
+
+        records = []
+        for build in pending:
+            record = build_record_from_jenkins(job_name, build)
+            if record is None:
+                # Stop at the first running build so the watermark never passes it
+                break
+            records.append(record)
+
+        return await asyncio.to_thread(self.ingest, records)
+
+
+# Global build ingestion service instance
+build_ingestion_service = BuildIngestionService()
+bulk_build_writer.add_listener(build_ingestion_service.observe_new_builds)
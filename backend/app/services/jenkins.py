@@ -5,6 +5,7 @@ from datetime import datetime, timedelta
 import time
 import os  # <-- added
 from ..config import settings
+from .downsampling import lttb
 
 logger = logging.getLogger(__name__)
 
@@ -172,6 +173,32 @@ class JenkinsClient:
             return builds
         return []
 
+    async def list_build_details(self, job_name: str, limit: int = 100) -> List[Dict]:
+        """List builds with the cause, SCM, node and queue fields needed for ingestion."""
+        endpoint = (
+            f"/job/{job_name}/api/json?tree=builds[number,url,result,timestamp,duration,building,builtOn,"
+            f"actions[causes[userId,userName,shortDescription],lastBuiltRevision[branch[name]],"
+            f"queuingDurationMillis]]{{0,{limit}}}"
+        )
+        cache_key = self._get_cache_key(endpoint)
+        cached = self._get_cached_response(cache_key)
+        if cached:
+            return cached
+
+        result = await self._make_request(endpoint)
+        if result:
+            builds = [self._rewrite_build(b) for b in result.get("builds", [])]
+            self._set_cached_response(cache_key, builds)
+            return builds
+        return []
+
+    async def get_queue(self) -> List[Dict]:
+        """List items waiting in the build queue."""
+        result = await self._make_request("/queue/api/json?tree=items[id,inQueueSince,why,task[name]]")
+        if result:
+            return result.get("items", [])
+        return []
+
     async def get_build(self, job_name: str, build_number: int) -> Optional[Dict]:
         """Get detailed information for a specific build."""
         cache_key = self._get_cache_key(f"/job/{job_name}/{build_number}/api/json")
@@ -260,8 +287,13 @@ class JenkinsClient:
         self._set_cached_response(cache_key, stats)
         return stats
 
-    async def get_build_trends(self, days: int = 30) -> Dict[str, Any]:
-        """Get build trends over time."""
+    async def get_build_trends(self, days: int = 30, max_points: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Get build trends over time.
+
+        ``build_duration_trend`` is sorted by timestamp and, when
+        ``max_points`` is set, downsampled with LTTB so spikes survive.
+        """
         jobs = await self.list_jobs()
         trends = {
             "build_status_distribution": {},
@@ -299,6 +331,11 @@ class JenkinsClient:
             else:
                 trends["job_distribution"]["not_built"] = trends["job_distribution"].get("not_built", 0) + 1
 
+        points = sorted(trends["build_duration_trend"], key=lambda p: p["timestamp"] or 0)
+        trends["total_duration_points"] = len(points)
+        trends["build_duration_trend"] = lttb(
+            points, max_points, x=lambda p: p["timestamp"] or 0, y=lambda p: p["duration"]
+        )
         return trends
 
     def clear_cache(self):
@@ -1,9 +1,18 @@
 import asyncio
 import logging
-from typing import Dict, Set
+from typing import Dict, Optional, Set, Tuple
 from datetime import datetime
 from .jenkins import jenkins_client
 from .notification_service import notification_service
+from .ingestion import build_ingestion_service
+from .regression import duration_regression_detector
+from .health_evaluator import health_evaluator
+from .capacity import capacity_accounting
+from .forecasting import load_forecaster
+from .build_writer import bulk_build_writer
+from .correlation import failure_correlator
+from .retention import retention_manager
+from ..config import settings
 
 logger = logging.getLogger(__name__)
 
@@ -54,9 +63,13 @@ class JobMonitor:
     async def _check_job_status(self):
         """Check for job status changes and send notifications."""
         try:
+            # Snapshot the queue first so builds that just left it can be matched
+            await self._observe_queue()
+            
             # Get current job states
             jobs = await jenkins_client.list_jobs()
             current_states = {}
+            failures = []
             
             for job in jobs:
                 job_name = job.get('name')
@@ -71,21 +84,107 @@ class JobMonitor:
                 }
                 
                 # Check if this is a new failure
-                await self._check_job_failure(job_name, current_states[job_name])
+                failure = self._check_job_failure(job_name, current_states[job_name])
+                if failure:
+                    failures.append(failure)
+                
+                # Ingest newly completed builds into the builds table and rollups
+                await self._ingest_new_builds(job_name, current_states[job_name])
             
             # Update previous states
             self.previous_job_states = current_states
             
+            # Write builds buffered from webhooks since the last poll
+            await asyncio.to_thread(bulk_build_writer.flush_if_due)
+            
+            # Ingestion has correlated the new failures; alert per incident, not per job
+            await self._notify_incidents()
+            for failure in failures:
+                await self._notify_job_failure(*failure)
+            
+            await self._notify_duration_regressions()
+            
+            if health_evaluator.due():
+                await self._evaluate_health()
+            
+            if load_forecaster.due():
+                await self._train_forecast()
+            
+            if retention_manager.due():
+                await self._apply_retention()
+            
         except Exception as e:
             logger.error(f"Error checking job status: {e}")
 
-    async def _check_job_failure(self, job_name: str, current_state: Dict):
-        """Check if a job has failed and send notification."""
+    async def _observe_queue(self):
+        """Record queued items for queue-wait accounting."""
+        try:
+            capacity_accounting.observe_queue(await jenkins_client.get_queue())
+        except Exception as e:
+            logger.error(f"Failed to read the build queue: {e}")
+
+    async def _evaluate_health(self):
+        """Re-evaluate health for all pipelines from the rollups, off the event loop."""
+        try:
+            await asyncio.to_thread(health_evaluator.evaluate)
+        except Exception as e:
+            logger.error(f"Failed to evaluate pipeline health: {e}")
+
+    async def _train_forecast(self):
+        """Fold newly settled rollup hours into the load forecast, off the event loop."""
+        try:
+            await asyncio.to_thread(load_forecaster.train)
+        except Exception as e:
+            logger.error(f"Failed to train load forecast: {e}")
+
+    async def _apply_retention(self):
+        """Archive old console logs and delete builds past retention, off the event loop."""
+        try:
+            await asyncio.to_thread(retention_manager.run)
+        except Exception as e:
+            logger.error(f"Failed to apply retention: {e}")
+
+    async def _ingest_new_builds(self, job_name: str, current_state: Dict):
+        """Ingest builds when the job's last build changed since the previous poll."""
+        previous_state = self.previous_job_states.get(job_name) or {}
+        last_build = current_state.get('last_build') or {}
+        previous_last = previous_state.get('last_build') or {}
+        
+        if previous_state and last_build.get('number') == previous_last.get('number') \
+                and current_state.get('color') == previous_state.get('color'):
+            return
+        
+        try:
+            count = await build_ingestion_service.ingest_job(job_name)
+            if count:
+                logger.info(f"Ingested {count} new builds for {job_name}")
+        except Exception as e:
+            logger.error(f"Failed to ingest builds for {job_name}: {e}")
+
+    async def _notify_duration_regressions(self):
+        """Send alerts for duration regressions detected during ingestion."""
+        alerts = duration_regression_detector.drain_alerts()
+        if not alerts or not settings.regression_notifications_enabled:
+            return
+        
+        for alert in alerts:
+            success = await notification_service.send_duration_regression_notification(
+                job_name=alert['pipeline'],
+                build_number=alert['build_number'],
+                build_url=alert.get('build_url') or '',
+                baseline_seconds=alert['baseline_seconds'],
+                current_seconds=alert['current_seconds']
+            )
+            if not success:
+                logger.error(f"Failed to send regression notification for {alert['pipeline']}")
+
+    def _check_job_failure(self, job_name: str, current_state: Dict) -> Optional[Tuple[str, int, str]]:
+        """Return (job, build number, url) if the job just transitioned to failed."""
         previous_state = self.previous_job_states.get(job_name)
         
         if not previous_state:
             # First time seeing this job, just record the state
-            return
+            return None
         
         current_color = current_state.get('color', '')
         previous_color = previous_state.get('color', '')
@@ -94,25 +193,38 @@ class JobMonitor:
         if (previous_color != 'red' and current_color == 'red' and 
             current_state.get('last_failed') and 
             current_state['last_failed'].get('number')):
-            
-            # Job has failed, send notification
-            build_number = current_state['last_failed']['number']
-            build_url = current_state['last_failed'].get('url', '')
-            
-            logger.info(f"Job {job_name} failed at build #{build_number}, sending notification")
-            
-            # Send email notification
-            success = await notification_service.send_job_failure_notification(
-                job_name=job_name,
-                build_number=build_number,
-                build_url=build_url,
-                failure_reason="Build failed"
-            )
-            
-            if success:
-                logger.info(f"Failure notification sent for {job_name} #{build_number}")
-            else:
-                logger.error(f"Failed to send notification for {job_name} #{build_number}")
+            return job_name, current_state['last_failed']['number'], current_state['last_failed'].get('url', '')
+        return None
+
+    async def _notify_job_failure(self, job_name: str, build_number: int, build_url: str):
+        """Send a job failure alert unless the failure is part of an incident."""
+        incident_id = failure_correlator.incident_for(job_name, build_number)
+        if incident_id is not None:
+            logger.info(f"Job {job_name} #{build_number} failed as part of incident {incident_id}; "
+                        f"covered by the incident alert")
+            return
+        
+        logger.info(f"Job {job_name} failed at build #{build_number}, sending notification")
+        
+        # Send email notification
+        success = await notification_service.send_job_failure_notification(
+            job_name=job_name,
+            build_number=build_number,
+            build_url=build_url,
+            failure_reason="Build failed"
+        )
+        
+        if success:
+            logger.info(f"Failure notification sent for {job_name} #{build_number}")
+        else:
+            logger.error(f"Failed to send notification for {job_name} #{build_number}")
+
+    async def _notify_incidents(self):
+        """Send one alert per newly detected cross-pipeline incident."""
+        for incident in failure_correlator.drain_new_incidents():
+            success = await notification_service.send_incident_notification(incident)
+            if not success:
+                logger.error(f"Failed to send notification for incident {incident['id']}")
 
     async def get_monitoring_status(self) -> Dict:
         """Get current monitoring status."""
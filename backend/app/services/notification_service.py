@@ -410,6 +410,112 @@ Build ID: {build.id}
             logger.error(f"Failed to send job failure notification: {e}")
             return False
 
+    async def send_duration_regression_notification(self, job_name: str, build_number: int, build_url: str,
+                                                    baseline_seconds: float, current_seconds: float) -> bool:
+        """Send email notification for a detected build duration regression."""
+        if not all([self.smtp_server, self.smtp_username, self.smtp_password, self.from_email, self.to_email]):
+            logger.warning("Email notification not configured - missing SMTP settings")
+            return False
+
+        notification_key = f"{job_name}_{build_number}_regression"
+        if notification_key in self._sent_notifications:
+            logger.info(f"Notification already sent for {notification_key}")
+            return True
+
+        increase = (current_seconds / baseline_seconds - 1) * 100 if baseline_seconds else 0
+        try:
+            msg = MIMEMultipart('alternative')
+            msg['Subject'] = f"🐢 Build Duration Regression: {job_name} (+{increase:.0f}%)"
+            msg['From'] = self.from_email
+            msg['To'] = self.to_email
+
+            html_content = f"""
+            <html>
+            <body style="font-family: Arial, sans-serif; margin: 20px;">
+                <h2>Build Duration Regression Detected</h2>
+                <p><strong>Job Name:</strong> {job_name}</p>
+                <p><strong>Detected At Build:</strong> #{build_number}</p>
+                <p><strong>Baseline Duration:</strong> {baseline_seconds / 60:.1f} minutes</p>
+                <p><strong>Current Duration:</strong> {current_seconds / 60:.1f} minutes (+{increase:.0f}%)</p>
+                <p><a href="{build_url}">View Build Details</a></p>
+                <p style="font-size: 12px; color: #666;">
+                    This is an automated notification from your CI/CD Health Dashboard.
+                </p>
+            </body>
+            </html>
+            """
+            msg.attach(MIMEText(html_content, 'html'))
+
+            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
+                server.starttls()
+                server.login(self.smtp_username, self.smtp_password)
+                server.send_message(msg)
+
+            self._sent_notifications.add(notification_key)
+            logger.info(f"Duration regression notification sent for {job_name} #{build_number}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Failed to send duration regression notification: {e}")
+            return False
+
+    async def send_incident_notification(self, incident: Dict[str, Any]) -> bool:
+        """Send one email for a group of pipelines failing together."""
+        if not all([self.smtp_server, self.smtp_username, self.smtp_password, self.from_email, self.to_email]):
+            logger.warning("Email notification not configured - missing SMTP settings")
+            return False
+
+        notification_key = f"incident_{incident['id']}_{incident['started_at']}"
+        if notification_key in self._sent_notifications:
+            logger.info(f"Notification already sent for {notification_key}")
+            return True
+
+        try:
+            msg = MIMEMultipart('alternative')
+            msg['Subject'] = f"🔥 Possible infrastructure incident: {incident['pipeline_count']} pipelines failing"
+            msg['From'] = self.from_email
+            msg['To'] = self.to_email
+
+            rows = "".join(
+                f"<tr><td>{b['pipeline']}</td><td>#{b['build_number']}</td><td>{b.get('node') or '-'}</td>"
+                f"<td>{b['failed_at']}</td><td><a href=\"{b.get('url') or ''}\">View</a></td></tr>"
+                for b in incident['builds']
+            )
+            suspected = f"<p><strong>Suspected Node:</strong> {incident['suspected_node']}</p>" \
+                if incident.get('suspected_node') else ""
+            html_content = f"""
+            <html>
+            <body style="font-family: Arial, sans-serif; margin: 20px;">
+                <h2>Correlated Failures Detected</h2>
+                <p><strong>Pipelines:</strong> {', '.join(incident['pipelines'])}</p>
+                <p><strong>Started At:</strong> {incident['started_at']}</p>
+                {suspected}
+                <table border="1" cellpadding="4" cellspacing="0">
+                    <tr><th>Pipeline</th><th>Build</th><th>Node</th><th>Failed At</th><th></th></tr>
+                    {rows}
+                </table>
+                <p style="font-size: 12px; color: #666;">
+                    Individual job alerts for these builds are suppressed.
+                    This is an automated notification from your CI/CD Health Dashboard.
+                </p>
+            </body>
+            </html>
+            """
+            msg.attach(MIMEText(html_content, 'html'))
+
+            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
+                server.starttls()
+                server.login(self.smtp_username, self.smtp_password)
+                server.send_message(msg)
+
+            self._sent_notifications.add(notification_key)
+            logger.info(f"Incident notification sent for incident {incident['id']}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Failed to send incident notification: {e}")
+            return False
+
     def clear_sent_notifications(self):
         """Clear the sent notifications cache."""
         self._sent_notifications.clear()
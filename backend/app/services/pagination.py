@@ -0,0 +1,135 @@
+import base64
+import binascii
+import json
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import DateTime, func, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..config import settings
+
+
+class CursorError(ValueError):
+    """Raised for a malformed cursor or one issued for a different listing."""
+
+
+class Keyset:
+    """
+    Keyset (seek) pagination over a unique, ordered tuple of columns.
+
+    Instead of ``OFFSET (page - 1) * size``, which reads and discards every
+    earlier row, each page continues from the last key of the previous one:
+    ``WHERE (timestamp, id) < (:ts, :id) ORDER BY timestamp DESC, id DESC``.
+    With an index on the leading column every page costs the same. Cursor
+    tokens are opaque (base64url JSON of the last key) and name the listing
+    and direction they were issued for, so they cannot be replayed against
+    a different ordering.
+    """
+
+    def __init__(self, name: str, *columns, descending: bool = True):
+        self.name = name
+        self.columns = columns
+        self.descending = descending
+
+    @property
+    def _scope(self) -> str:
+        return f"{self.name}:{'desc' if self.descending else 'asc'}"
+
+    def encode(self, row) -> str:
+        values = [getattr(row, column.key) for column in self.columns]
+        payload = {
+            "k": self._scope,
+            "v": [v.isoformat() if isinstance(v, datetime) else v for v in values],
+        }
+        raw = json.dumps(payload, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    def decode(self, cursor: str) -> List[Any]:
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            payload = json.loads(raw)
+            values = payload["v"]
+            scope = payload["k"]
+        except (binascii.Error, ValueError, KeyError, TypeError):
+            raise CursorError("Invalid cursor")
+        if scope != self._scope or not isinstance(values, list) or len(values) != len(self.columns):
+            raise CursorError("Cursor does not belong to this listing")
+        try:
+            return [
+                datetime.fromisoformat(v) if isinstance(column.type, DateTime) and v is not None else v
+                for column, v in zip(self.columns, values)
+            ]
+        except (TypeError, ValueError):
+            raise CursorError("Invalid cursor")
+
+    def apply(self, stmt, cursor: Optional[str], size: int):
+        """Order ``stmt`` by the key, seek past ``cursor`` and fetch one row past the page."""
+        if cursor:
+            decoded = self.decode(cursor)
+            key, values = tuple_(*self.columns), tuple_(*decoded)
+            stmt = stmt.where(key < values if self.descending else key > values)
+            # Redundant bound on the leading column: planners prune partitions and
+            # start the range scan on it, which they do not derive from a row comparison
+            leading = self.columns[0]
+            stmt = stmt.where(leading <= decoded[0] if self.descending else leading >= decoded[0])
+        order = [c.desc() if self.descending else c.asc() for c in self.columns]
+        return stmt.order_by(*order).limit(size + 1)
+
+    def page(self, rows: Sequence, size: int) -> Tuple[Sequence, Optional[str]]:
+        """Trim the look-ahead row; returns the page and the cursor for the next one."""
+        if len(rows) <= size:
+            return rows, None
+        rows = rows[:size]
+        return rows, self.encode(rows[-1])
+
+
+class CountCache:
+    """
+    Cached row counts for listing totals.
+
+    An exact ``COUNT(*)`` scans every matching row, so listings only count
+    when asked to and reuse the result for ``listing_count_cache_ttl``
+    seconds. Unfiltered counts on PostgreSQL come from the planner's
+    ``pg_class.reltuples`` estimate instead and are reported as approximate.
+    """
+
+    def __init__(self, ttl: Optional[int] = None):
+        self.ttl = settings.listing_count_cache_ttl if ttl is None else ttl
+        self._cache: Dict[str, Tuple[float, int, bool]] = {}
+        self._lock = threading.Lock()
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    async def acount(self, db: AsyncSession, key: str, stmt, table: Optional[str] = None) -> Tuple[int, bool]:
+        """``(total, approximate)`` for ``stmt``; pass ``table`` when the statement is unfiltered."""
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry and time.time() - entry[0] < self.ttl:
+                return entry[1], entry[2]
+
+        total, approximate = None, False
+        if table and db.get_bind().dialect.name == "postgresql":
+            # Summed over the partitions of a partitioned table; -1 until a table is first analyzed
+            estimate = (await db.execute(text(
+                "SELECT COALESCE("
+                "(SELECT SUM(c.reltuples) FILTER (WHERE c.reltuples > 0) FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid WHERE i.inhparent = CAST(:table AS regclass)), "
+                "(SELECT reltuples FROM pg_class WHERE oid = CAST(:table AS regclass)))::bigint"
+            ), {"table": table})).scalar()
+            if estimate and estimate > 0:
+                total, approximate = int(estimate), True
+        if total is None:
+            total = (await db.execute(select(func.count()).select_from(stmt.subquery()))).scalar() or 0
+
+        with self._lock:
+            if len(self._cache) >= 256:
+                self._cache.pop(min(self._cache, key=lambda k: self._cache[k][0]))
+            self._cache[key] = (time.time(), total, approximate)
+        return total, approximate
+
+
+# Global listing count cache
+listing_counts = CountCache()
@@ -0,0 +1,219 @@
+import logging
+import math
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from sqlalchemy import func
+from ..config import settings
+from ..database import get_session
+from ..models import Build
+
+logger = logging.getLogger(__name__)
+
+
+class _DurationState:
+    """Online statistics for one pipeline's log-durations."""
+
+    __slots__ = ("n", "mean", "var", "fast", "cusum", "run_sum", "run_n", "reference")
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0   # Slow EWMA baseline
+        self.var = 0.0    # EW variance around the baseline
+        self.fast = 0.0   # Fast EWMA tracking the current level
+        self.cusum = 0.0  # One-sided CUSUM of standardized excess
+        # Builds since the CUSUM last touched zero, i.e. the estimated
+        # changepoint, and the sum of their log-durations
+        self.run_sum = 0.0
+        self.run_n = 0
+        # Baseline from before a shift too small to report; later increases
+        # are measured from it so a slowdown detected in steps is still caught
+        self.reference: Optional[float] = None
+
+
+class DurationRegressionDetector:
+    """
+    Flags statistically significant build slowdowns per pipeline.
+
+    Durations are tracked in log space (so a slowdown is a relative shift)
+    with a slow EWMA baseline and variance. A one-sided CUSUM on the
+    standardized residuals acts as the changepoint test: a sustained shift of
+    a couple of standard deviations crosses the threshold within a few
+    builds, while isolated outliers decay away. The builds since the CUSUM
+    last touched zero estimate where the change started; their mean is the
+    new level, and the baseline is reset to it after an alarm so the same
+    slowdown is reported once. The increase is measured from the baseline
+    before the last reported (or any) alarm, so a slowdown whose first alarm
+    understates it is reported on the next one.
+    """
+
+    def __init__(self):
+        self.baseline_alpha = settings.regression_baseline_alpha
+        self.fast_alpha = settings.regression_fast_alpha
+        self.threshold = settings.regression_cusum_threshold
+        self.slack = settings.regression_cusum_slack
+        self.warmup_builds = settings.regression_warmup_builds
+        self.min_increase = settings.regression_min_increase
+        self.active_days = settings.regression_active_days
+        # Floor for the standard deviation (~5%) so very steady pipelines do
+        # not alarm on a few seconds of noise
+        self.min_std = 0.05
+        self._states: Dict[str, _DurationState] = {}
+        self._events: Dict[str, Dict[str, Any]] = {}
+        self._pending_alerts: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def observe_build(self, build: Dict[str, Any], notify: bool = True) -> Optional[Dict[str, Any]]:
+        """Update a pipeline's statistics; returns a regression event if one fired."""
+        pipeline_name = build.get("pipeline_name")
+        duration = build.get("duration")
+        if not pipeline_name or duration is None or duration < 0:
+            return None
+        if build.get("status") not in ("SUCCESS", "UNSTABLE"):
+            return None  # Failed builds often stop early and skew durations
+
+        x = math.log1p(duration)
+        with self._lock:
+            state = self._states.setdefault(pipeline_name, _DurationState())
+            event = self._update(state, pipeline_name, x, build)
+            if event:
+                self._events[pipeline_name] = event
+                if notify:
+                    self._pending_alerts.append(event)
+        if event:
+            logger.info(
+                f"Duration regression on {pipeline_name}: "
+                f"{event['baseline_seconds']:.0f}s -> {event['current_seconds']:.0f}s"
+            )
+        return event
+
+    def _update(self, state: _DurationState, pipeline_name: str, x: float,
+                build: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        state.n += 1
+
+        if state.n <= self.warmup_builds:
+            # Welford's running mean/variance until the baseline is stable
+            delta = x - state.mean
+            state.mean += delta / state.n
+            state.var += (delta * (x - state.mean) - state.var) / state.n
+            state.fast = state.mean
+            return None
+
+        std = max(math.sqrt(state.var), self.min_std)
+        z = (x - state.mean) / std
+        state.fast += self.fast_alpha * (x - state.fast)
+        # Cap each build's contribution so one outlier cannot trip the alarm alone
+        state.cusum = max(0.0, state.cusum + min(z, 3.0) - self.slack)
+        if state.cusum == 0.0:
+            state.run_sum, state.run_n = 0.0, 0
+        else:
+            state.run_sum += x
+            state.run_n += 1
+
+        if state.cusum > self.threshold:
+            level = state.run_sum / state.run_n
+            # A baseline that has since drifted lower (a speedup) is the fairer reference
+            baseline = state.mean if state.reference is None else min(state.reference, state.mean)
+            cusum, run_n = state.cusum, state.run_n
+            increase = math.expm1(level) / max(math.expm1(baseline), 1e-9) - 1
+            # New regime either way: re-baseline the test on the post-change level
+            state.mean = level
+            state.cusum = 0.0
+            state.run_sum, state.run_n = 0.0, 0
+            if increase < self.min_increase:
+                # Significant but too small to flag yet; keep measuring from the old baseline
+                state.reference = baseline
+                return None
+            state.reference = None
+
+            return {
+                "pipeline": pipeline_name,
+                "build_number": build.get("build_number"),
+                "build_url": build.get("url"),
+                "detected_at": build.get("timestamp") or datetime.utcnow(),
+                "baseline_seconds": round(math.expm1(baseline), 1),
+                "current_seconds": round(math.expm1(level), 1),
+                "increase_pct": round(increase * 100, 1),
+                "cusum": round(cusum, 2),
+                "builds_since_change": run_n
+            }
+
+        if state.cusum > self.threshold / 2:
+            return None  # Possible shift in progress; keep the baseline frozen
+
+        # Winsorize so single outliers barely move the baseline
+        clipped = state.mean + max(-3.0, min(3.0, z)) * std
+        delta = clipped - state.mean
+        state.mean += self.baseline_alpha * delta
+        state.var = (1 - self.baseline_alpha) * (state.var + self.baseline_alpha * delta * delta)
+        return None
+
+    def warm_up(self, builds_per_pipeline: int = 50):
+        """Replay each pipeline's recent builds without sending alerts."""
+        db = get_session()
+        try:
+            row_number = func.row_number().over(
+                partition_by=Build.pipeline_name,
+                order_by=Build.timestamp.desc()
+            ).label("rn")
+            recent = db.query(
+                Build.pipeline_name, Build.build_number, Build.status,
+                Build.duration, Build.timestamp, Build.url, row_number
+            ).subquery()
+            rows = db.query(recent).filter(recent.c.rn <= builds_per_pipeline).order_by(recent.c.timestamp).all()
+        finally:
+            db.close()
+
+        with self._lock:
+            self._states.clear()
+            self._events.clear()
+        for row in rows:
+            self.observe_build({
+                "pipeline_name": row.pipeline_name,
+                "build_number": row.build_number,
+                "status": row.status.value if hasattr(row.status, "value") else row.status,
+                "duration": row.duration,
+                "timestamp": row.timestamp,
+                "url": row.url
+            }, notify=False)
+        logger.info(f"Duration regression detector warmed up with {len(rows)} builds")
+
+    def drain_alerts(self) -> List[Dict[str, Any]]:
+        """Return and clear regression events waiting to be notified."""
+        with self._lock:
+            alerts, self._pending_alerts = self._pending_alerts, []
+        return alerts
+
+    def active_regression(self, pipeline_name: str) -> Optional[Dict[str, Any]]:
+        """Most recent regression for a pipeline if it is still considered active."""
+        cutoff = datetime.utcnow() - timedelta(days=self.active_days)
+        with self._lock:
+            event = self._events.get(pipeline_name)
+        if event and event["detected_at"] >= cutoff:
+            return event
+        return None
+
+    def regressions(self) -> List[Dict[str, Any]]:
+        """All active regressions, most recent first."""
+        with self._lock:
+            names = list(self._events)
+        events = [e for e in (self.active_regression(n) for n in names) if e]
+        return sorted(events, key=lambda e: e["detected_at"], reverse=True)
+
+    def pipeline_state(self, pipeline_name: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            state = self._states.get(pipeline_name)
+            if not state:
+                return None
+            return {
+                "pipeline": pipeline_name,
+                "builds_observed": state.n,
+                "baseline_seconds": round(math.expm1(state.mean), 1),
+                "ewma_seconds": round(math.expm1(state.fast), 1),
+                "log_std": round(math.sqrt(state.var), 4),
+                "cusum": round(state.cusum, 2)
+            }
+
+
+# Global duration regression detector instance
+duration_regression_detector = DurationRegressionDetector()
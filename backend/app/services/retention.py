@@ -0,0 +1,345 @@
+import gzip
+import json
+import logging
+import os
+import re
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence
+from sqlalchemy import delete, func, select, text, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from .. import database
+from ..config import settings
+from ..database import get_session
+from ..models import Build, Notification, Pipeline
+from ..partitioning import month_start, partition_manager
+from .aggregations import aggregation_service
+from .pagination import listing_counts
+
+logger = logging.getLogger(__name__)
+
+
+def archive_path(pipeline_name: str, timestamp: datetime) -> str:
+    """Archive file (relative to ``archive_dir``) for a build's console log: one per pipeline and month."""
+    safe = re.sub(r"[^A-Za-z0-9._-]", "_", pipeline_name)
+    return os.path.join(safe, f"{timestamp:%Y-%m}.jsonl.gz")
+
+
+class RetentionManager:
+    """
+    Ages out build history in small batches.
+
+    Each run moves console logs older than ``log_archive_after_days`` into
+    gzip-compressed JSON-lines files under ``archive_dir`` (one per pipeline
+    and month, appended as new gzip members), deletes raw builds older than
+    their pipeline's ``retention_days`` (or the ``retention_days`` default)
+    together with their notifications, and deletes notifications older
+    than ``notification_retention_days``. Hourly rollups are never deleted,
+    so dashboards and analytics keep the full history.
+
+    When ``builds`` is partitioned by month (PostgreSQL), partitions older
+    than every pipeline's retention are dropped whole instead.
+
+    Work is done ``retention_batch_size`` rows at a time, each batch in its
+    own transaction, and a run stops after ``retention_max_batches`` so the
+    writer is never held for long; the next run continues where it stopped.
+    Afterwards the database is analyzed (and vacuumed on SQLite once enough
+    pages are free) and the space reclaimed is reported.
+    """
+
+    def __init__(self):
+        self.batch_size = settings.retention_batch_size
+        self.max_batches = settings.retention_max_batches
+        self.interval = settings.retention_interval
+        self.archive_dir = settings.archive_dir
+        self.last_report: Optional[Dict[str, Any]] = None
+        self._ran_at: Optional[datetime] = None
+        self._run_lock = threading.Lock()
+
+    def due(self) -> bool:
+        ran_at = self._ran_at
+        return ran_at is None or datetime.utcnow() - ran_at >= timedelta(seconds=self.interval)
+
+    # --------------------------------------------------------------- policies
+
+    @staticmethod
+    def _policies(db: Session) -> Dict[str, int]:
+        return dict(db.query(Pipeline.name, Pipeline.retention_days).filter(Pipeline.retention_days.isnot(None)).all())
+
+    def policies(self) -> Dict[str, int]:
+        """Per-pipeline raw build retention in days (pipelines using the default are omitted)."""
+        db = get_session()
+        try:
+            return self._policies(db)
+        finally:
+            db.close()
+
+    def set_policy(self, pipeline_name: str, days: Optional[int]):
+        """Keep a pipeline's raw builds for ``days`` (0 keeps them forever, None restores the default)."""
+        db = get_session()
+        try:
+            pipeline = db.query(Pipeline).filter(Pipeline.name == pipeline_name).first()
+            if pipeline is None:
+                pipeline = Pipeline(name=pipeline_name)
+                db.add(pipeline)
+            pipeline.retention_days = days
+            db.commit()
+        finally:
+            db.close()
+
+    # ---------------------------------------------------------------- archive
+
+    def _archive(self, db: Session, conditions: Sequence, limit: Optional[int] = None) -> Dict[str, int]:
+        """Move matching console logs to the archive files; returns logs and compressed bytes written."""
+        stmt = select(Build.id, Build.pipeline_name, Build.build_number, Build.timestamp, Build.console_output) \
+            .where(Build.console_output.isnot(None), *conditions).order_by(Build.timestamp)
+        rows = db.execute(stmt.limit(limit) if limit else stmt).all()
+        if not rows:
+            return {"logs": 0, "bytes": 0}
+
+        files: Dict[str, List[Any]] = {}
+        for row in rows:
+            files.setdefault(archive_path(row.pipeline_name, row.timestamp or datetime.utcnow()), []).append(row)
+
+        written = 0
+        for path, file_rows in files.items():
+            full_path = os.path.join(self.archive_dir, path)
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            size = os.path.getsize(full_path) if os.path.exists(full_path) else 0
+            # Appending adds a gzip member; readers see one continuous stream
+            with gzip.open(full_path, "at", encoding="utf-8") as f:
+                for row in file_rows:
+                    f.write(json.dumps({
+                        "pipeline_name": row.pipeline_name,
+                        "build_number": row.build_number,
+                        "timestamp": row.timestamp.isoformat() if row.timestamp else None,
+                        "console_output": row.console_output,
+                    }) + "\n")
+            written += os.path.getsize(full_path) - size
+
+        # Files are written first: a failed update only leaves a duplicate the reader ignores
+        db.execute(update(Build), [
+            {"id": row.id, "console_output": None, "console_archive": path}
+            for path, file_rows in files.items() for row in file_rows
+        ])
+        db.commit()
+        return {"logs": len(rows), "bytes": written}
+
+    def read_console(self, pipeline_name: str, build_number: int, console_archive: str) -> Optional[str]:
+        """A console log moved to the archive, or None if the file or entry is missing."""
+        path = os.path.join(self.archive_dir, console_archive)
+        if not os.path.exists(path):
+            return None
+        found = None
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                entry = json.loads(line)
+                if entry["pipeline_name"] == pipeline_name and entry["build_number"] == build_number:
+                    found = entry["console_output"]
+        return found
+
+    # ------------------------------------------------------------------ purge
+
+    def _delete_builds(self, db: Session, ids: List[int]) -> Dict[str, int]:
+        """Delete builds and their notifications; returns notifications deleted and logs archived."""
+        # Logs not archived yet (retention shorter than the archive age) are kept
+        archived = self._archive(db, [Build.id.in_(ids)])
+        notifications = db.execute(
+            delete(Notification).where(Notification.build_id.in_(ids)).execution_options(synchronize_session=False)
+        ).rowcount
+        db.execute(delete(Build).where(Build.id.in_(ids)).execution_options(synchronize_session=False))
+        db.commit()
+        return {**archived, "notifications": notifications}
+
+    def _cutoffs(self, db: Session, now: datetime) -> Dict[str, datetime]:
+        """Raw build cutoff per pipeline with builds; pipelines that keep everything are left out."""
+        policies = self._policies(db)
+        cutoffs = {}
+        for (pipeline_name,) in db.query(Build.pipeline_name).distinct().all():
+            days = policies.get(pipeline_name, settings.retention_days)
+            if days:
+                cutoffs[pipeline_name] = now - timedelta(days=days)
+        return cutoffs
+
+    def _drop_partitions(self, db: Session, now: datetime, report: Dict[str, Any]):
+        """Drop partitions no pipeline keeps, after archiving their logs and deleting their notifications."""
+        policies = [settings.retention_days, *self._policies(db).values()]
+        if not all(policies):
+            return
+        bound = month_start(now - timedelta(days=max(policies)))
+        while report["batches"] < self.max_batches:
+            archived = self._archive(db, [Build.timestamp < bound], limit=self.batch_size)
+            if not archived["logs"]:
+                break
+            report["batches"] += 1
+            report["archived_logs"] += archived["logs"]
+            report["archived_bytes"] += archived["bytes"]
+        else:
+            # Out of budget with logs left to archive; the partitions go next run
+            return
+
+        expired = select(Build.id).where(Build.timestamp < bound)
+        builds = db.execute(select(func.count()).select_from(expired.subquery())).scalar()
+        report["deleted_notifications"] += db.execute(
+            delete(Notification).where(Notification.build_id.in_(expired))
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        dropped = partition_manager.drop_before(bound)
+        if dropped:
+            report["deleted_builds"] += builds
+            report["dropped_partitions"] = report.get("dropped_partitions", 0) + len(dropped)
+
+    def run(self) -> Dict[str, Any]:
+        """Run one bounded retention pass; returns the report (also kept as ``last_report``)."""
+        if not self._run_lock.acquire(blocking=False):
+            return {**(self.last_report or {}), "running": True}
+        try:
+            return self._run()
+        finally:
+            self._run_lock.release()
+
+    def _run(self) -> Dict[str, Any]:
+        now = datetime.utcnow()
+        report = {
+            "started_at": now,
+            "archived_logs": 0,
+            "archived_bytes": 0,
+            "deleted_builds": 0,
+            "deleted_notifications": 0,
+            "batches": 0,
+            "complete": False,
+        }
+        if not database.engine:
+            database.create_database_engine()
+        before = self._database_size(database.engine)
+
+        db = get_session()
+        try:
+            # 1. Console logs past the archive age
+            log_cutoff = now - timedelta(days=settings.log_archive_after_days)
+            while report["batches"] < self.max_batches:
+                archived = self._archive(db, [Build.timestamp < log_cutoff], limit=self.batch_size)
+                if not archived["logs"]:
+                    break
+                report["batches"] += 1
+                report["archived_logs"] += archived["logs"]
+                report["archived_bytes"] += archived["bytes"]
+
+            # 2. Whole monthly partitions past every pipeline's retention (PostgreSQL)
+            if partition_manager.partitioned:
+                partition_manager.ensure_upcoming(now)
+                self._drop_partitions(db, now, report)
+
+            # 3. Raw builds past their pipeline's retention (rollups are kept)
+            for pipeline_name, cutoff in self._cutoffs(db, now).items():
+                while report["batches"] < self.max_batches:
+                    ids = db.execute(
+                        select(Build.id).where(Build.pipeline_name == pipeline_name, Build.timestamp < cutoff)
+                        .order_by(Build.timestamp).limit(self.batch_size)
+                    ).scalars().all()
+                    if not ids:
+                        break
+                    deleted = self._delete_builds(db, ids)
+                    report["batches"] += 1
+                    report["deleted_builds"] += len(ids)
+                    report["deleted_notifications"] += deleted["notifications"]
+                    report["archived_logs"] += deleted["logs"]
+                    report["archived_bytes"] += deleted["bytes"]
+
+            # 4. Old notifications
+            notification_cutoff = now - timedelta(days=settings.notification_retention_days)
+            while report["batches"] < self.max_batches:
+                ids = db.execute(
+                    select(Notification.id).where(Notification.created_at < notification_cutoff).limit(self.batch_size)
+                ).scalars().all()
+                if not ids:
+                    break
+                db.execute(delete(Notification).where(Notification.id.in_(ids))
+                           .execution_options(synchronize_session=False))
+                db.commit()
+                report["batches"] += 1
+                report["deleted_notifications"] += len(ids)
+
+            report["complete"] = report["batches"] < self.max_batches
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        if report["deleted_builds"] or report["deleted_notifications"] or report["archived_logs"]:
+            aggregation_service.invalidate()
+            listing_counts.clear()
+            report["vacuumed"] = self._maintain(database.engine)
+        else:
+            report["vacuumed"] = False
+
+        after = self._database_size(database.engine)
+        report.update({
+            "database_bytes_before": before["total"],
+            "database_bytes_after": after["total"],
+            "free_bytes": after["free"],
+            "reclaimed_bytes": max(before["total"] - after["total"], 0),
+            "finished_at": datetime.utcnow(),
+        })
+        self._ran_at = now
+        self.last_report = report
+        logger.info(
+            f"Retention archived {report['archived_logs']} logs, deleted {report['deleted_builds']} builds and "
+            f"{report['deleted_notifications']} notifications, reclaimed {report['reclaimed_bytes']} bytes"
+        )
+        return report
+
+    # ------------------------------------------------------------ maintenance
+
+    @staticmethod
+    def _database_size(engine) -> Dict[str, int]:
+        """Total and free (reusable) bytes of the database."""
+        with engine.connect() as conn:
+            if engine.dialect.name == "sqlite":
+                page_size = conn.execute(text("PRAGMA page_size")).scalar()
+                pages = conn.execute(text("PRAGMA page_count")).scalar()
+                free = conn.execute(text("PRAGMA freelist_count")).scalar()
+                return {"total": pages * page_size, "free": free * page_size}
+            if engine.dialect.name == "postgresql":
+                total = conn.execute(text("SELECT pg_database_size(current_database())")).scalar()
+                return {"total": int(total), "free": 0}
+        return {"total": 0, "free": 0}
+
+    def _maintain(self, engine) -> bool:
+        """Refresh planner statistics and vacuum; returns whether a VACUUM ran."""
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            if engine.dialect.name == "sqlite":
+                return self._maintain_sqlite(conn)
+            if engine.dialect.name == "postgresql":
+                # Plain VACUUM marks dead rows reusable without locking out readers
+                for table in ("builds", "notifications"):
+                    conn.execute(text(f"VACUUM (ANALYZE) {table}"))
+                return True
+        return False
+
+    @staticmethod
+    def _maintain_sqlite(conn: Connection) -> bool:
+        conn.execute(text("ANALYZE"))
+        pages = conn.execute(text("PRAGMA page_count")).scalar()
+        free = conn.execute(text("PRAGMA freelist_count")).scalar()
+        # VACUUM rewrites the whole file, so only shrink it once enough pages are free
+        if pages and free / pages >= settings.retention_vacuum_threshold:
+            conn.execute(text("VACUUM"))
+            return True
+        return False
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "default_retention_days": settings.retention_days,
+            "notification_retention_days": settings.notification_retention_days,
+            "log_archive_after_days": settings.log_archive_after_days,
+            "policies": self.policies(),
+            "last_run": self.last_report,
+        }
+
+
+# Global retention manager instance
+retention_manager = RetentionManager()
@@ -0,0 +1,391 @@
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..database import get_session
+from ..models import BuildRollup
+from .sketches import DDSketch
+
+logger = logging.getLogger(__name__)
+
+# Key used for the cross-pipeline aggregate kept alongside per-pipeline rollups
+ALL_PIPELINES = "*"
+
+FAILURE_STATUSES = ("FAILURE", "ABORTED", "UNSTABLE")
+
+DEFAULT_QUANTILES = (0.5, 0.9, 0.95, 0.99)
+
+# Rollup counters that aggregate by summing, and those that aggregate by max
+SUM_FIELDS = (
+    "total_builds", "success_count", "failure_count", "duration_count", "duration_sum",
+    "recovery_count", "recovery_seconds_sum",
+)
+MAX_FIELDS = ("failure_streak_max",)
+
+
+def hour_bucket(ts: datetime) -> datetime:
+    """Truncate a timestamp to the start of its hour."""
+    return ts.replace(minute=0, second=0, microsecond=0)
+
+
+def day_bucket(ts: datetime) -> datetime:
+    """Truncate a timestamp to the start of its day."""
+    return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+class RollupService:
+    """
+    Maintains hourly build rollups per pipeline with mergeable duration sketches.
+
+    Builds are folded in as they are ingested. Recent hourly buckets (and
+    per-day merges of them) stay in memory so percentile queries over any
+    window merge a handful of sketches instead of scanning builds; older
+    windows are answered by merging the persisted rollup rows.
+    """
+
+    def __init__(self):
+        self.memory_days = settings.rollup_memory_days
+        self.relative_accuracy = settings.sketch_relative_accuracy
+        self._hourly: Dict[Tuple[str, datetime], Dict[str, Any]] = {}
+        self._daily: Dict[Tuple[str, datetime], DDSketch] = {}
+        self._daily_totals: Dict[Tuple[str, datetime], Dict[str, Any]] = {}
+        self._all_time: Dict[str, DDSketch] = {}
+        self._dirty: Set[Tuple[str, datetime]] = set()
+        # Buckets behind the memory horizon hold only late builds; their stored rows
+        # are not in memory, so these are added to the rows rather than replacing them
+        self._partial: Set[Tuple[str, datetime]] = set()
+        self._lock = threading.Lock()
+
+    def _new_sketch(self) -> DDSketch:
+        return DDSketch(relative_accuracy=self.relative_accuracy)
+
+    def _new_bucket(self) -> Dict[str, Any]:
+        bucket: Dict[str, Any] = {field: 0 for field in SUM_FIELDS + MAX_FIELDS}
+        bucket["sketch"] = self._new_sketch()
+        return bucket
+
+    @staticmethod
+    def _new_totals() -> Dict[str, Any]:
+        return {field: 0 for field in SUM_FIELDS + MAX_FIELDS}
+
+    @staticmethod
+    def _merge_counts(target: Dict[str, Any], source: Any):
+        """Add counters from a bucket dict or BuildRollup row into ``target``."""
+        get = source.get if isinstance(source, dict) else lambda f: getattr(source, f, None)
+        for field in SUM_FIELDS:
+            target[field] += get(field) or 0
+        for field in MAX_FIELDS:
+            target[field] = max(target[field], get(field) or 0)
+
+    def _buckets_for(self, key: str, timestamp: datetime) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Hourly bucket and daily totals for a key, created on demand (lock held)."""
+        hour = hour_bucket(timestamp)
+        bucket = self._hourly.get((key, hour))
+        if bucket is None:
+            bucket = self._hourly[(key, hour)] = self._new_bucket()
+            if hour < self._horizon():
+                self._partial.add((key, hour))
+        totals = self._daily_totals.get((key, day_bucket(timestamp)))
+        if totals is None:
+            totals = self._daily_totals[(key, day_bucket(timestamp))] = self._new_totals()
+        return bucket, totals
+
+    def _horizon(self) -> datetime:
+        return day_bucket(datetime.utcnow() - timedelta(days=self.memory_days))
+
+    # ------------------------------------------------------------------ ingest
+
+    def observe_build(self, build: Dict[str, Any]):
+        """Fold a completed build record into the rollups."""
+        pipeline_name = build.get("pipeline_name")
+        timestamp = build.get("timestamp")
+        if not pipeline_name or not isinstance(timestamp, datetime):
+            return
+
+        status = build.get("status")
+        duration = build.get("duration")
+        hour = hour_bucket(timestamp)
+        day = day_bucket(timestamp)
+
+        with self._lock:
+            for key in (pipeline_name, ALL_PIPELINES):
+                bucket, totals = self._buckets_for(key, timestamp)
+                for counts in (bucket, totals):
+                    counts["total_builds"] += 1
+                    if status == "SUCCESS":
+                        counts["success_count"] += 1
+                    elif status in FAILURE_STATUSES:
+                        counts["failure_count"] += 1
+
+                if duration is not None and duration >= 0:
+                    for counts in (bucket, totals):
+                        counts["duration_count"] += 1
+                        counts["duration_sum"] += duration
+                    bucket["sketch"].add(duration)
+                    self._daily.setdefault((key, day), self._new_sketch()).add(duration)
+                    self._all_time.setdefault(key, self._new_sketch()).add(duration)
+
+            self._dirty.add((pipeline_name, hour))
+
+    def record_recovery(self, pipeline_name: str, timestamp: datetime,
+                        recovery_seconds: float, streak_length: int):
+        """Record a failure streak that ended with a success at ``timestamp``."""
+        with self._lock:
+            for key in (pipeline_name, ALL_PIPELINES):
+                for counts in self._buckets_for(key, timestamp):
+                    counts["recovery_count"] += 1
+                    counts["recovery_seconds_sum"] += recovery_seconds
+                    counts["failure_streak_max"] = max(counts["failure_streak_max"], streak_length)
+            self._dirty.add((pipeline_name, hour_bucket(timestamp)))
+
+    # ------------------------------------------------------------- persistence
+
+    def flush(self, db: Optional[Session] = None):
+        """Persist dirty hourly buckets to the build_rollups table."""
+        with self._lock:
+            dirty = list(self._dirty)
+            self._dirty.clear()
+            snapshots, partial = {}, set()
+            for key in dirty:
+                if key in self._partial:
+                    # Handed over whole: builds arriving meanwhile start a new delta
+                    self._partial.discard(key)
+                    snapshots[key] = self._hourly.pop(key)
+                    partial.add(key)
+                elif key in self._hourly:
+                    snapshots[key] = {**self._hourly[key], "sketch": self._hourly[key]["sketch"].copy()}
+
+        if not snapshots:
+            return
+
+        own_session = db is None
+        db = db or get_session()
+        try:
+            for (pipeline_name, bucket_start), data in snapshots.items():
+                row = db.query(BuildRollup).filter(
+                    BuildRollup.pipeline_name == pipeline_name,
+                    BuildRollup.bucket_start == bucket_start
+                ).one_or_none()
+                if row is None:
+                    row = BuildRollup(pipeline_name=pipeline_name, bucket_start=bucket_start)
+                    db.add(row)
+
+                if (pipeline_name, bucket_start) in partial:
+                    merged = {field: getattr(row, field) or 0 for field in SUM_FIELDS + MAX_FIELDS}
+                    self._merge_counts(merged, data)
+                    sketch = DDSketch.from_json(row.duration_sketch)
+                    sketch.merge(data["sketch"])
+                    data = {**merged, "sketch": sketch}
+                for field in SUM_FIELDS + MAX_FIELDS:
+                    setattr(row, field, data[field])
+                row.duration_sketch = data["sketch"].to_json()
+
+            db.commit()
+            logger.debug(f"Flushed {len(snapshots)} rollup buckets")
+        except Exception as e:
+            db.rollback()
+            with self._lock:
+                self._dirty.update(snapshots.keys())
+                for key in partial:
+                    # Put the unwritten delta back, with any builds that arrived since
+                    bucket = self._hourly.setdefault(key, self._new_bucket())
+                    self._merge_counts(bucket, snapshots[key])
+                    bucket["sketch"].merge(snapshots[key]["sketch"])
+                    self._partial.add(key)
+            logger.error(f"Failed to flush rollups: {e}")
+        finally:
+            if own_session:
+                db.close()
+
+        self._evict_expired()
+
+    def load(self, db: Optional[Session] = None):
+        """Rebuild in-memory rollups and all-time sketches from the database."""
+        own_session = db is None
+        db = db or get_session()
+        horizon = self._horizon()
+        hourly: Dict[Tuple[str, datetime], Dict[str, Any]] = {}
+        daily: Dict[Tuple[str, datetime], DDSketch] = {}
+        daily_totals: Dict[Tuple[str, datetime], Dict[str, Any]] = {}
+        all_time: Dict[str, DDSketch] = {}
+
+        try:
+            rows = db.query(BuildRollup).yield_per(1000)
+            for row in rows:
+                sketch = DDSketch.from_json(row.duration_sketch)
+                for key in (row.pipeline_name, ALL_PIPELINES):
+                    all_time.setdefault(key, self._new_sketch()).merge(sketch)
+                    if row.bucket_start < horizon:
+                        continue
+
+                    bucket = hourly.get((key, row.bucket_start))
+                    if bucket is None:
+                        bucket = hourly[(key, row.bucket_start)] = self._new_bucket()
+                    self._merge_counts(bucket, row)
+                    bucket["sketch"].merge(sketch)
+                    day = day_bucket(row.bucket_start)
+                    daily.setdefault((key, day), self._new_sketch()).merge(sketch)
+                    self._merge_counts(daily_totals.setdefault((key, day), self._new_totals()), row)
+        finally:
+            if own_session:
+                db.close()
+
+        with self._lock:
+            self._hourly = hourly
+            self._daily = daily
+            self._daily_totals = daily_totals
+            self._all_time = all_time
+            self._dirty.clear()
+            self._partial.clear()
+        logger.info(f"Loaded {len(hourly)} in-memory rollup buckets")
+
+    def _evict_expired(self):
+        """Drop in-memory buckets that fell behind the retention horizon."""
+        horizon = self._horizon()
+        with self._lock:
+            for key in [k for k in self._hourly if k[1] < horizon and k not in self._dirty]:
+                del self._hourly[key]
+                self._partial.discard(key)
+            for key in [k for k in self._daily if k[1] < horizon]:
+                del self._daily[key]
+            for key in [k for k in self._daily_totals if k[1] < horizon]:
+                del self._daily_totals[key]
+
+    # ------------------------------------------------------------------ query
+
+    def iter_hourly_buckets(self, since: Optional[datetime] = None,
+                            pipeline_name: Optional[str] = None) -> List[Tuple[str, datetime, Dict[str, Any]]]:
+        """Return in-memory hourly buckets as (pipeline, bucket_start, counts) tuples."""
+        with self._lock:
+            return [
+                (key, start, {k: v for k, v in bucket.items() if k != "sketch"})
+                for (key, start), bucket in self._hourly.items()
+                if key != ALL_PIPELINES
+                and (pipeline_name is None or key == pipeline_name)
+                and (since is None or start >= since)
+            ]
+
+    def window_totals(self, pipeline_name: Optional[str] = None, days: int = 90) -> Dict[str, Any]:
+        """
+        Sum rollup counters over the trailing ``days`` (whole UTC days,
+        including today). Served from in-memory daily totals, so the cost
+        depends on the window length only, not on the number of builds.
+        """
+        key = pipeline_name or ALL_PIPELINES
+        today = day_bucket(datetime.utcnow())
+        start = today - timedelta(days=days - 1)
+        totals = self._new_totals()
+
+        if start < self._horizon():
+            return self._totals_from_db(key, start)
+
+        with self._lock:
+            day = start
+            while day <= today:
+                counts = self._daily_totals.get((key, day))
+                if counts:
+                    self._merge_counts(totals, counts)
+                day += timedelta(days=1)
+        return totals
+
+    def window_totals_by_pipeline(self, days: int = 90) -> Dict[str, Dict[str, Any]]:
+        """Trailing-window counters for every known pipeline."""
+        return {name: self.window_totals(name, days) for name in self.pipelines()}
+
+    def _totals_from_db(self, key: str, start: datetime) -> Dict[str, Any]:
+        totals = self._new_totals()
+        db = get_session()
+        try:
+            query = db.query(BuildRollup).filter(BuildRollup.bucket_start >= start)
+            if key != ALL_PIPELINES:
+                query = query.filter(BuildRollup.pipeline_name == key)
+            for row in query.yield_per(1000):
+                self._merge_counts(totals, row)
+        finally:
+            db.close()
+        return totals
+
+    def pipelines(self) -> List[str]:
+        with self._lock:
+            return sorted(k for k in self._all_time if k != ALL_PIPELINES)
+
+    def _window_sketch(self, key: str, start: datetime, end: datetime) -> DDSketch:
+        """Merge hourly/daily sketches covering [start, end)."""
+        merged = self._new_sketch()
+        horizon = self._horizon()
+        cursor = hour_bucket(start)
+
+        if cursor < horizon:
+            merged.merge(self._sketch_from_db(key, cursor, min(horizon, end)))
+            cursor = horizon
+
+        with self._lock:
+            while cursor < end:
+                next_day = day_bucket(cursor) + timedelta(days=1)
+                if cursor == day_bucket(cursor) and next_day <= end:
+                    # Whole day inside the window: one pre-merged sketch
+                    merged.merge(self._daily.get((key, cursor)))
+                    cursor = next_day
+                else:
+                    bucket = self._hourly.get((key, cursor))
+                    if bucket:
+                        merged.merge(bucket["sketch"])
+                    cursor += timedelta(hours=1)
+        return merged
+
+    def _sketch_from_db(self, key: str, start: datetime, end: datetime) -> DDSketch:
+        merged = self._new_sketch()
+        db = get_session()
+        try:
+            query = db.query(BuildRollup.duration_sketch).filter(
+                BuildRollup.bucket_start >= start,
+                BuildRollup.bucket_start < end
+            )
+            if key != ALL_PIPELINES:
+                query = query.filter(BuildRollup.pipeline_name == key)
+            for (raw,) in query.yield_per(1000):
+                merged.merge(DDSketch.from_json(raw))
+        finally:
+            db.close()
+        return merged
+
+    def duration_percentiles(self, pipeline_name: Optional[str] = None,
+                             start: Optional[datetime] = None,
+                             end: Optional[datetime] = None,
+                             quantiles: Iterable[float] = DEFAULT_QUANTILES) -> Dict[str, Any]:
+        """
+        Approximate build duration percentiles (seconds) for a pipeline or all
+        pipelines. Without a window the all-time sketch is used; windows are
+        aligned to whole hours.
+        """
+        key = pipeline_name or ALL_PIPELINES
+        quantiles = list(quantiles)
+
+        if start is None and end is None:
+            with self._lock:
+                sketch = self._all_time.get(key) or self._new_sketch()
+                sketch = sketch.copy()
+        else:
+            end = end or datetime.utcnow() + timedelta(hours=1)
+            start = start or datetime.min
+            sketch = self._window_sketch(key, start, end)
+
+        values = sketch.quantiles(quantiles)
+        return {
+            "pipeline": pipeline_name,
+            "count": sketch.count,
+            "mean": sketch.mean,
+            "min": sketch.min,
+            "max": sketch.max,
+            "relative_accuracy": sketch.relative_accuracy,
+            "percentiles": {
+                f"p{q * 100:g}": (round(v, 3) if v is not None else None)
+                for q, v in zip(quantiles, values)
+            }
+        }
+
+
+# Global rollup service instance
+rollup_service = RollupService()
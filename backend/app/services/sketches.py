@@ -0,0 +1,181 @@
+import json
+import math
+from typing import Dict, Iterable, List, Optional
+
+
+class DDSketch:
+    """
+    Mergeable quantile sketch with relative-error guarantees (DDSketch).
+
+    Values are mapped to logarithmically sized bins so that any quantile is
+    answered within ``relative_accuracy`` of the true value. Two sketches with
+    the same accuracy merge by adding bin counts, which lets rollup buckets be
+    combined into arbitrary windows without keeping the raw durations.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, max_bins: int = 2048):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        # Smallest value that still maps to a positive bin; anything below is
+        # counted in the zero bucket (durations are never negative).
+        self._min_value = 1e-9
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def _key(self, value: float) -> int:
+        return int(math.ceil(math.log(value) / self._log_gamma))
+
+    def _value(self, key: int) -> float:
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def add(self, value: float, count: int = 1):
+        """Add a value (e.g. a build duration in seconds) to the sketch."""
+        if value is None or count <= 0:
+            return
+        value = float(value)
+        if value < 0:
+            raise ValueError("DDSketch only accepts non-negative values")
+
+        if value <= self._min_value:
+            self.zero_count += count
+        else:
+            key = self._key(value)
+            self.bins[key] = self.bins.get(key, 0) + count
+            if len(self.bins) > self.max_bins:
+                self._collapse()
+
+        self.count += count
+        self.sum += value * count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def _collapse(self):
+        """Fold the lowest bins together so memory stays bounded."""
+        keys = sorted(self.bins)
+        excess = len(keys) - self.max_bins
+        target = keys[excess]
+        folded = sum(self.bins.pop(k) for k in keys[:excess])
+        self.bins[target] += folded
+
+    def merge(self, other: "DDSketch"):
+        """Merge another sketch into this one in place."""
+        if other is None or other.count == 0:
+            return
+        if not math.isclose(other.relative_accuracy, self.relative_accuracy):
+            raise ValueError("Cannot merge sketches with different accuracy")
+
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+        if other.max is not None:
+            self.max = other.max if self.max is None else max(self.max, other.max)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Return the approximate value at quantile ``q`` (0..1)."""
+        if self.count == 0:
+            return None
+        if not 0 <= q <= 1:
+            raise ValueError("Quantile must be between 0 and 1")
+        if q == 0:
+            return self.min
+        if q == 1:
+            return self.max
+
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return 0.0
+
+        seen = self.zero_count
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if seen > rank:
+                # Clamp to observed range so tiny sketches stay exact-ish
+                return min(max(self._value(key), self.min), self.max)
+        return self.max
+
+    def quantiles(self, qs: Iterable[float]) -> List[Optional[float]]:
+        """Return several quantiles with a single pass over the bins."""
+        qs = list(qs)
+        if self.count == 0:
+            return [None for _ in qs]
+
+        ranks = sorted((q * (self.count - 1), i) for i, q in enumerate(qs))
+        results: List[Optional[float]] = [None] * len(qs)
+        keys = sorted(self.bins)
+        seen = self.zero_count
+        pos = 0
+
+        for rank, idx in ranks:
+            q = qs[idx]
+            if q <= 0:
+                results[idx] = self.min
+                continue
+            if q >= 1:
+                results[idx] = self.max
+                continue
+            if rank < self.zero_count:
+                results[idx] = 0.0
+                continue
+            while pos < len(keys) and seen + self.bins[keys[pos]] <= rank:
+                seen += self.bins[keys[pos]]
+                pos += 1
+            if pos < len(keys):
+                results[idx] = min(max(self._value(keys[pos]), self.min), self.max)
+            else:
+                results[idx] = self.max
+        return results
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.sum / self.count if self.count else None
+
+    def copy(self) -> "DDSketch":
+        clone = DDSketch(self.relative_accuracy, self.max_bins)
+        clone.merge(self)
+        return clone
+
+    def to_dict(self) -> Dict:
+        return {
+            "a": self.relative_accuracy,
+            "z": self.zero_count,
+            "n": self.count,
+            "s": self.sum,
+            "min": self.min,
+            "max": self.max,
+            "b": {str(k): v for k, v in self.bins.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "DDSketch":
+        sketch = cls(relative_accuracy=data.get("a", 0.01))
+        sketch.zero_count = data.get("z", 0)
+        sketch.count = data.get("n", 0)
+        sketch.sum = data.get("s", 0.0)
+        sketch.min = data.get("min")
+        sketch.max = data.get("max")
+        sketch.bins = {int(k): v for k, v in (data.get("b") or {}).items()}
+        return sketch
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, raw: Optional[str]) -> "DDSketch":
+        if not raw:
+            return cls()
+        return cls.from_dict(json.loads(raw))
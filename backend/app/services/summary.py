@@ -0,0 +1,103 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from datetime import datetime
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SummarySnapshot:
+    """An immutable, versioned summary result with its serialized body and ETag."""
+
+    __slots__ = ("version", "fingerprint", "computed_at", "payload", "body", "etag")
+
+    def __init__(self, version: int, fingerprint: str, payload: Dict[str, Any]):
+        body = json.dumps(payload, separators=(",", ":"), default=str).encode("utf-8")
+        object.__setattr__(self, "version", version)
+        object.__setattr__(self, "fingerprint", fingerprint)
+        object.__setattr__(self, "computed_at", datetime.utcnow())
+        object.__setattr__(self, "payload", MappingProxyType(payload))
+        object.__setattr__(self, "body", body)
+        object.__setattr__(self, "etag", f'"{hashlib.sha1(body).hexdigest()[:20]}"')
+
+    def __setattr__(self, name, value):
+        raise AttributeError("SummarySnapshot is immutable")
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """True if an If-None-Match header already names this snapshot."""
+        if not if_none_match:
+            return False
+        tags = [t.strip() for t in if_none_match.split(",")]
+        return "*" in tags or self.etag in tags or f"W/{self.etag}" in tags
+
+
+class SummaryMaterializer:
+    """
+    Keeps the latest dashboard summary and recomputes it only on change.
+
+    ``fingerprint`` is a cheap probe of the underlying data (one Jenkins call
+    for job names and last build numbers); the expensive ``compute`` runs
+    only when the fingerprint differs from the one the current snapshot was
+    built from. Probes are rate limited, so polls in between are served
+    straight from the snapshot. Derived views (e.g. a subset of fields for
+    another endpoint) are snapshotted lazily per version.
+    """
+
+    def __init__(self, compute: Callable[[], Dict[str, Any]], fingerprint: Callable[[], str],
+                 check_interval: float = 5.0):
+        self._compute = compute
+        self._fingerprint = fingerprint
+        self.check_interval = check_interval
+        self._snapshot: Optional[SummarySnapshot] = None
+        self._views: Dict[str, SummarySnapshot] = {}
+        self._view_builders: Dict[str, Callable[[Mapping[str, Any]], Dict[str, Any]]] = {}
+        self._checked_at = 0.0
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def register_view(self, name: str, build: Callable[[Mapping[str, Any]], Dict[str, Any]]):
+        """Register a derived payload built from the base summary."""
+        self._view_builders[name] = build
+
+    def invalidate(self):
+        """Force a fingerprint check on the next request."""
+        self._checked_at = 0.0
+
+    def current(self) -> SummarySnapshot:
+        """Return the current snapshot, refreshing it if the data changed."""
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() - self._checked_at < self.check_interval:
+            return snapshot
+
+        with self._lock:
+            # Another request may have refreshed while we waited for the lock
+            snapshot = self._snapshot
+            if snapshot is not None and time.monotonic() - self._checked_at < self.check_interval:
+                return snapshot
+
+            fingerprint = self._fingerprint()
+            self._checked_at = time.monotonic()
+            if snapshot is not None and snapshot.fingerprint == fingerprint:
+                return snapshot
+
+            payload = self._compute()
+            self._version += 1
+            snapshot = SummarySnapshot(self._version, fingerprint, payload)
+            self._snapshot = snapshot
+            self._views = {}
+            logger.debug(f"Materialized summary version {snapshot.version}")
+            return snapshot
+
+    def view(self, name: str) -> SummarySnapshot:
+        """Return the snapshot of a registered derived view."""
+        base = self.current()
+        cached = self._views.get(name)
+        if cached is not None and cached.version == base.version:
+            return cached
+        snapshot = SummarySnapshot(base.version, base.fingerprint, self._view_builders[name](base.payload))
+        self._views[name] = snapshot
+        return snapshot
@@ -0,0 +1,120 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database import get_session
+from ..models import Build, BuildStatus
+from .build_store import build_store
+
+logger = logging.getLogger(__name__)
+
+FAILURE_STATUSES = [BuildStatus.FAILURE, BuildStatus.ABORTED, BuildStatus.UNSTABLE]
+
+
+class TopNService:
+    """
+    Top-N rankings (slowest builds, longest queue waits, most failing pipelines).
+
+    Windows inside the columnar store's retention are answered by heap
+    selection over its arrays; longer windows fall back to indexed
+    ``ORDER BY ... LIMIT n`` / ``GROUP BY`` queries on ``builds``.
+    """
+
+    def _from_store(self, start: datetime) -> bool:
+        return start >= datetime.utcnow() - timedelta(days=build_store.retention_days)
+
+    @staticmethod
+    def _build_dict(row) -> Dict[str, Any]:
+        return {
+            "pipeline_name": row.pipeline_name,
+            "build_number": row.build_number,
+            "status": row.status.value if hasattr(row.status, "value") else row.status,
+            "duration": row.duration,
+            "timestamp": row.timestamp,
+            "queue_wait": row.queue_wait
+        }
+
+    @staticmethod
+    def _top_builds_statement(metric: str, n: int, start: datetime, pipeline_name: Optional[str]):
+        column = Build.duration if metric == "duration" else Build.queue_wait
+        stmt = select(
+            Build.pipeline_name, Build.build_number, Build.status,
+            Build.duration, Build.timestamp, Build.queue_wait
+        ).where(Build.timestamp >= start, column.isnot(None))
+        if pipeline_name:
+            stmt = stmt.where(Build.pipeline_name == pipeline_name)
+        return stmt.order_by(column.desc()).limit(n)
+
+    @staticmethod
+    def _failing_statement(n: int, start: datetime, by: str, min_builds: int):
+        total = func.count(Build.id)
+        failures = func.sum(case((Build.status.in_(FAILURE_STATUSES), 1), else_=0))
+        rate = failures * 1.0 / total
+        order = (rate.desc(), failures.desc()) if by == "failure_rate" else (failures.desc(), rate.desc())
+        return select(
+            Build.pipeline_name, total.label("builds"), failures.label("failures")
+        ).where(Build.timestamp >= start).group_by(Build.pipeline_name).having(
+            total >= min_builds
+        ).having(failures > 0).order_by(*order).limit(n)
+
+    @staticmethod
+    def _pipeline_dict(row) -> Dict[str, Any]:
+        return {
+            "pipeline_name": row.pipeline_name,
+            "builds": row.builds,
+            "failures": row.failures,
+            "failure_rate": round(row.failures / row.builds * 100, 2)
+        }
+
+    def top_builds(self, metric: str = "duration", n: int = 20, days: int = 7,
+                   pipeline_name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Builds with the largest ``duration`` or ``queue_wait`` in the trailing window."""
+        start = datetime.utcnow() - timedelta(days=days)
+        if self._from_store(start):
+            return build_store.top_builds(metric, n, start=start, pipeline_name=pipeline_name)
+
+        db = get_session(readonly=True)
+        try:
+            rows = db.execute(self._top_builds_statement(metric, n, start, pipeline_name)).all()
+        finally:
+            db.close()
+        return [self._build_dict(row) for row in rows]
+
+    async def atop_builds(self, db: AsyncSession, metric: str = "duration", n: int = 20, days: int = 7,
+                          pipeline_name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """``top_builds`` with the SQL fallback awaited on an asyncio session."""
+        start = datetime.utcnow() - timedelta(days=days)
+        if self._from_store(start):
+            return build_store.top_builds(metric, n, start=start, pipeline_name=pipeline_name)
+
+        rows = (await db.execute(self._top_builds_statement(metric, n, start, pipeline_name))).all()
+        return [self._build_dict(row) for row in rows]
+
+    def failing_pipelines(self, n: int = 20, days: int = 7, by: str = "failures",
+                          min_builds: int = 1) -> List[Dict[str, Any]]:
+        """Pipelines ranked by failure count or failure rate in the trailing window."""
+        start = datetime.utcnow() - timedelta(days=days)
+        if self._from_store(start):
+            return build_store.top_pipelines(n, start=start, by=by, min_builds=min_builds)
+
+        db = get_session(readonly=True)
+        try:
+            rows = db.execute(self._failing_statement(n, start, by, min_builds)).all()
+        finally:
+            db.close()
+        return [self._pipeline_dict(row) for row in rows]
+
+    async def afailing_pipelines(self, db: AsyncSession, n: int = 20, days: int = 7, by: str = "failures",
+                                 min_builds: int = 1) -> List[Dict[str, Any]]:
+        """``failing_pipelines`` with the SQL fallback awaited on an asyncio session."""
+        start = datetime.utcnow() - timedelta(days=days)
+        if self._from_store(start):
+            return build_store.top_pipelines(n, start=start, by=by, min_builds=min_builds)
+
+        rows = (await db.execute(self._failing_statement(n, start, by, min_builds))).all()
+        return [self._pipeline_dict(row) for row in rows]
+
+
+# Global top-N service instance
+top_n_service = TopNService()
@@ -0,0 +1,145 @@
+import logging
+import threading
+import time
+from array import array
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+from .rollups import ALL_PIPELINES, rollup_service
+
+logger = logging.getLogger(__name__)
+
+MINUTE_SLOTS = 24 * 60  # Trailing 24h at minute granularity
+HOUR_SLOTS = 7 * 24     # Trailing 7d at hour granularity
+
+
+def _epoch_seconds(ts: datetime) -> float:
+    """Convert a naive UTC datetime to epoch seconds."""
+    return (ts - datetime(1970, 1, 1)).total_seconds()
+
+
+class RingCounter:
+    """
+    Fixed-size ring of time slots holding build and success counts.
+
+    Each slot remembers which absolute slot index it currently represents,
+    so stale slots are recycled lazily on write and skipped on read; no
+    background rotation is needed.
+    """
+
+    def __init__(self, slots: int, slot_seconds: int):
+        self.slots = slots
+        self.slot_seconds = slot_seconds
+        self.totals = array("I", [0] * slots)
+        self.successes = array("I", [0] * slots)
+        self.epochs = array("q", [-1] * slots)
+
+    def add(self, ts: float, success: bool, count: int = 1, now: Optional[float] = None):
+        index = int(ts // self.slot_seconds)
+        now_index = int((now if now is not None else time.time()) // self.slot_seconds)
+        if index <= now_index - self.slots or index > now_index:
+            return  # Outside the ring's horizon
+
+        pos = index % self.slots
+        if self.epochs[pos] != index:
+            if self.epochs[pos] > index:
+                return  # Slot already reused by a newer period
+            self.epochs[pos] = index
+            self.totals[pos] = 0
+            self.successes[pos] = 0
+
+        self.totals[pos] += count
+        if success:
+            self.successes[pos] += count
+
+    def window(self, seconds: float, now: Optional[float] = None) -> Tuple[int, int]:
+        """Sum (builds, successes) over the trailing ``seconds``."""
+        now_index = int((now if now is not None else time.time()) // self.slot_seconds)
+        span = min(self.slots, max(1, -(-int(seconds) // self.slot_seconds)))
+        total = success = 0
+        for index in range(now_index - span + 1, now_index + 1):
+            pos = index % self.slots
+            if self.epochs[pos] == index:
+                total += self.totals[pos]
+                success += self.successes[pos]
+        return total, success
+
+
+class WindowCounterService:
+    """Sliding-window build counters per pipeline and across all pipelines."""
+
+    def __init__(self):
+        self._minutes: Dict[str, RingCounter] = {}
+        self._hours: Dict[str, RingCounter] = {}
+        self._lock = threading.Lock()
+
+    def _rings(self, key: str) -> Tuple[RingCounter, RingCounter]:
+        if key not in self._minutes:
+            self._minutes[key] = RingCounter(MINUTE_SLOTS, 60)
+            self._hours[key] = RingCounter(HOUR_SLOTS, 3600)
+        return self._minutes[key], self._hours[key]
+
+    def observe_build(self, build: Dict[str, Any]):
+        """Count a completed build in its pipeline's and the global windows."""
+        pipeline_name = build.get("pipeline_name")
+        timestamp = build.get("timestamp")
+        if not pipeline_name or not isinstance(timestamp, datetime):
+            return
+
+        ts = _epoch_seconds(timestamp)
+        success = build.get("status") == "SUCCESS"
+        with self._lock:
+            for key in (pipeline_name, ALL_PIPELINES):
+                minutes, hours = self._rings(key)
+                minutes.add(ts, success)
+                hours.add(ts, success)
+
+    def rebuild_from_rollups(self):
+        """
+        Seed the rings from in-memory hourly rollups. Rebuilt history lands in
+        the first minute of each hour, so minute-level windows are exact only
+        for builds ingested after startup.
+        """
+        since = datetime.utcnow() - timedelta(hours=HOUR_SLOTS)
+        buckets = rollup_service.iter_hourly_buckets(since=since)
+        now = time.time()
+
+        with self._lock:
+            self._minutes.clear()
+            self._hours.clear()
+            for pipeline_name, bucket_start, counts in buckets:
+                ts = _epoch_seconds(bucket_start)
+                total = counts.get("total_builds", 0)
+                successes = counts.get("success_count", 0)
+                for key in (pipeline_name, ALL_PIPELINES):
+                    minutes, hours = self._rings(key)
+                    for ring in (minutes, hours):
+                        ring.add(ts, True, successes, now=now)
+                        ring.add(ts, False, total - successes, now=now)
+        logger.info(f"Rebuilt window counters from {len(buckets)} rollup buckets")
+
+    def counts(self, pipeline_name: Optional[str] = None,
+               window: timedelta = timedelta(days=1)) -> Dict[str, Any]:
+        """Return build count and success rate over a trailing window."""
+        key = pipeline_name or ALL_PIPELINES
+        seconds = window.total_seconds()
+        with self._lock:
+            if key not in self._minutes:
+                total, success = 0, 0
+            elif seconds <= MINUTE_SLOTS * 60:
+                total, success = self._minutes[key].window(seconds)
+            else:
+                total, success = self._hours[key].window(seconds)
+
+        return {
+            "builds": total,
+            "successes": success,
+            "success_rate": round(success / total * 100, 2) if total else 0.0
+        }
+
+    def builds_in_window(self, pipeline_name: Optional[str] = None,
+                         window: timedelta = timedelta(days=1)) -> int:
+        return self.counts(pipeline_name, window)["builds"]
+
+
+# Global window counter service instance
+window_counters = WindowCounterService()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Benchmark concurrent read throughput of the SQLite storage profiles.
+
+Compares the legacy single shared connection (StaticPool) with the tuned
+profile (WAL, mmap, reader pool plus one writer) on a temporary database,
+optionally with a background writer ingesting builds during the reads.
+
+    python benchmark_sqlite.py --builds 200000 --threads 8 --seconds 5 --with-writer
+"""
+
+import argparse
+import itertools
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import sessionmaker
+from app.database import Base, RoutingSession, create_sqlite_engines
+from app.migrations import run_migrations
+from app.models import Build, BuildStatus
+
+PIPELINES = 50
+
+# Build numbers for benchmark writes, unique across runs on the same database
+_write_numbers = itertools.count(10_000_000, PIPELINES)
+
+
+def populate(path: str, builds: int):
+    """Create the schema and insert ``builds`` rows spread over 90 days."""
+    writer, _ = create_sqlite_engines(f"sqlite:///{path}", tuned=False)
+    Base.metadata.create_all(bind=writer)
+    run_migrations(writer)
+    start = datetime.utcnow() - timedelta(days=90)
+    step = timedelta(days=90) / builds
+    statuses = [BuildStatus.SUCCESS] * 8 + [BuildStatus.FAILURE, BuildStatus.UNSTABLE]
+    with writer.begin() as conn:
+        for offset in range(0, builds, 10_000):
+            conn.execute(insert(Build), [
+                {
+                    "pipeline_name": f"pipeline-{i % PIPELINES}",
+                    "build_number": i // PIPELINES + 1,
+                    "status": statuses[i % len(statuses)],
+                    "duration": 30 + (i * 7919) % 1800,
+                    "timestamp": start + step * i,
+                    "triggered_by": "jenkins",
+                }
+                for i in range(offset, min(offset + 10_000, builds))
+            ])
+    writer.dispose()
+
+
+def read_query(n: int):
+    """A per-pipeline dashboard window, like the analytics endpoints run."""
+    since = datetime.utcnow() - timedelta(days=7)
+    return select(
+        func.count(Build.id), func.avg(Build.duration)
+    ).where(Build.pipeline_name == f"pipeline-{n % PIPELINES}", Build.timestamp >= since)
+
+
+def run(path: str, tuned: bool, threads: int, seconds: float, with_writer: bool):
+    writer, reader = create_sqlite_engines(f"sqlite:///{path}", tuned=tuned)
+    Session = sessionmaker(class_=RoutingSession, bind=writer, info={"reader": reader} if reader else {})
+    stop = threading.Event()
+    counts = [0] * threads
+    writes = {"batches": 0, "errors": 0}
+
+    def read_loop(index: int):
+        n = index
+        while not stop.is_set():
+            db = Session()
+            try:
+                db.execute(read_query(n)).one()
+            finally:
+                db.close()
+            counts[index] += 1
+            n += threads
+
+    def write_loop():
+        while not stop.is_set():
+            number = next(_write_numbers)
+            db = Session()
+            try:
+                db.execute(insert(Build), [
+                    {"pipeline_name": f"pipeline-{i}", "build_number": number + i, "status": BuildStatus.SUCCESS,
+                     "duration": 60, "timestamp": datetime.utcnow(), "triggered_by": "bench"}
+                    for i in range(PIPELINES)
+                ])
+                db.commit()
+                writes["batches"] += 1
+            except Exception:
+                # The legacy profile shares one connection across threads and can fail here
+                writes["errors"] += 1
+                db.rollback()
+            finally:
+                db.close()
+
+    workers = [threading.Thread(target=read_loop, args=(i,)) for i in range(threads)]
+    if with_writer:
+        workers.append(threading.Thread(target=write_loop))
+    for worker in workers:
+        worker.start()
+    time.sleep(seconds)
+    stop.set()
+    for worker in workers:
+        worker.join()
+    writer.dispose()
+    if reader:
+        reader.dispose()
+    return sum(counts) / seconds, writes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--builds", type=int, default=200_000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--with-writer", action="store_true", help="Ingest builds while reading")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "benchmark.db")
+        print(f"Populating {args.builds} builds...")
+        populate(path, args.builds)
+
+        results = {}
+        for name, tuned in (("legacy (StaticPool)", False), ("tuned (WAL + pool)", True)):
+            results[name], writes = run(path, tuned, args.threads, args.seconds, args.with_writer)
+            line = f"{name:<22} {results[name]:>10.0f} reads/s with {args.threads} threads"
+            if args.with_writer:
+                line += f", {writes['batches'] * PIPELINES / args.seconds:.0f} builds/s written" \
+                        f" ({writes['errors']} failed batches)"
+            print(line)
+
+        legacy, tuned = results.values()
+        print(f"Speedup: {tuned / legacy:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
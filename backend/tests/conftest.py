@@ -0,0 +1,6 @@
+import os
+
+# Settings require these at import time; keep tests off the dev database file
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+os.environ.setdefault("JENKINS_URL", "http://jenkins.test:8080")
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
@@ -0,0 +1,87 @@
+import pytest
+from datetime import datetime, timedelta
+from app.database import init_db, get_session
+from app.models import Build, BuildRollup
+from app.services.aggregations import AggregationService, AggregationError
+from app.services.rollups import RollupService
+
+
+class TestAggregationService:
+    """Test group-by queries compiled to SQL and their cache."""
+
+    def setup_method(self):
+        init_db()
+        db = get_session()
+        db.query(Build).delete()
+        db.query(BuildRollup).delete()
+        now = datetime.utcnow().replace(minute=30, second=0, microsecond=0)
+        builds = []
+        for i in range(1, 21):
+            builds.append(Build(
+                pipeline_name="api", build_number=i, status="FAILURE" if i % 4 == 0 else "SUCCESS",
+                duration=i * 10, timestamp=now - timedelta(minutes=i), triggered_by="alice",
+                branch="main"
+            ))
+        for i in range(1, 6):
+            builds.append(Build(
+                pipeline_name="web", build_number=i, status="SUCCESS", duration=5,
+                timestamp=now - timedelta(minutes=i), triggered_by="bob", branch="dev"
+            ))
+        db.add_all(builds)
+        db.commit()
+        db.close()
+        self.service = AggregationService()
+
+    def test_group_by_pipeline(self):
+        result = self.service.query(
+            "builds", ["pipeline"], ["count", "success_rate", "avg_duration", "p95_duration"]
+        )
+        rows = {r["pipeline"]: r for r in result["rows"]}
+        assert rows["api"]["count"] == 20
+        assert rows["api"]["success_rate"] == 75.0
+        assert rows["api"]["avg_duration"] == 105.0
+        assert rows["api"]["p95_duration"] == 190  # Nearest rank: 19th of 20
+        assert rows["web"]["p95_duration"] == 5
+
+    def test_multiple_dimensions_and_filters(self):
+        result = self.service.query(
+            "builds", ["status", "triggered_by"], ["count"], filters={"branch": "main"}
+        )
+        rows = {(r["status"], r["triggered_by"]): r["count"] for r in result["rows"]}
+        assert rows == {("SUCCESS", "alice"): 15, ("FAILURE", "alice"): 5}
+
+    def test_equivalent_queries_share_cache(self):
+        first = self.service.query("builds", ["pipeline"], ["success_rate", "count"])
+        second = self.service.query("builds", ["pipeline", "pipeline"], ["count", "success_rate"])
+        assert not first["cached"]
+        assert second["cached"]
+        self.service.invalidate()
+        assert not self.service.query("builds", ["pipeline"], ["count"])["cached"]
+
+    def test_rollup_source(self):
+        rollups = RollupService()
+        db = get_session()
+        for build in db.query(Build).all():
+            rollups.observe_build({
+                "pipeline_name": build.pipeline_name, "status": build.status.value,
+                "duration": build.duration, "timestamp": build.timestamp
+            })
+        db.close()
+        rollups.flush()
+
+        overall = self.service.query("rollups", [], ["count", "success_rate", "p95_duration"])
+        assert overall["rows"][0]["count"] == 25
+        assert overall["rows"][0]["success_rate"] == 80.0
+        # Sketch quantiles are rank-approximate: within one rank and 1% of the exact p95
+        assert 180 * 0.99 <= overall["rows"][0]["p95_duration"] <= 190 * 1.01
+
+        by_pipeline = self.service.query("rollups", ["pipeline"], ["count"])
+        assert {r["pipeline"]: r["count"] for r in by_pipeline["rows"]} == {"api": 20, "web": 5}
+
+    def test_invalid_queries(self):
+        with pytest.raises(AggregationError):
+            self.service.query("builds", ["commit_hash"], ["count"])
+        with pytest.raises(AggregationError):
+            self.service.query("rollups", ["branch"], ["count"])
+        with pytest.raises(AggregationError):
+            self.service.query("builds", [], ["median"])
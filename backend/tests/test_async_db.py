@@ -0,0 +1,62 @@
+import pytest
+from datetime import datetime, timedelta
+from app.database import init_db, get_session, get_async_db, async_database_url, close_async_db
+from app.models import Build, BuildRollup, CapacityRollup
+from app.services.aggregations import AggregationService
+from app.services.capacity import CapacityAccounting
+from app.services.top_n import TopNService
+
+
+def test_async_database_url():
+    assert async_database_url("postgresql://u:p@db/cicd") == "postgresql+asyncpg://u:p@db/cicd"
+    assert async_database_url("postgresql+psycopg2://u:p@db/cicd") == "postgresql+asyncpg://u:p@db/cicd"
+    assert async_database_url("sqlite:///./cicd.db") == "sqlite+aiosqlite:///./cicd.db"
+    with pytest.raises(ValueError):
+        async_database_url("mysql://u:p@db/cicd")
+
+
+class TestAsyncReads:
+    """Async read paths return the same results as the sync ones."""
+
+    def setup_method(self):
+        init_db()
+        now = datetime.utcnow()
+        hour = now.replace(minute=0, second=0, microsecond=0)
+        db = get_session()
+        for model in (Build, BuildRollup, CapacityRollup):
+            db.query(model).delete()
+        db.add_all([
+            BuildRollup(pipeline_name="api", bucket_start=hour - timedelta(hours=2), total_builds=4,
+                        success_count=3, failure_count=1, duration_count=4, duration_sum=400.0),
+            BuildRollup(pipeline_name="web", bucket_start=hour - timedelta(hours=2), total_builds=2,
+                        success_count=2, failure_count=0, duration_count=2, duration_sum=60.0),
+            CapacityRollup(day=hour.replace(hour=0), pipeline_name="api", node_name="agent-1",
+                           build_count=4, executor_seconds=400.0, queue_wait_count=0,
+                           queue_wait_seconds=0.0, queue_wait_max=0.0),
+            Build(pipeline_name="api", build_number=1, status="FAILURE", duration=90,
+                  timestamp=now - timedelta(days=200), triggered_by="jenkins"),
+        ])
+        db.commit()
+        db.close()
+
+    @pytest.mark.asyncio
+    async def test_async_reads_match_sync(self):
+        aggregations = AggregationService()
+        capacity = CapacityAccounting()
+        top_n = TopNService()
+
+        async for db in get_async_db():
+            rows = (await aggregations.aquery(db, "rollups", ["pipeline"], ["count", "success_rate"]))["rows"]
+            usage = await capacity.ausage(db, "pipeline", days=7)
+            # A window longer than the build store retention reads from SQL
+            failing = await top_n.afailing_pipelines(db, days=365)
+        await close_async_db()
+
+        assert rows == [
+            {"pipeline": "api", "count": 4, "success_rate": 75.0},
+            {"pipeline": "web", "count": 2, "success_rate": 100.0},
+        ]
+        aggregations.invalidate()
+        assert aggregations.query("rollups", ["pipeline"], ["count", "success_rate"])["rows"] == rows
+        assert usage == capacity.usage("pipeline", days=7)
+        assert failing == [{"pipeline_name": "api", "builds": 1, "failures": 1, "failure_rate": 100.0}]
@@ -0,0 +1,63 @@
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import inspect
+from app.database import init_db, get_session, get_async_db, close_async_db
+from app.models import Build
+from app.services.build_repository import BuildRepository, LIST_FIELDS, ProjectionError
+
+
+def test_projection_validation():
+    repository = BuildRepository()
+    assert repository.fields(None) == list(LIST_FIELDS)
+    assert "console_output" not in LIST_FIELDS
+    assert repository.fields("status, id,status") == ["status", "id"]
+    assert "console_output" in repository.fields(None, detail=True)
+    with pytest.raises(ProjectionError):
+        repository.fields("status,password")
+    with pytest.raises(ProjectionError):
+        repository.fields("id,console_output")
+
+
+class TestBuildRepository:
+
+    def setup_method(self):
+        init_db()
+        now = datetime.utcnow()
+        db = get_session()
+        db.query(Build).delete()
+        db.add_all([
+            Build(pipeline_name="api", build_number=i, status="SUCCESS", duration=60,
+                  timestamp=now - timedelta(minutes=i), triggered_by="jenkins",
+                  console_output="x" * 10_000, parameters='{"env": "prod"}')
+            for i in range(5)
+        ])
+        db.commit()
+        db.close()
+
+    def test_heavy_columns_are_deferred(self):
+        db = get_session()
+        try:
+            build = db.query(Build).first()
+            assert {"console_output", "parameters"} <= inspect(build).unloaded
+            assert "status" not in inspect(build).unloaded
+        finally:
+            db.close()
+
+    @pytest.mark.asyncio
+    async def test_listings_project_and_detail_loads_heavy_columns(self):
+        repository = BuildRepository()
+        async for db in get_async_db():
+            items, cursor = await repository.alist(db, repository.fields("build_number,status"), size=3)
+            more, _ = await repository.alist(db, repository.fields("build_number"), size=3, cursor=cursor)
+            recent = await repository.arecent(db, "api", repository.fields(None), limit=2)
+            detail = await repository.aget(db, recent[0]["id"], repository.fields(None, detail=True))
+            missing = await repository.aget(db, -1, repository.fields(None, detail=True))
+        await close_async_db()
+
+        assert items == [{"build_number": n, "status": "SUCCESS"} for n in (0, 1, 2)]
+        assert [item["build_number"] for item in more] == [3, 4]
+        assert [item["build_number"] for item in recent] == [0, 1]
+        assert "console_output" not in recent[0]
+        assert detail["console_output"] == "x" * 10_000
+        assert detail["parameters"] == '{"env": "prod"}'
+        assert missing is None
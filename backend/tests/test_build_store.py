@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta
+from app.services.build_store import ColumnarBuildStore
+
+
+def _build(pipeline, number, status, duration, when):
+    return {
+        "pipeline_name": pipeline,
+        "build_number": number,
+        "status": status,
+        "duration": duration,
+        "timestamp": when
+    }
+
+
+class TestColumnarBuildStore:
+    """Test appends, time-range slicing and group-by over typed columns."""
+
+    def setup_method(self):
+        self.store = ColumnarBuildStore()
+        self.now = datetime.utcnow().replace(microsecond=0)
+
+    def test_interleaved_batches_stay_sorted_and_aligned(self):
+        """Out-of-order batches are merged into the tail without mixing up columns."""
+        self.store.extend([_build("api", i, "SUCCESS", i, self.now - timedelta(minutes=60 - 10 * i)) for i in range(6)])
+        self.store.extend([
+            _build("web", 2, "FAILURE", 200, self.now - timedelta(minutes=25)),
+            _build("web", 1, "SUCCESS", 100, self.now - timedelta(minutes=45)),
+            _build("web", 3, "SUCCESS", 300, self.now + timedelta(minutes=5)),
+        ])
+
+        timestamps = list(self.store.timestamps_ms)
+        assert timestamps == sorted(timestamps)
+        assert len(self.store) == 9
+        rows = [
+            (self.store.pipeline_name(pid), number, duration // 1000)
+            for pid, number, duration in zip(self.store.pipeline_ids, self.store.numbers, self.store.durations_ms)
+        ]
+        assert rows == [
+            ("api", 0, 0), ("api", 1, 1), ("web", 1, 100), ("api", 2, 2), ("api", 3, 3),
+            ("web", 2, 200), ("api", 4, 4), ("api", 5, 5), ("web", 3, 300),
+        ]
+
+    def test_group_by_pipeline_and_status(self):
+        """Aggregates match a plain per-build computation."""
+        self.store.extend([
+            _build("api", 1, "SUCCESS", 60, self.now - timedelta(hours=3)),
+            _build("api", 2, "FAILURE", 30, self.now - timedelta(hours=2)),
+            _build("web", 1, "SUCCESS", None, self.now - timedelta(hours=1)),
+        ])
+
+        by_pipeline = self.store.group_by("pipeline")
+        assert by_pipeline["api"]["builds"] == 2
+        assert by_pipeline["api"]["success_rate"] == 50.0
+        assert by_pipeline["api"]["avg_duration"] == 45.0
+        assert by_pipeline["web"]["avg_duration"] is None
+
+        by_status = self.store.group_by("status")
+        assert by_status["SUCCESS"]["builds"] == 2
+        assert by_status["FAILURE"]["failures"] == 1
+
+        totals = self.store.totals()
+        assert totals["builds"] == 3
+        assert totals["failures"] == 1
+
+    def test_out_of_order_appends_keep_time_order(self):
+        """Late builds are sorted in so time ranges stay correct."""
+        self.store.append(_build("api", 2, "SUCCESS", 10, self.now - timedelta(hours=1)))
+        self.store.append(_build("api", 1, "FAILURE", 10, self.now - timedelta(hours=5)))
+
+        lo, hi = self.store.time_range(start=self.now - timedelta(hours=2))
+        rows = self.store.rows(lo, hi)
+        assert [r["build_number"] for r in rows] == [2]
+        assert self.store.totals(start=self.now - timedelta(hours=6), pipeline_name="api")["builds"] == 2
+        assert self.store.group_by("pipeline", pipeline_name="missing") == {}
+
+    def test_compact_drops_expired_builds(self):
+        """Builds older than the retention window are evicted."""
+        self.store.retention_days = 7
+        self.store.extend([
+            _build("api", 1, "SUCCESS", 10, self.now - timedelta(days=30)),
+            _build("api", 2, "SUCCESS", 10, self.now - timedelta(days=1)),
+        ])
+        assert self.store.compact() == 1
+        assert len(self.store) == 1
+        assert self.store.memory_bytes() == 4 + 4 + 1 + 8 + 8 + 4
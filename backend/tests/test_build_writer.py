@@ -0,0 +1,67 @@
+from datetime import datetime
+from app.database import init_db, get_session
+from app.models import Build, BuildStatus
+from app.services.build_writer import BulkBuildWriter
+
+
+def _record(number, status="SUCCESS", **extra):
+    return {"pipeline_name": "api", "build_number": number, "status": status,
+            "duration": 60, "timestamp": datetime(2024, 1, 1, 12), "triggered_by": "jenkins", **extra}
+
+
+class TestBulkBuildWriter:
+    """Test multi-row upserts into the builds table."""
+
+    def setup_method(self):
+        init_db()
+        db = get_session()
+        db.query(Build).delete()
+        db.commit()
+        db.close()
+        self.writer = BulkBuildWriter(batch_size=3, flush_interval=0)
+        self.inserted = []
+        self.writer.add_listener(lambda records, db: self.inserted.extend(r["build_number"] for r in records))
+
+    def _stored(self):
+        db = get_session()
+        try:
+            return {b.build_number: b for b in db.query(Build).all()}
+        finally:
+            db.close()
+
+    def test_upsert_updates_without_duplicating(self):
+        assert self.writer.write([_record(1), _record(2, url="http://j/2")]) == {"inserted": 2, "updated": 0}
+        stats = self.writer.write([_record(2, status="FAILURE", duration=None), _record(3)])
+        assert stats == {"inserted": 1, "updated": 1}
+
+        stored = self._stored()
+        assert sorted(stored) == [1, 2, 3]
+        assert stored[2].status == BuildStatus.FAILURE
+        # Fields the update leaves out keep their stored values
+        assert stored[2].duration == 60
+        assert stored[2].url == "http://j/2"
+        # Only inserted builds reach listeners, so aggregates count each once
+        assert self.inserted == [1, 2, 3]
+
+    def test_buffer_flushes_by_size_and_chunks(self):
+        assert self.writer.add([_record(1), _record(1, status="FAILURE")]) == 1  # Last copy wins
+        assert self._stored() == {}
+        self.writer.add([_record(n) for n in range(2, 9)])  # Batch full: flushed in chunks of 3
+
+        assert self.writer.pending() == 0
+        stored = self._stored()
+        assert sorted(stored) == list(range(1, 9))
+        assert stored[1].status == BuildStatus.FAILURE
+
+        self.writer.add([_record(9)])
+        assert self.writer.flush_if_due() == {"inserted": 1, "updated": 0}
+
+    def test_failing_listener_does_not_fail_the_write(self):
+        def broken(records, db):
+            raise RuntimeError("listener bug")
+
+        self.writer._listeners.insert(0, broken)
+        # Every chunk is written and later listeners still run
+        assert self.writer.write([_record(n) for n in range(1, 8)]) == {"inserted": 7, "updated": 0}
+        assert sorted(self._stored()) == list(range(1, 8))
+        assert self.inserted == list(range(1, 8))
@@ -0,0 +1,131 @@
+import gzip
+import json
+import pytest
+from datetime import datetime
+from app.database import init_db, get_session
+from app.models import Build, BuildStatus
+from app.services.build_writer import BulkBuildWriter
+from app.services.bulk_import import NdjsonImporter, BulkImportError, RecordError, iter_lines, parse_record
+from app.services.correlation import failure_correlator
+from app.services.delivery_metrics import delivery_metrics
+from app.services.ingestion import build_ingestion_service
+from app.services.regression import duration_regression_detector
+
+
+async def _chunks(body: bytes, size: int):
+    for i in range(0, len(body), size):
+        yield body[i:i + size]
+
+
+async def _lines(body: bytes, size: int, max_line_bytes: int = 1000):
+    return [item async for item in iter_lines(_chunks(body, size), max_line_bytes)]
+
+
+def _line(number, **extra):
+    return json.dumps({"pipeline_name": "api", "build_number": number, "status": "success",
+                       "timestamp": "2024-01-01T12:00:00Z", "duration": 60, **extra})
+
+
+def test_parse_record():
+    record = parse_record({"pipeline_name": "api", "build_number": 7, "status": "canceled",
+                           "timestamp": "2024-01-01T14:00:00+02:00", "parameters": {"env": "prod"}})
+    assert record["status"] == BuildStatus.ABORTED.value
+    assert record["timestamp"] == datetime(2024, 1, 1, 12)
+    assert record["parameters"] == '{"env": "prod"}'
+    assert parse_record(json.loads(_line(1, timestamp=1704110400000)))["timestamp"] == datetime(2024, 1, 1, 12)
+
+    for bad in ({"build_number": 1}, json.loads(_line(-1)), json.loads(_line(True)),
+                json.loads(_line(1, status="exploded")), json.loads(_line(1, timestamp=None)),
+                json.loads(_line(1, duration="60")), json.loads(_line(1, branch="x" * 300)), [1]):
+        with pytest.raises(RecordError):
+            parse_record(bad)
+
+
+@pytest.mark.asyncio
+async def test_iter_lines_across_chunks_and_gzip():
+    body = b'{"a": 1}\n\n{"b": 2}\r\n' + b"x" * 50 + b'\n{"c": 3}'
+    expected = [(1, b'{"a": 1}'), (3, b'{"b": 2}\r'), (4, None), (5, b'{"c": 3}')]
+    for size in (1, 7, len(body)):
+        assert await _lines(body, size, max_line_bytes=20) == expected
+
+    # Concatenated gzip members fed a byte at a time
+    compressed = gzip.compress(body[:12]) + gzip.compress(body[12:])
+    assert await _lines(compressed, 1, max_line_bytes=20) == expected
+
+    with pytest.raises(BulkImportError):
+        await _lines(gzip.compress(body)[:-10], 8)
+
+
+class TestBulkImporter:
+    """Test streaming NDJSON imports into the builds table."""
+
+    def setup_method(self):
+        init_db()
+        db = get_session()
+        db.query(Build).delete()
+        db.commit()
+        db.close()
+        writer = BulkBuildWriter()
+        writer.add_listener(build_ingestion_service.observe_new_builds)
+        self.importer = NdjsonImporter(writer)
+        self.importer.batch_size = 3
+
+    def _stored(self):
+        db = get_session()
+        try:
+            return {b.build_number: b for b in db.query(Build).all()}
+        finally:
+            db.close()
+
+    @pytest.mark.asyncio
+    async def test_bad_lines_do_not_abort_the_import(self):
+        lines = [_line(i) for i in range(1, 9)]
+        lines[2] = "{not json"
+        lines[5] = _line(6, status="exploded")
+        body = gzip.compress(("\n".join(lines) + "\n" + _line(1, status="FAILED")).encode())
+
+        report = await self.importer.aimport(_chunks(body, 64))
+        assert report["lines"] == 9
+        assert report["accepted"] == 7
+        assert report["inserted"] == 6
+        assert report["updated"] == 1
+        assert report["failed"] == 2
+        assert [e["line"] for e in report["errors"]] == [3, 6]
+        assert report["errors"][0]["error"].startswith("Invalid JSON")
+
+        stored = self._stored()
+        assert sorted(stored) == [1, 2, 4, 5, 7, 8]
+        assert stored[1].status == BuildStatus.FAILURE
+
+    @pytest.mark.asyncio
+    async def test_error_list_is_capped(self):
+        self.importer.max_errors = 2
+        body = ("\n".join(["[]"] * 5 + [_line(1)])).encode()
+        report = await self.importer.aimport(_chunks(body, 1024))
+        assert report["failed"] == 5
+        assert len(report["errors"]) == 2
+        assert report["errors_truncated"]
+        assert report["inserted"] == 1
+
+    @pytest.mark.asyncio
+    async def test_backfill_of_old_failures_sends_no_alerts(self):
+        # Slow-downs and failures across pipelines at once: incident and regression material if live
+        lines = [_line(n, pipeline_name="slow", duration=60) for n in range(1, 21)]
+        lines += [_line(n, pipeline_name="slow", duration=3600) for n in range(21, 31)]
+        lines += [_line(1, pipeline_name=f"down-{i}", status="FAILURE") for i in range(4)]
+        body = "\n".join(lines).encode()
+        failure_correlator.drain_new_incidents()
+        duration_regression_detector.drain_alerts()
+
+        report = await self.importer.aimport(_chunks(body, 256))
+        assert report["inserted"] == 34
+        assert failure_correlator.drain_new_incidents() == []
+        assert duration_regression_detector.drain_alerts() == []
+        assert delivery_metrics.metrics("down-0", days=7)["current_failure_streak"] == 0
+
+        # The same history imported as live builds does raise them
+        body = body.replace(b'"slow"', b'"live-slow"').replace(b'"down-', b'"live-down-')
+        await self.importer.aimport(_chunks(body, 256), backfill=False)
+        assert failure_correlator.drain_new_incidents()
+        assert duration_regression_detector.drain_alerts()
+        assert delivery_metrics.metrics("live-down-0", days=7)["current_failure_streak"] == 1
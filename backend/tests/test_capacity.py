@@ -0,0 +1,72 @@
+from datetime import datetime, timedelta
+from app.database import init_db, get_session
+from app.models import CapacityRollup
+from app.services.capacity import CapacityAccounting
+from app.services.ingestion import build_record_from_jenkins
+
+
+class TestCapacityAccounting:
+    """Test executor-seconds and queue-wait rollups."""
+
+    def setup_method(self):
+        init_db()
+        db = get_session()
+        db.query(CapacityRollup).delete()
+        db.commit()
+        db.close()
+        self.capacity = CapacityAccounting()
+        self.now = datetime.utcnow().replace(microsecond=0)
+
+    def _build(self, pipeline, node, duration, queue_wait=None, days_ago=0):
+        return {
+            "pipeline_name": pipeline,
+            "built_on": node,
+            "duration": duration,
+            "queue_wait": queue_wait,
+            "timestamp": self.now - timedelta(days=days_ago)
+        }
+
+    def test_usage_by_pipeline_and_node(self):
+        self.capacity.observe_build(self._build("api", "agent-1", 600, 30))
+        self.capacity.observe_build(self._build("api", "agent-2", 1200, 90))
+        self.capacity.observe_build(self._build("web", "agent-1", 60))
+        self.capacity.flush()
+        # Deltas are added onto existing rows
+        self.capacity.observe_build(self._build("api", "agent-1", 600, 0))
+        self.capacity.flush()
+
+        by_pipeline = {r["pipeline"]: r for r in self.capacity.usage("pipeline", days=7)}
+        assert by_pipeline["api"]["builds"] == 3
+        assert by_pipeline["api"]["executor_seconds"] == 2400
+        assert by_pipeline["api"]["avg_queue_wait_seconds"] == 40.0
+        assert by_pipeline["api"]["max_queue_wait_seconds"] == 90
+        assert by_pipeline["web"]["avg_queue_wait_seconds"] is None
+
+        by_node = self.capacity.usage("node", days=7)
+        assert by_node[0]["node"] == "agent-1"
+        assert by_node[0]["executor_seconds"] == 1260
+
+    def test_queue_wait_inferred_from_queue_sightings(self):
+        since = self.now - timedelta(minutes=5)
+        self.capacity.observe_queue([
+            {"id": 7, "inQueueSince": (since - datetime(1970, 1, 1)).total_seconds() * 1000,
+             "task": {"name": "api"}, "why": "Waiting for next available executor"}
+        ])
+        assert self.capacity.queue_now()["waiting"] == 1
+
+        build = self._build("api", "agent-1", 60)
+        self.capacity.fill_queue_wait(build)
+        assert build["queue_wait"] == 300
+
+        # Each sighting is consumed once
+        other = self._build("api", "agent-1", 60)
+        self.capacity.fill_queue_wait(other)
+        assert other["queue_wait"] is None
+
+    def test_record_reads_node_and_queue_action(self):
+        record = build_record_from_jenkins("api", {
+            "number": 3, "result": "SUCCESS", "timestamp": 1_700_000_000_000, "duration": 5000,
+            "builtOn": "", "actions": [{"queuingDurationMillis": 12400}]
+        })
+        assert record["built_on"] == "built-in"
+        assert record["queue_wait"] == 12
@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta
+from app.services.correlation import FailureCorrelator
+
+
+class TestFailureCorrelator:
+    """Test clustering of simultaneous failures into incidents."""
+
+    def setup_method(self):
+        self.correlator = FailureCorrelator()
+        self.correlator.window = timedelta(minutes=10)
+        self.correlator.min_pipelines = 3
+        self.start = datetime.utcnow() - timedelta(hours=1)
+
+    def _fail(self, pipeline, minutes, number=1, node="agent-1", status="FAILURE"):
+        return self.correlator.observe_build({
+            "pipeline_name": pipeline,
+            "build_number": number,
+            "status": status,
+            "duration": 60,
+            "timestamp": self.start + timedelta(minutes=minutes),
+            "built_on": node,
+        })
+
+    def test_simultaneous_failures_form_one_incident(self):
+        assert self._fail("api", 0) is None
+        assert self._fail("web", 2) is None
+        incident = self._fail("worker", 4, node="agent-2")
+        assert incident["pipelines"] == ["api", "web", "worker"]
+        assert incident["suspected_node"] == "agent-1"
+
+        # Later failures inside the window join the same incident
+        joined = self._fail("docs", 12)
+        assert joined["id"] == incident["id"]
+        assert joined["pipeline_count"] == 4
+
+        assert [i["id"] for i in self.correlator.drain_new_incidents()] == [incident["id"]]
+        assert self.correlator.drain_new_incidents() == []
+        assert self.correlator.incident_for("web", 1) == incident["id"]
+
+    def test_spread_out_failures_are_not_correlated(self):
+        for i, name in enumerate(["api", "web", "worker", "docs"]):
+            assert self._fail(name, i * 30) is None
+        assert self.correlator.incidents() == []
+        assert self.correlator.incident_for("api", 1) is None
+
+    def test_ignores_successes_and_duplicates(self):
+        assert self._fail("api", 0, status="SUCCESS") is None
+        self._fail("api", 0)
+        self._fail("api", 0)  # Same build observed twice
+        self._fail("api", 1, number=2)
+        assert self.correlator.incidents() == []
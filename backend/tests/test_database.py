@@ -0,0 +1,46 @@
+from sqlalchemy import insert, select, text
+from sqlalchemy.orm import sessionmaker
+from app.database import Base, RoutingSession, create_sqlite_engines
+from app.models import Pipeline
+
+
+class TestSQLiteProfile:
+    """Test the tuned SQLite profile and read/write routing."""
+
+    def _engines(self, tmp_path):
+        writer, reader = create_sqlite_engines(f"sqlite:///{tmp_path / 'profile.db'}")
+        Base.metadata.create_all(bind=writer)
+        return writer, reader
+
+    def test_pragmas(self, tmp_path):
+        writer, reader = self._engines(tmp_path)
+        with reader.connect() as conn:
+            assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+            assert conn.execute(text("PRAGMA query_only")).scalar() == 1
+            assert conn.execute(text("PRAGMA busy_timeout")).scalar() > 0
+        with writer.connect() as conn:
+            assert conn.execute(text("PRAGMA query_only")).scalar() == 0
+        assert writer.pool.size() == 1
+
+    def test_memory_database_shares_one_connection(self):
+        writer, reader = create_sqlite_engines("sqlite:///:memory:")
+        assert reader is None
+
+    def test_session_reads_its_own_writes(self, tmp_path):
+        writer, reader = self._engines(tmp_path)
+        Session = sessionmaker(class_=RoutingSession, bind=writer, info={"reader": reader})
+        db = Session()
+        try:
+            assert db.get_bind(clause=select(Pipeline)) is reader
+            db.execute(insert(Pipeline), [{"name": "api"}])
+            # Uncommitted rows are only visible on the writer connection
+            assert db.query(Pipeline.name).scalar() == "api"
+            db.commit()
+            assert db.get_bind(clause=select(Pipeline)) is reader
+
+            db.add(Pipeline(name="web"))
+            db.commit()
+            assert sorted(n for (n,) in db.query(Pipeline.name)) == ["api", "web"]
+        finally:
+            db.close()
@@ -0,0 +1,56 @@
+import math
+from datetime import datetime, timedelta
+from app.routers import compat
+from app.services.downsampling import bucket_floor, fit_resolution, lttb, lttb_indices
+
+
+class TestLTTB:
+    """Test Largest-Triangle-Three-Buckets downsampling."""
+
+    def test_keeps_endpoints_and_size(self):
+        xs = list(range(1000))
+        ys = [math.sin(x / 20) for x in xs]
+        indices = lttb_indices(xs, ys, 100)
+        assert len(indices) == 100
+        assert indices[0] == 0 and indices[-1] == 999
+        assert indices == sorted(set(indices))
+
+    def test_preserves_spikes(self):
+        """A single spike survives even at heavy reduction."""
+        points = [{"t": i, "d": 60} for i in range(5000)]
+        points[2345]["d"] = 3600
+        sampled = lttb(points, 50, x=lambda p: p["t"], y=lambda p: p["d"])
+        assert len(sampled) == 50
+        assert max(p["d"] for p in sampled) == 3600
+
+    def test_small_series_untouched(self):
+        points = [(0, 1), (1, 2)]
+        assert lttb(points, 10, x=lambda p: p[0], y=lambda p: p[1]) == points
+        assert lttb(points, None, x=lambda p: p[0], y=lambda p: p[1]) == points
+
+
+class TestResolution:
+    """Test bucket truncation and resolution fitting."""
+
+    def test_bucket_floor(self):
+        ts = datetime(2025, 8, 28, 13, 45, 12)  # A Thursday
+        assert bucket_floor(ts, "minute") == datetime(2025, 8, 28, 13, 45)
+        assert bucket_floor(ts, "hour") == datetime(2025, 8, 28, 13)
+        assert bucket_floor(ts, "day") == datetime(2025, 8, 28)
+        assert bucket_floor(ts, "week") == datetime(2025, 8, 25)
+
+    def test_fit_resolution_coarsens_long_windows(self):
+        assert fit_resolution(timedelta(hours=24), "hour", 1000) == "hour"
+        assert fit_resolution(timedelta(days=90), "hour", 1000) == "day"
+        assert fit_resolution(timedelta(days=90), "minute", 50) == "week"
+        assert fit_resolution(timedelta(days=90), "minute", None) == "minute"
+
+    def test_build_trend_never_exceeds_max_points(self, monkeypatch):
+        """A window too long even for weekly buckets is sampled down to maxPoints."""
+        monkeypatch.setattr(compat, "_get_json", lambda url: {"jobs": []})
+        trend = compat.legacy_build_trend(windowHours=24 * 7 * 200, resolution="hour", maxPoints=50)
+        assert trend["resolution"] == "week"
+        assert len(trend["buckets"]) == len(trend["success"]) == len(trend["avgDurationMs"]) == 50
+
+        trend = compat.legacy_build_trend(windowHours=24, resolution="hour", maxPoints=50)
+        assert len(trend["buckets"]) in (24, 25)
@@ -0,0 +1,50 @@
+from app.services.flakiness import FlakinessDetector, _FlipWindow
+
+
+class TestFlipWindow:
+    """Test incremental flip counting."""
+
+    def test_flips_track_sliding_window(self):
+        """Flip count always equals a recount of the current window."""
+        window = _FlipWindow(size=4)
+        outcomes = [True, False, True, True, False, False, True, True, True]
+        for i, passed in enumerate(outcomes):
+            window.push(passed)
+            current = outcomes[max(0, i - 3):i + 1]
+            expected = sum(1 for a, b in zip(current, current[1:]) if a != b)
+            assert window.flips == expected
+
+
+class TestFlakinessDetector:
+    """Test per-branch scoring and ranking."""
+
+    def _feed(self, detector, pipeline, branch, statuses):
+        for status in statuses:
+            detector.observe_build({"pipeline_name": pipeline, "branch": branch, "status": status})
+
+    def test_alternating_pipeline_ranks_first(self):
+        detector = FlakinessDetector()
+        self._feed(detector, "flaky", "main", ["SUCCESS", "FAILURE"] * 5)
+        self._feed(detector, "stable", "main", ["SUCCESS"] * 10)
+
+        ranked = detector.ranked()
+        assert ranked[0]["pipeline"] == "flaky"
+        assert ranked[0]["is_flaky"] is True
+        assert ranked[0]["flakiness_score"] == 1.0
+        assert detector.scores()["stable"] == 0.0
+
+    def test_branches_are_scored_separately(self):
+        """A broken feature branch next to a green main is not flaky."""
+        detector = FlakinessDetector()
+        for _ in range(6):
+            self._feed(detector, "api", "main", ["SUCCESS"])
+            self._feed(detector, "api", "feature", ["FAILURE"])
+
+        summary = detector.pipeline_score("api")
+        assert summary["flakiness_score"] == 0.0
+        assert len(summary["branches"]) == 2
+
+    def test_aborted_builds_are_ignored(self):
+        detector = FlakinessDetector()
+        self._feed(detector, "api", None, ["SUCCESS", "ABORTED", "SUCCESS"])
+        assert detector.pipeline_score("api")["flips"] == 0
@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta
+from app.database import init_db, get_session
+from app.models import BuildRollup
+from app.services.forecasting import LoadForecaster, hour_of_week
+
+
+def _daily_rollups(name, hour, builds, duration, days):
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    return [
+        BuildRollup(pipeline_name=name, bucket_start=today - timedelta(days=d) + timedelta(hours=hour),
+                    total_builds=builds, duration_count=builds, duration_sum=builds * duration)
+        for d in range(1, days + 1)
+    ]
+
+
+class TestLoadForecaster:
+    """Test hour-of-week forecasting from rollups."""
+
+    def setup_method(self):
+        init_db()
+        db = get_session()
+        db.query(BuildRollup).delete()
+        # Nightly: 4 builds of 30 minutes at 02:00 every day = 2 busy executors
+        db.add_all(_daily_rollups("nightly", 2, 4, 1800, days=21))
+        db.commit()
+        db.close()
+        self.forecaster = LoadForecaster()
+
+    def test_learns_daily_peak(self):
+        assert self.forecaster.train() > 0
+        forecast = self.forecaster.forecast(hours=168)
+
+        assert len(forecast["points"]) == 168
+        for point in forecast["points"]:
+            hour = datetime.fromisoformat(point["hour"]).hour
+            assert point["expected_executors"] == (2.0 if hour == 2 else 0.0)
+        assert forecast["peak"]["expected_executors"] == 2.0
+        assert forecast["recommended_executors"] == 2
+        # A perfectly regular pattern is predicted without error after the first week
+        assert forecast["error"]["hours_scored"] > 0
+        assert forecast["error"]["mae_executors"] == 0.0
+
+    def test_training_is_incremental(self):
+        self.forecaster.train()
+        assert self.forecaster.train() == 0  # Nothing settled since
+
+        # Pretend the last day was not trained yet and a heavier run happened
+        self.forecaster._trained_through -= timedelta(days=1)
+        db = get_session()
+        row = db.query(BuildRollup).order_by(BuildRollup.bucket_start.desc()).first()
+        slot = hour_of_week(row.bucket_start)
+        row.duration_sum = 4 * 3600
+        db.commit()
+        db.close()
+
+        assert self.forecaster.train() == 24
+        point = self.forecaster.forecast(hours=168)["points"]
+        expected = next(p for p in point if hour_of_week(datetime.fromisoformat(p["hour"])) == slot)
+        # Smoothed toward 4 executors, with a nonzero band and error
+        assert 2.0 < expected["expected_executors"] < 4.0
+        assert expected["upper_executors"] > expected["expected_executors"]
+        assert self.forecaster.forecast(pipeline_name="nightly")["error"]["mae_executors"] > 0
+
+    def test_unknown_pipeline_forecasts_nothing(self):
+        self.forecaster.train()
+        forecast = self.forecaster.forecast(hours=24, pipeline_name="missing")
+        assert all(p["expected_executors"] == 0 for p in forecast["points"])
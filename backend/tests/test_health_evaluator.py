@@ -0,0 +1,75 @@
+import asyncio
+from datetime import datetime, timedelta
+from app.database import init_db, get_session
+from app.models import BuildRollup, Pipeline, PipelineHealth
+from app.routers import pipelines as pipelines_router
+from app.services.health_evaluator import HealthEvaluator, classify_health
+from app.services.job_monitor import job_monitor
+
+
+def _rollup(name, total, failures, avg_duration, hours_ago=1):
+    bucket = (datetime.utcnow() - timedelta(hours=hours_ago)).replace(minute=0, second=0, microsecond=0)
+    return BuildRollup(
+        pipeline_name=name, bucket_start=bucket, total_builds=total, success_count=total - failures,
+        failure_count=failures, duration_count=total, duration_sum=avg_duration * total
+    )
+
+
+class TestHealthEvaluator:
+    """Test set-based health evaluation over rollups."""
+
+    def setup_method(self):
+        init_db()
+        db = get_session()
+        db.query(BuildRollup).delete()
+        db.query(Pipeline).delete()
+        db.add_all([
+            Pipeline(name="strict", failure_rate_threshold=0.05, build_time_threshold=1800),
+            Pipeline(name="slow-ok", failure_rate_threshold=0.2, build_time_threshold=7200,
+                     health_status=PipelineHealth.UNHEALTHY),
+            Pipeline(name="idle"),
+            _rollup("strict", 20, 2, 60),
+            _rollup("slow-ok", 10, 0, 3600),
+            _rollup("new", 10, 1, 2400),
+            _rollup("new", 10, 9, 60, hours_ago=24 * 30),  # Outside the window
+        ])
+        db.commit()
+        db.close()
+        self.evaluator = HealthEvaluator()
+
+    def test_uses_per_pipeline_thresholds(self):
+        summary = self.evaluator.evaluate()
+        assert self.evaluator.statuses() == {
+            "strict": "UNHEALTHY",   # 10% failures > 5%
+            "slow-ok": "HEALTHY",    # 1h builds are within its own 2h limit
+            "idle": "HEALTHY",
+            "new": "WARNING",        # 40 min average > default 30 min
+        }
+        assert summary["total_pipelines"] == 4
+        assert summary["unhealthy_pipelines"] == 1
+        assert summary["warning_pipelines"] == 1
+        assert summary["health_percentage"] == 50.0
+
+    def test_persists_statuses_and_creates_missing_pipelines(self):
+        self.evaluator.evaluate()
+        db = get_session()
+        stored = {p.name: p.health_status for p in db.query(Pipeline).all()}
+        db.close()
+        assert stored["strict"] == PipelineHealth.UNHEALTHY
+        assert stored["slow-ok"] == PipelineHealth.HEALTHY
+        assert stored["new"] == PipelineHealth.WARNING
+        assert not self.evaluator.due()
+
+    def test_health_summary_endpoint_and_monitor(self, monkeypatch):
+        monkeypatch.setattr(pipelines_router, "health_evaluator", self.evaluator)
+        monkeypatch.setattr("app.services.job_monitor.health_evaluator", self.evaluator)
+        # The job monitor runs the evaluation in a worker thread
+        asyncio.run(job_monitor._evaluate_health())
+        response = asyncio.run(pipelines_router.get_pipeline_health_summary())
+        assert response["data"]["total_pipelines"] == 4
+        assert response["data"]["unhealthy_pipelines"] == 1
+
+    def test_classify_health(self):
+        assert classify_health(0.3, 10, 0.2, 1800) == PipelineHealth.UNHEALTHY
+        assert classify_health(0.15, 10, 0.2, 1800) == PipelineHealth.WARNING
+        assert classify_health(0.0, None, 0.2, 1800) == PipelineHealth.HEALTHY
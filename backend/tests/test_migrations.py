@@ -0,0 +1,115 @@
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, func, inspect, select, text, tuple_
+from sqlalchemy.pool import StaticPool
+from app.database import Base, init_db, get_session
+from app.migrations import SCHEMA_VERSION, run_migrations
+from app.models import Build, BuildRollup, BuildStatus, CapacityRollup, Pipeline
+
+# builds/build_rollups as created before schema versioning
+V1_SCHEMA = """
+CREATE TABLE builds (
+    id INTEGER PRIMARY KEY, build_number INTEGER NOT NULL, pipeline_name VARCHAR(255) NOT NULL,
+    status VARCHAR(8) NOT NULL, duration INTEGER, timestamp DATETIME, triggered_by VARCHAR(255) NOT NULL,
+    branch VARCHAR(255), commit_hash VARCHAR(255), url VARCHAR(500), console_output TEXT,
+    parameters TEXT, created_at DATETIME, updated_at DATETIME
+);
+CREATE INDEX ix_builds_pipeline_name ON builds (pipeline_name);
+CREATE TABLE build_rollups (
+    id INTEGER PRIMARY KEY, pipeline_name VARCHAR(255) NOT NULL, bucket_start DATETIME NOT NULL,
+    total_builds INTEGER, success_count INTEGER, failure_count INTEGER, duration_count INTEGER,
+    duration_sum FLOAT, duration_sketch TEXT, created_at DATETIME, updated_at DATETIME
+);
+INSERT INTO builds (id, build_number, pipeline_name, status, triggered_by) VALUES
+    (1, 1, 'api', 'FAILURE', 'jenkins'), (2, 1, 'api', 'SUCCESS', 'jenkins'), (3, 2, 'api', 'SUCCESS', 'jenkins');
+"""
+
+
+def _full_scans(db, statement):
+    """Plan steps that read a whole table instead of searching an index."""
+    sql = str(statement.compile(db.get_bind(), compile_kwargs={"literal_binds": True}))
+    plan = [row[-1] for row in db.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+    # "SCAN t USING [COVERING] INDEX" walks an index in order; a bare "SCAN t" is a table scan
+    return [step for step in plan if step.startswith("SCAN") and "INDEX" not in step and "CONSTANT" not in step]
+
+
+class TestMigrations:
+    """Test upgrading a pre-versioning database."""
+
+    def setup_method(self):
+        self.engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        with self.engine.begin() as conn:
+            for statement in V1_SCHEMA.split(";"):
+                if statement.strip():
+                    conn.execute(text(statement))
+        Base.metadata.create_all(bind=self.engine)
+
+    def test_upgrades_v1_database_idempotently(self):
+        assert run_migrations(self.engine) == SCHEMA_VERSION
+
+        inspector = inspect(self.engine)
+        assert {"built_on", "queue_wait", "console_archive"} <= {c["name"] for c in inspector.get_columns("builds")}
+        assert "failure_streak_max" in {c["name"] for c in inspector.get_columns("build_rollups")}
+        indexes = {i["name"]: i for i in inspector.get_indexes("builds")}
+        assert indexes["uq_builds_pipeline_build"]["unique"]
+        assert indexes["ix_builds_pipeline_timestamp"]["column_names"][:2] == ["pipeline_name", "timestamp"]
+
+        with self.engine.connect() as conn:
+            # The newest duplicate survives
+            assert conn.execute(text("SELECT id FROM builds ORDER BY id")).scalars().all() == [2, 3]
+            assert conn.execute(text("SELECT COUNT(*) FROM schema_version")).scalar() == SCHEMA_VERSION
+
+        assert run_migrations(self.engine) == SCHEMA_VERSION
+        with self.engine.connect() as conn:
+            assert conn.execute(text("SELECT COUNT(*) FROM schema_version")).scalar() == SCHEMA_VERSION
+
+
+class TestQueryPlans:
+    """Endpoint query patterns must be served by indexes, not table scans."""
+
+    def setup_method(self):
+        init_db()
+        self.db = get_session()
+
+    def teardown_method(self):
+        self.db.close()
+
+    def test_build_queries_use_indexes(self):
+        since = datetime(2024, 1, 1)
+        queries = [
+            # Pipeline build history and per-pipeline windows
+            select(Build).where(Build.pipeline_name == "api").order_by(Build.timestamp.desc()).limit(50),
+            select(func.count(Build.id), func.avg(Build.duration)).where(
+                Build.pipeline_name == "api", Build.timestamp >= since, Build.status == BuildStatus.SUCCESS
+            ),
+            # Top-N and failing pipelines
+            select(Build).order_by(Build.duration.desc()).limit(20),
+            select(Build.pipeline_name, func.count()).where(
+                Build.status.in_([BuildStatus.FAILURE, BuildStatus.UNSTABLE]), Build.timestamp >= since
+            ).group_by(Build.pipeline_name),
+            # Ingestion watermarks and upsert key lookups
+            select(Build.pipeline_name, func.max(Build.build_number)).group_by(Build.pipeline_name),
+            select(Build.pipeline_name, Build.build_number).where(
+                tuple_(Build.pipeline_name, Build.build_number).in_([("api", 1), ("web", 2)])
+            ),
+            # Columnar store load and correlator warm-up
+            select(Build).where(Build.timestamp >= since).order_by(Build.timestamp),
+            # Last success per pipeline (delivery metrics)
+            select(Build.pipeline_name, func.max(Build.timestamp)).where(
+                Build.status == BuildStatus.SUCCESS
+            ).group_by(Build.pipeline_name),
+        ]
+        for query in queries:
+            assert _full_scans(self.db, query) == [], str(query)
+
+    def test_rollup_and_pipeline_queries_use_indexes(self):
+        since = datetime.utcnow() - timedelta(days=7)
+        queries = [
+            select(BuildRollup.pipeline_name, func.sum(BuildRollup.total_builds)).where(
+                BuildRollup.bucket_start >= since
+            ).group_by(BuildRollup.pipeline_name),
+            select(BuildRollup).where(BuildRollup.pipeline_name == "api", BuildRollup.bucket_start >= since),
+            select(CapacityRollup).where(CapacityRollup.day >= since),
+            select(Pipeline).where(Pipeline.name == "api"),
+        ]
+        for query in queries:
+            assert _full_scans(self.db, query) == [], str(query)
@@ -0,0 +1,76 @@
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import select
+from app.database import init_db, get_session, get_async_db, close_async_db
+from app.models import Build
+from app.services.pagination import CountCache, CursorError, Keyset
+
+KEYSET = Keyset("builds", Build.timestamp, Build.id)
+
+
+class TestKeysetPagination:
+    """Walking keyset pages visits every build exactly once, newest first."""
+
+    def setup_method(self):
+        init_db()
+        now = datetime.utcnow().replace(microsecond=0)
+        db = get_session()
+        db.query(Build).delete()
+        # Pairs of builds share a timestamp so pages must break ties on id
+        db.add_all([
+            Build(pipeline_name=f"p{i % 3}", build_number=i, status="SUCCESS", duration=60,
+                  timestamp=now - timedelta(minutes=i // 2), triggered_by="jenkins")
+            for i in range(25)
+        ])
+        db.commit()
+        db.close()
+
+    def test_pages_cover_all_builds_in_order(self):
+        db = get_session()
+        try:
+            expected = [row.id for row in db.execute(
+                select(Build.id).order_by(Build.timestamp.desc(), Build.id.desc())
+            )]
+            seen, cursor, pages = [], None, 0
+            while True:
+                stmt = KEYSET.apply(select(Build.id, Build.timestamp), cursor, 10)
+                rows, cursor = KEYSET.page(db.execute(stmt).all(), 10)
+                seen.extend(row.id for row in rows)
+                pages += 1
+                if cursor is None:
+                    break
+        finally:
+            db.close()
+
+        assert seen == expected
+        assert pages == 3
+
+    def test_invalid_cursors_are_rejected(self):
+        row = type("Row", (), {"timestamp": datetime(2024, 1, 1), "id": 7})()
+        token = KEYSET.encode(row)
+        assert KEYSET.decode(token) == [datetime(2024, 1, 1), 7]
+
+        with pytest.raises(CursorError):
+            KEYSET.decode("not-a-cursor")
+        # A cursor from the ascending listing cannot continue the descending one
+        with pytest.raises(CursorError):
+            KEYSET.decode(Keyset("builds", Build.timestamp, Build.id, descending=False).encode(row))
+
+    @pytest.mark.asyncio
+    async def test_count_is_cached(self):
+        counts = CountCache(ttl=60)
+        stmt = select(Build.id).where(Build.pipeline_name == "p0")
+        async for db in get_async_db():
+            first = await counts.acount(db, "p0", stmt)
+            db_sync = get_session()
+            db_sync.query(Build).filter(Build.pipeline_name == "p0").delete()
+            db_sync.commit()
+            db_sync.close()
+            cached = await counts.acount(db, "p0", stmt)
+            counts.clear()
+            fresh = await counts.acount(db, "p0", stmt)
+        await close_async_db()
+
+        assert first == (9, False)
+        assert cached == (9, False)
+        assert fresh == (0, False)
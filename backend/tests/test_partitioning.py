@@ -0,0 +1,114 @@
+import os
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import Base
+from app.migrations import run_migrations
+from app.models import Build, Notification
+from app.partitioning import (
+    PartitionManager, add_months, month_start, partition_ddl, partition_month, partition_name
+)
+from app.services.build_writer import BulkBuildWriter
+
+# A scratch PostgreSQL database, e.g. postgresql://postgres@localhost:5432/cicd_test (its tables are dropped)
+TEST_POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL")
+
+
+def test_month_helpers():
+    assert month_start(datetime(2024, 5, 17, 13, 5)) == datetime(2024, 5, 1)
+    assert add_months(datetime(2024, 11, 1), 3) == datetime(2025, 2, 1)
+    assert add_months(datetime(2024, 1, 1), -1) == datetime(2023, 12, 1)
+    assert partition_name(datetime(2024, 5, 1)) == "builds_p2024_05"
+    assert partition_month("builds_p2024_05") == datetime(2024, 5, 1)
+    assert partition_month("builds_unpartitioned") is None
+    assert partition_ddl(datetime(2024, 12, 1)).endswith("FROM ('2024-12-01') TO ('2025-01-01')")
+
+
+def test_disabled_off_postgres():
+    manager = PartitionManager()
+    engine = create_engine("sqlite://")
+    assert not manager.setup(engine)
+    assert not manager.partitioned
+    assert manager.ensure([datetime.utcnow()]) == 0
+
+
+@pytest.mark.skipif(not TEST_POSTGRES_URL, reason="TEST_POSTGRES_URL not set")
+class TestPostgresPartitioning:
+    """Converting builds to monthly partitions on a real PostgreSQL server."""
+
+    def setup_method(self):
+        self.engine = create_engine(TEST_POSTGRES_URL)
+        with self.engine.begin() as conn:
+            conn.execute(text("DROP TABLE IF EXISTS notifications, builds, schema_version CASCADE"))
+        Base.metadata.drop_all(bind=self.engine)
+        Base.metadata.create_all(bind=self.engine)
+        run_migrations(self.engine)
+
+        self.now = datetime.utcnow()
+        with Session(self.engine) as db:
+            old = Build(pipeline_name="api", build_number=1, status="SUCCESS", duration=60,
+                        timestamp=self.now - timedelta(days=70), triggered_by="jenkins")
+            db.add_all([
+                old,
+                Build(pipeline_name="api", build_number=2, status="FAILURE", duration=90,
+                      timestamp=self.now, triggered_by="jenkins"),
+            ])
+            db.flush()
+            db.add(Notification(build_id=old.id, type="email", message="failed"))
+            db.commit()
+
+        self._enabled = settings.postgres_partitioning
+        settings.postgres_partitioning = True
+
+    def teardown_method(self):
+        settings.postgres_partitioning = self._enabled
+        self.engine.dispose()
+
+    def test_convert_write_prune_and_drop(self):
+        manager = PartitionManager()
+        assert manager.setup(self.engine)
+        # A second startup finds it partitioned already
+        assert manager.setup(self.engine)
+
+        with self.engine.connect() as conn:
+            assert manager.is_partitioned(conn)
+            months = [month for _, month in manager.partitions(conn)]
+            assert months[0] == month_start(self.now - timedelta(days=70))
+            assert months[-1] == add_months(month_start(self.now), manager.months_ahead)
+            assert conn.execute(select(func.count(Build.id))).scalar() == 2
+
+        # Upserts use the partition-aware key and create the months they need
+        import app.services.build_writer as build_writer
+        original, build_writer.partition_manager = build_writer.partition_manager, manager
+        try:
+            writer = BulkBuildWriter()
+            future = self.now + timedelta(days=400)
+            record = {"pipeline_name": "web", "build_number": 1, "status": "SUCCESS", "timestamp": future}
+            with Session(self.engine) as db:
+                assert writer.write([record], db=db) == {"inserted": 1, "updated": 0}
+                assert writer.write([{**record, "duration": 30}], db=db) == {"inserted": 0, "updated": 1}
+                # The same build without its start time (stamped on receipt) still updates the stored row
+                assert writer.write([{**record, "timestamp": None, "status": "FAILURE"}], db=db) == \
+                    {"inserted": 0, "updated": 1}
+                assert db.execute(select(func.count(Build.id)).where(Build.pipeline_name == "web")).scalar() == 1
+                new_id = db.execute(select(Build.id).where(Build.pipeline_name == "web")).scalar()
+        finally:
+            build_writer.partition_manager = original
+        assert new_id > 2
+        assert month_start(future) in {month for _, month in manager.partitions(self.engine.connect())}
+
+        # A time-windowed query only scans the partitions its range overlaps
+        with self.engine.connect() as conn:
+            start = month_start(self.now)
+            plan = "\n".join(conn.execute(text(
+                "EXPLAIN SELECT COUNT(*) FROM builds WHERE timestamp >= :start AND timestamp < :end"
+            ), {"start": start, "end": add_months(start, 1)}).scalars())
+        assert partition_name(start) in plan
+        assert partition_name(month_start(self.now - timedelta(days=70))) not in plan
+
+        dropped = manager.drop_before(month_start(self.now - timedelta(days=30)))
+        assert dropped == [partition_name(month_start(self.now - timedelta(days=70)))]
+        with self.engine.connect() as conn:
+            assert conn.execute(select(func.count(Build.id))).scalar() == 2
@@ -0,0 +1,71 @@
+import random
+from datetime import datetime, timedelta
+from app.services.regression import DurationRegressionDetector
+
+
+class TestDurationRegressionDetector:
+    """Test EWMA/CUSUM slowdown detection."""
+
+    def _feed(self, detector, durations, start=0):
+        events = []
+        now = datetime.utcnow()
+        for i, duration in enumerate(durations, start=start):
+            event = detector.observe_build({
+                "pipeline_name": "api",
+                "build_number": i,
+                "status": "SUCCESS",
+                "duration": duration,
+                "timestamp": now - timedelta(minutes=1000 - i)
+            })
+            if event:
+                events.append(event)
+        return events
+
+    def test_no_alarm_on_noise(self):
+        rng = random.Random(7)
+        detector = DurationRegressionDetector()
+        events = self._feed(detector, [rng.gauss(600, 30) for _ in range(200)])
+        assert events == []
+
+    def test_slowdown_detected_within_a_few_builds(self):
+        rng = random.Random(7)
+        detector = DurationRegressionDetector()
+        self._feed(detector, [rng.gauss(600, 30) for _ in range(40)])
+        events = self._feed(detector, [rng.gauss(900, 30) for _ in range(10)], start=40)
+
+        assert len(events) == 1
+        assert events[0]["build_number"] <= 45
+        assert events[0]["increase_pct"] >= 20
+        assert detector.active_regression("api") is not None
+        assert len(detector.drain_alerts()) == 1
+        assert detector.drain_alerts() == []
+
+    def test_moderate_slowdown_is_reported(self):
+        """A +30% step is reported once even when its first alarm understates it."""
+        for seed in range(8):
+            rng = random.Random(seed)
+            detector = DurationRegressionDetector()
+            self._feed(detector, [rng.gauss(600, 30) for _ in range(40)])
+            events = self._feed(detector, [rng.gauss(780, 30) for _ in range(30)], start=40)
+
+            assert len(events) == 1, f"seed {seed}"
+            assert events[0]["baseline_seconds"] < 650
+            assert 20 <= events[0]["increase_pct"] <= 40
+
+    def test_failed_builds_are_ignored(self):
+        detector = DurationRegressionDetector()
+        detector.observe_build({"pipeline_name": "api", "status": "FAILURE", "duration": 5})
+        assert detector.pipeline_state("api") is None
+
+
+def test_active_regression_appears_in_advice(monkeypatch):
+    from app.services import advice
+    detector = DurationRegressionDetector()
+    rng = random.Random(7)
+    TestDurationRegressionDetector()._feed(detector, [rng.gauss(600, 30) for _ in range(40)])
+    TestDurationRegressionDetector()._feed(detector, [rng.gauss(900, 30) for _ in range(10)], start=40)
+    monkeypatch.setattr(advice, "duration_regression_detector", detector)
+
+    titles = [item["title"] for item in advice.pipeline_advice("api")]
+    assert "Build Duration Regression" in titles
+    assert "Build Duration Regression" not in [item["title"] for item in advice.pipeline_advice("web")]
@@ -0,0 +1,105 @@
+import os
+import pytest
+from sqlalchemy import Column, String, create_engine, text
+from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.database import RoutingSession, ReplicaMonitor, parse_lsn, replica_monitor
+
+TEST_POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL")
+
+
+class Origin(declarative_base()):
+    __tablename__ = "origin"
+    name = Column(String, primary_key=True)
+
+
+def _engine(name: str):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE origin (name TEXT)"))
+        conn.execute(text("INSERT INTO origin VALUES (:name)"), {"name": name})
+    return engine
+
+
+def test_parse_lsn():
+    assert parse_lsn("0/16B3748") == 0x16B3748
+    assert parse_lsn("16/B374D848") == (0x16 << 32) + 0xB374D848
+    assert parse_lsn("garbage") is None
+    assert parse_lsn(None) is None
+
+
+class TestReplicaRouting:
+    """Read-only sessions use the replica while it is fresh enough."""
+
+    def setup_method(self):
+        self.primary, self.replica = _engine("primary"), _engine("replica")
+        self.Session = sessionmaker(class_=RoutingSession, bind=self.primary, info={"replica": self.replica})
+        self._saved = (replica_monitor.engine, replica_monitor.max_lag)
+        replica_monitor.configure(self.replica)
+
+    def teardown_method(self):
+        engine, replica_monitor.max_lag = self._saved
+        replica_monitor.configure(engine)
+
+    def _origin(self, db) -> str:
+        return db.execute(text("SELECT name FROM origin")).scalar()
+
+    def test_routing(self):
+        readonly = self.Session(info={"readonly": True})
+        assert self._origin(readonly) == "replica"
+        readonly.close()
+
+        # Sessions not opened read-only (ingestion, background services) stay on the primary
+        regular = self.Session()
+        assert self._origin(regular) == "primary"
+        regular.close()
+
+        # A read-only session that writes reads its writes from the primary
+        writing = self.Session(info={"readonly": True})
+        writing.info["writing"] = True
+        assert self._origin(writing) == "primary"
+        writing.close()
+
+        # A flush marks the session as writing, so the insert and the reads after it use the primary
+        flushed = self.Session(info={"readonly": True})
+        assert self._origin(flushed) == "replica"
+        flushed.add(Origin(name="new"))
+        flushed.flush()
+        assert flushed.execute(text("SELECT COUNT(*) FROM origin WHERE name IN ('primary', 'new')")).scalar() == 2
+        flushed.rollback()
+        assert self._origin(flushed) == "replica"
+        flushed.close()
+
+    def test_lagging_replica_falls_back_to_primary(self):
+        replica_monitor.max_lag = -1
+        replica_monitor.configure(self.replica)
+        db = self.Session(info={"readonly": True})
+        assert self._origin(db) == "primary"
+        db.close()
+        assert replica_monitor.status()["healthy"] is False
+
+    def test_read_after_position(self):
+        monitor = ReplicaMonitor()
+        monitor.configure(self.replica)
+        assert monitor.usable()
+        monitor.replay_lsn = 100
+        assert monitor.usable(read_after=100, refresh=False)
+        assert not monitor.usable(read_after=101, refresh=False)
+
+
+@pytest.mark.skipif(not TEST_POSTGRES_URL, reason="TEST_POSTGRES_URL not set")
+def test_postgres_lag_and_replay_position():
+    engine = create_engine(TEST_POSTGRES_URL)
+    monitor = ReplicaMonitor()
+    monitor.configure(engine)
+    try:
+        monitor.refresh()
+        with engine.connect() as conn:
+            current = parse_lsn(conn.execute(text("SELECT pg_current_wal_lsn()::text")).scalar())
+        # A primary standing in for the replica has no lag and has replayed everything
+        assert monitor.healthy and monitor.lag == 0
+        assert monitor.replay_lsn <= current
+        assert monitor.usable(read_after=monitor.replay_lsn, refresh=False)
+        assert not monitor.usable(read_after=current + 1_000_000, refresh=False)
+    finally:
+        engine.dispose()
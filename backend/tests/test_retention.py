@@ -0,0 +1,97 @@
+from datetime import datetime, timedelta
+from app.database import init_db, get_session
+from app.models import Build, BuildRollup, Notification, Pipeline
+from app.services.retention import RetentionManager
+
+
+class TestRetention:
+    """Test log archival and batched deletion of old build history."""
+
+    def setup_method(self):
+        init_db()
+        now = datetime.utcnow()
+        db = get_session()
+        for model in (Notification, Build, BuildRollup, Pipeline):
+            db.query(model).delete()
+        builds = [
+            # Past the default retention (365 days)
+            *[Build(pipeline_name="api", build_number=i, status="SUCCESS", timestamp=now - timedelta(days=400),
+                    triggered_by="jenkins", console_output=f"api log {i}") for i in range(1, 6)],
+            # Old enough to archive the log, young enough to keep
+            Build(pipeline_name="api", build_number=10, status="FAILURE", timestamp=now - timedelta(days=40),
+                  triggered_by="jenkins", console_output="api log 10"),
+            Build(pipeline_name="api", build_number=11, status="SUCCESS", timestamp=now - timedelta(days=1),
+                  triggered_by="jenkins", console_output="api log 11"),
+            # The web pipeline keeps raw builds for 10 days only
+            Build(pipeline_name="web", build_number=1, status="FAILURE", timestamp=now - timedelta(days=20),
+                  triggered_by="jenkins", console_output="web log 1"),
+            Build(pipeline_name="web", build_number=2, status="SUCCESS", timestamp=now - timedelta(days=2),
+                  triggered_by="jenkins"),
+        ]
+        db.add_all(builds)
+        db.add(Pipeline(name="web", retention_days=10))
+        db.add(BuildRollup(pipeline_name="api", bucket_start=now - timedelta(days=400), total_builds=5,
+                           success_count=5, failure_count=0, duration_count=0, duration_sum=0.0))
+        db.flush()
+        db.add(Notification(build_id=builds[0].id, type="email", message="old", created_at=now - timedelta(days=400)))
+        db.add(Notification(build_id=builds[6].id, type="email", message="recent", created_at=now))
+        db.commit()
+        db.close()
+
+    def _manager(self, tmp_path, **kwargs):
+        manager = RetentionManager()
+        manager.archive_dir = str(tmp_path)
+        manager.batch_size = 2
+        for name, value in kwargs.items():
+            setattr(manager, name, value)
+        return manager
+
+    def test_archives_logs_and_deletes_expired_builds(self, tmp_path):
+        report = self._manager(tmp_path).run()
+
+        assert report["complete"]
+        assert report["deleted_builds"] == 6
+        # The 40-day-old log, the expired web build's and the five expired api builds' logs
+        assert report["archived_logs"] == 7
+        assert report["archived_bytes"] > 0
+        assert report["deleted_notifications"] == 1
+
+        db = get_session()
+        try:
+            remaining = {(b.pipeline_name, b.build_number): b for b in db.query(Build).all()}
+            assert set(remaining) == {("api", 10), ("api", 11), ("web", 2)}
+            archived = remaining[("api", 10)]
+            assert archived.console_output is None
+            assert remaining[("api", 11)].console_output == "api log 11"
+            assert [n.message for n in db.query(Notification).all()] == ["recent"]
+            # Rollups are kept forever
+            assert db.query(BuildRollup).count() == 1
+        finally:
+            db.close()
+
+        manager = self._manager(tmp_path)
+        assert manager.read_console("api", 10, archived.console_archive) == "api log 10"
+        assert manager.read_console("api", 1, "api/missing.jsonl.gz") is None
+
+    def test_runs_are_bounded_and_resume(self, tmp_path):
+        manager = self._manager(tmp_path, max_batches=2)
+        first = manager.run()
+        assert not first["complete"]
+        assert first["batches"] == 2
+
+        manager.max_batches = 100
+        second = manager.run()
+        assert second["complete"]
+        assert first["deleted_builds"] + second["deleted_builds"] == 6
+        assert first["archived_logs"] + second["archived_logs"] == 7
+
+    def test_policies(self, tmp_path):
+        manager = self._manager(tmp_path)
+        manager.set_policy("api", 0)
+        assert manager.policies() == {"api": 0, "web": 10}
+
+        report = manager.run()
+        # api keeps everything; only the expired web build goes
+        assert report["deleted_builds"] == 1
+        manager.set_policy("api", None)
+        assert manager.policies() == {"web": 10}
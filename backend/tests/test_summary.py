@@ -0,0 +1,96 @@
+import json
+import pytest
+from starlette.requests import Request
+from app.database import init_db
+from app.api.endpoints import analytics
+from app.services.summary import SummaryMaterializer
+
+
+class TestSummaryMaterializer:
+    """Test change-driven recomputation and ETag snapshots."""
+
+    def setup_method(self):
+        self.fingerprint = "a"
+        self.computed = 0
+
+        def compute():
+            self.computed += 1
+            return {"totalBuilds": self.computed, "error": None}
+
+        self.materializer = SummaryMaterializer(compute, lambda: self.fingerprint, check_interval=0)
+        self.materializer.register_view("small", lambda s: {"totalBuilds": s["totalBuilds"]})
+
+    def test_recomputes_only_when_fingerprint_changes(self):
+        first = self.materializer.current()
+        assert self.materializer.current() is first
+        assert self.computed == 1
+
+        self.fingerprint = "b"
+        second = self.materializer.current()
+        assert second.version == first.version + 1
+        assert second.etag != first.etag
+        assert self.computed == 2
+
+    def test_snapshots_are_immutable(self):
+        snapshot = self.materializer.current()
+        with pytest.raises(TypeError):
+            snapshot.payload["totalBuilds"] = 0
+        with pytest.raises(AttributeError):
+            snapshot.version = 99
+
+    def test_views_follow_base_version(self):
+        view = self.materializer.view("small")
+        assert view.body == b'{"totalBuilds":1}'
+        assert self.materializer.view("small") is view
+        assert view.matches(view.etag)
+        assert view.matches(f'W/{view.etag}, "other"')
+        assert not view.matches('"other"')
+
+        self.fingerprint = "b"
+        assert self.materializer.view("small").version == 2
+
+    def test_rate_limits_fingerprint_probes(self):
+        probes = []
+        materializer = SummaryMaterializer(dict, lambda: probes.append(1) or "x", check_interval=60)
+        materializer.current()
+        materializer.current()
+        assert len(probes) == 1
+        materializer.invalidate()
+        materializer.current()
+        assert len(probes) == 2
+
+
+@pytest.mark.asyncio
+async def test_analytics_dashboard_summary_is_served_from_a_snapshot(monkeypatch):
+    init_db()
+    calls = []
+
+    async def overall_stats():
+        calls.append("stats")
+        return {"total_pipelines": 2, "total_builds": 10, "success_rate": 80.0}
+
+    async def node_info():
+        return {"computer": [{"offline": False}, {"offline": True}]}
+
+    async def build_trends(days):
+        return {"days": days}
+
+    monkeypatch.setattr(analytics.jenkins_client, "get_overall_stats", overall_stats)
+    monkeypatch.setattr(analytics.jenkins_client, "get_node_info", node_info)
+    monkeypatch.setattr(analytics.jenkins_client, "get_build_trends", build_trends)
+    materializer = SummaryMaterializer(analytics._compute_dashboard_summary, lambda: "a", check_interval=0)
+    monkeypatch.setattr(analytics, "dashboard_summary_materializer", materializer)
+
+    def request(etag=None):
+        headers = [(b"if-none-match", etag.encode())] if etag else []
+        return Request({"type": "http", "method": "GET", "headers": headers})
+
+    response = await analytics.get_dashboard_summary(request())
+    body = json.loads(response.body)
+    assert body["success"] and body["data"]["metrics"]["total_builds"] == 10
+    assert body["data"]["node_health"]["online_nodes"] == 1
+
+    # Unchanged data: a conditional request is answered from the snapshot without recomputing
+    unchanged = await analytics.get_dashboard_summary(request(response.headers["etag"]))
+    assert unchanged.status_code == 304
+    assert calls == ["stats"]
@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta
+from app.database import init_db, get_session
+from app.models import Build
+from app.services import top_n
+from app.services.build_store import ColumnarBuildStore
+
+
+class TestTopN:
+    """Test heap selection over the store and the indexed SQL fallback."""
+
+    def setup_method(self):
+        init_db()
+        now = datetime.utcnow().replace(microsecond=0)
+        records = []
+        for i in range(1, 31):
+            records.append({
+                "pipeline_name": "api" if i % 3 else "web",
+                "build_number": i,
+                "status": "FAILURE" if i % 5 == 0 else "SUCCESS",
+                "duration": i * 10,
+                "queue_wait": 100 - i if i % 2 else None,
+                "timestamp": now - timedelta(hours=i),
+                "triggered_by": "jenkins",
+            })
+        db = get_session()
+        db.query(Build).delete()
+        db.add_all([Build(**r) for r in records])
+        db.commit()
+        db.close()
+
+        self.store = ColumnarBuildStore()
+        self.store.extend(records)
+        self.service = top_n.TopNService()
+
+    def test_store_and_sql_agree(self, monkeypatch):
+        monkeypatch.setattr(top_n, "build_store", self.store)
+        from_store = self.service.top_builds("duration", 5, days=7)
+        assert [b["build_number"] for b in from_store] == [30, 29, 28, 27, 26]
+
+        monkeypatch.setattr(self.service, "_from_store", lambda start: False)
+        from_sql = self.service.top_builds("duration", 5, days=7)
+        assert [b["build_number"] for b in from_sql] == [30, 29, 28, 27, 26]
+
+    def test_queue_waits_skip_unknown(self, monkeypatch):
+        monkeypatch.setattr(top_n, "build_store", self.store)
+        waits = self.service.top_builds("queue_wait", 3, days=7, pipeline_name="api")
+        assert [(b["build_number"], b["queue_wait"]) for b in waits] == [(1, 99), (5, 95), (7, 93)]
+
+    def test_failing_pipelines(self, monkeypatch):
+        monkeypatch.setattr(top_n, "build_store", self.store)
+        expected = [
+            {"pipeline_name": "api", "builds": 20, "failures": 4, "failure_rate": 20.0},
+            {"pipeline_name": "web", "builds": 10, "failures": 2, "failure_rate": 20.0},
+        ]
+        assert self.service.failing_pipelines(10, days=7) == expected
+
+        monkeypatch.setattr(self.service, "_from_store", lambda start: False)
+        assert self.service.failing_pipelines(10, days=7) == expected
+        assert self.service.failing_pipelines(10, days=7, min_builds=15) == expected[:1]
@@ -0,0 +1,78 @@
+import pytest
+from datetime import datetime, timedelta
+from app.database import init_db, get_session, get_async_db, close_async_db
+from app.models import Build
+from app.services.window_counters import RingCounter, WindowCounterService
+
+
+class TestRingCounter:
+    """Test ring buffer slot recycling and window sums."""
+
+    def test_window_sums_only_live_slots(self):
+        """Old slots are skipped without any rotation step."""
+        ring = RingCounter(slots=60, slot_seconds=60)
+        now = 1_000_000.0
+        ring.add(now - 30, True, now=now)
+        ring.add(now - 600, False, now=now)
+        ring.add(now - 7200, True, now=now)  # Beyond the ring, ignored
+
+        assert ring.window(300, now=now) == (1, 1)
+        assert ring.window(3600, now=now) == (2, 1)
+
+    def test_slot_is_recycled_for_new_period(self):
+        """A slot reused an hour later starts from zero."""
+        ring = RingCounter(slots=60, slot_seconds=60)
+        start = 1_000_000.0
+        ring.add(start, True, now=start)
+        later = start + 3600
+        ring.add(later, False, now=later)
+
+        assert ring.window(3600, now=later) == (1, 0)
+
+
+class TestWindowCounterService:
+    """Test per-pipeline and global trailing counts."""
+
+    def test_counts_and_success_rate(self):
+        service = WindowCounterService()
+        now = datetime.utcnow()
+        for i, status in enumerate(["SUCCESS", "FAILURE", "SUCCESS", "SUCCESS"]):
+            service.observe_build({
+                "pipeline_name": "api",
+                "status": status,
+                "timestamp": now - timedelta(hours=i * 12)
+            })
+
+        day = service.counts("api", timedelta(days=1))
+        assert day["builds"] == 2
+        assert day["success_rate"] == 50.0
+        assert service.builds_in_window("api", timedelta(days=7)) == 4
+        assert service.builds_in_window(window=timedelta(days=7)) == 4
+        assert service.builds_in_window("unknown") == 0
+
+
+@pytest.mark.asyncio
+async def test_build_stats_endpoint_reads_counters(monkeypatch):
+    from app.routers import builds as builds_router
+    init_db()
+    now = datetime.utcnow()
+    db = get_session()
+    db.query(Build).delete()
+    db.add_all([
+        Build(pipeline_name="api", build_number=i, status=status, timestamp=now - timedelta(days=i * 3),
+              triggered_by="jenkins")
+        for i, status in enumerate(["SUCCESS", "FAILURE", "ABORTED", "SUCCESS"])
+    ])
+    db.commit()
+    db.close()
+
+    service = WindowCounterService()
+    service.observe_build({"pipeline_name": "api", "status": "SUCCESS", "timestamp": now})
+    monkeypatch.setattr(builds_router, "window_counters", service)
+    async for session in get_async_db():
+        response = await builds_router.get_build_stats(pipeline_name="api", db=session)
+    await close_async_db()
+
+    data = response["data"]
+    assert (data["total_builds"], data["success_count"], data["failure_count"]) == (4, 2, 2)
+    assert data["builds_last_24h"] == 1